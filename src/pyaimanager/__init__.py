@@ -1,2 +1,26 @@
-from .assistant_manager import AssistantManager
-from .assistant import Assistant
\ No newline at end of file
+import importlib
+
+# Submodules are imported on first use, so `import pyaimanager` stays cheap for short-lived scripts
+_LAZY_ATTRIBUTES = {
+    "AssistantManager": ".assistant_manager",
+    "Assistant": ".assistant",
+    "FileManager": ".file_manager",
+    "SyncAssistantManager": ".sync_client",
+    "WorkerPool": ".worker_pool",
+    "ContextPolicy": ".context_policy",
+    "SharedCache": ".shared_cache",
+    "MemoryCache": ".shared_cache",
+    "SQLiteCache": ".shared_cache",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,8 +1,17 @@
 import asyncio
-import json
+import datetime
+import time
 from .utils.logging import logger
-from .utils.exceptions import ChatAssistantError, ChatMessageError, ChatConversationError, ChatRunError
+from .utils.exceptions import ChatAssistantError, ChatMessageError, ChatConversationError, ChatRunError, ChatRunTimeoutError
+from .utils.run_scheduler import RunScheduler
+from .utils.usage_tracker import UsageTracker
+from .utils.profiler import profile_span
+from .utils.bulk_delete import bulk_delete
 from .conversation import Conversation
+from .events import EventBus, RunStatusEvent, RunFailed, RunStepEvent, ToolCallStarted, ToolCallFinished, MessageCreated, RUN_STATUS_EVENTS
+
+STEP_TERMINAL_STATUSES = ('completed', 'failed', 'cancelled', 'expired')
+RUN_TERMINAL_STATUSES = ('completed', 'failed', 'cancelled', 'expired')
 
 class Assistant:
     """
@@ -23,6 +32,12 @@ class Assistant:
             thrad (object): The thread of the conversation.
             run (object): The run of the conversation.
         active_conversation (object): The active conversation of the assistant.
+        scheduler (RunScheduler): Limits how many runs are in progress at once and queues the rest by priority.
+        run_timeout (float): Default seconds a send_message call may take once it has a run slot, or None for no limit. Also limits summary runs. Default is 600.
+        context_policy (ContextPolicy): Default thread size limit for conversations that don't set their own. Default is None, which lets threads grow.
+        events (EventBus): Emits run status changes, tool calls and new messages to subscribers, see `events.py`.
+        fetch_run_steps (bool): Fetch run steps for every run while anyone subscribes to Event. Default is False, which only
+            fetches them for RunStepEvent subscribers and for messages sent with `stream_message`.
 
         example of what conversation object looks like:
             {
@@ -69,9 +84,18 @@ class Assistant:
         See OpenAI's documentation at https://platform.openai.com/docs/introduction for more information.
     """
 
-    def __init__(self, assistant, http_request_handler):
+    def __init__(self, assistant, http_request_handler, scheduler=None, usage=None):
         self.__http = http_request_handler
+        self.scheduler = scheduler or RunScheduler()
+        self.usage = usage or UsageTracker()
+        self.profiler = None
         self.__update_interval = 5
+        self.__active_runs = {}  # run ID -> thread ID, for runs still being waited on
+        self.run_timeout = 600
+        self.context_policy = None
+        self.events = EventBus()
+        self.fetch_run_steps = False
+        self.__streamed_conversations = {}  # conversation ID -> number of open streams
 
         self.id = assistant['id']
         self.name = assistant['name']
@@ -104,10 +128,23 @@ class Assistant:
     
     def use_function(self, function_name, *args, **kwargs):
         if function_name in self.functions:
-            return self.functions[function_name](*args, **kwargs)
+            with profile_span(function_name, "tool"):
+                return self.functions[function_name](*args, **kwargs)
         else:
             raise Exception(f"Function {function_name} not found")
 
+    async def _emit(self, event_class, conversation, run_id, **fields):
+        # Skip building events when nobody listens, this runs on every poll
+        if not self.events.has_subscribers(event_class):
+            return
+        await self.events.emit(event_class(self.id, conversation.id, conversation.get_thread_id(), run_id, **fields))
+
+    async def _emit_run_status(self, run, conversation):
+        event_class = RUN_STATUS_EVENTS.get(run['status'], RunStatusEvent)
+        fields = {"status": run['status'], "run": run}
+        if event_class is RunFailed:
+            fields["error"] = (run.get('last_error') or {}).get('message')
+        await self._emit(event_class, conversation, run['id'], **fields)
 
     async def _get_message_response(self, conversation):
         """
@@ -120,34 +157,154 @@ class Assistant:
             dict: The response from the completed run.
         """
         logger.info(f"Waiting for run completion for run ID: {conversation.get_run_id()}")
+        last_status = None
+        steps = {"after": None, "statuses": {}, "message_ids": set()}
         while True:
             try:
                 run = await self._get_run_status(conversation)
+                conversation.set_run(run)
+                if run['status'] != last_status:
+                    last_status = run['status']
+                    await self._emit_run_status(run, conversation)
+                if self._should_fetch_steps(conversation):
+                    await self._fetch_run_steps(run, conversation, steps)
                 
                 if run['status'] == 'requires_action':
                     await self._handle_required_action(run, conversation)
 
                 elif run['status'] == 'completed':
-                    return await self._handle_completed_run(run, conversation)
+                    return await self._handle_completed_run(run, conversation, steps['message_ids'])
+
+                elif run['status'] in ('failed', 'expired', 'cancelled'):
+                    conversation.set_run(run)
+                    last_error = run.get('last_error') or {}
+                    logger.error(f"Run {run['id']} ended with status {run['status']}: {last_error.get('message')}")
+                    raise ChatRunError(f"Run {run['id']} ended with status {run['status']}: {last_error.get('message', 'no error details')}.")
 
                 else:
                     logger.info(f"Run not completed yet for run ID: {run['id']}")
-                    await asyncio.sleep(self.__update_interval)
+                    with profile_span("poll sleep", "sleep", status=run['status']):
+                        await asyncio.sleep(self.__update_interval)
+            except ChatRunError:
+                raise
             except Exception as e:
                 logger.error(f"Error waiting for run completion: {e}")
                 raise ChatRunError(f"Error waiting for run completion: {e}. Please try again.")
 
+    def _should_fetch_steps(self, conversation):
+        # Each fetch costs requests on every poll, so only for runs whose steps someone actually reads
+        if self.events.has_specific_subscribers(RunStepEvent) or conversation.id in self.__streamed_conversations:
+            return True
+        return self.fetch_run_steps and self.events.has_subscribers(RunStepEvent)
+
+    def _record_usage(self, run, conversation, started):
+        # Only finished runs have final usage, cancelled and timed out turns aren't counted
+        if run is None or run['status'] not in RUN_TERMINAL_STATUSES:
+            return
+        latency = time.monotonic() - started
+        self.usage.record(run, self.id, conversation.id, latency, self.model)
+        conversation.add_usage(run, latency)
+
     async def _get_run_status(self, conversation):
         run_id = conversation.get_run_id()
         thread_id = conversation.get_thread_id()
         return await self.__http.request("get", f"threads/{thread_id}/runs/{run_id}")
 
+    async def _fetch_run_steps(self, run, conversation, steps):
+        """
+        Fetches the run steps that are new or may have changed since the last poll and emits them.
+
+        Steps are fetched oldest first with a cursor that only moves past finished steps, so each
+        poll re-reads the steps still in progress and nothing before them.
+
+        Args:
+            run (dict): The run to fetch steps for.
+            conversation (Conversation): The conversation of the run.
+            steps (dict): The step tracking state of the run: the cursor, the last seen status of each
+                step and the IDs of the messages already emitted.
+        """
+        thread_id = conversation.get_thread_id()
+        after = steps['after']
+        prefix_finished = True
+        try:
+            while True:
+                endpoint = f"threads/{thread_id}/runs/{run['id']}/steps?order=asc&limit=100"
+                page = await self.__http.request("get", endpoint + (f"&after={after}" if after else ""))
+                for step in page['data']:
+                    if steps['statuses'].get(step['id']) != step['status']:
+                        steps['statuses'][step['id']] = step['status']
+                        await self._emit(RunStepEvent, conversation, run['id'], step=step, step_type=step['type'], status=step['status'])
+                        if step['type'] == 'message_creation' and step['status'] == 'completed':
+                            await self._emit_step_message(step, run, conversation, steps)
+
+                    prefix_finished = prefix_finished and step['status'] in STEP_TERMINAL_STATUSES
+                    if prefix_finished:
+                        steps['after'] = step['id']
+
+                if not page.get('has_more') or not page['data']:
+                    break
+                after = page['last_id']
+        except Exception as e:
+            # Steps are extra information, a failed fetch shouldn't fail the run
+            logger.warning(f"Error fetching run steps for run ID: {run['id']}: {e}")
+
+    async def _emit_step_message(self, step, run, conversation, steps):
+        message_id = step['step_details']['message_creation']['message_id']
+        if message_id in steps['message_ids']:
+            return
+        message = await self.__http.request("get", f"threads/{conversation.get_thread_id()}/messages/{message_id}")
+        steps['message_ids'].add(message_id)
+        await self._emit(MessageCreated, conversation, run['id'],
+                         role=message['role'], text=conversation._get_message_text(message), message=message)
+
+    async def _cancel_run(self, thread_id, run_id):
+        """
+        Asks the API to cancel a run. Runs that already finished are left alone.
+
+        Args:
+            thread_id (str): The ID of the thread the run belongs to.
+            run_id (str): The ID of the run to cancel.
+
+        Returns:
+            cancelled (bool): True if the cancel request was accepted, False otherwise.
+        """
+        try:
+            await self.__http.request("post", f"threads/{thread_id}/runs/{run_id}/cancel")
+            logger.info(f"Cancelled run ID: {run_id}")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not cancel run ID: {run_id}: {e}")
+            return False
+
+    async def cancel_active_runs(self):
+        """
+        Cancels every run this assistant is still waiting on, e.g. when shutting down.
+
+        Returns:
+            cancelled (list): The IDs of the runs that were cancelled.
+        """
+        runs = list(self.__active_runs.items())
+        self.__active_runs.clear()
+        results = await asyncio.gather(*(self._cancel_run(thread_id, run_id) for run_id, thread_id in runs))
+        return [run_id for (run_id, _), cancelled in zip(runs, results) if cancelled]
+
     async def _handle_required_action(self, run, conversation):
         tool_outputs = []
         for tool_call in run['required_action']['submit_tool_outputs']['tool_calls']:
             function_name = tool_call['function']['name']
-            function_args = json.loads(tool_call['function']['arguments'])
-            function_output = self.use_function(function_name, **function_args)
+            with profile_span("decode", "json", size=len(tool_call['function']['arguments'])):
+                function_args = self.__http.codec.decode(tool_call['function']['arguments'])
+            await self._emit(ToolCallStarted, conversation, run['id'],
+                             tool_call_id=tool_call['id'], function_name=function_name, arguments=function_args)
+            started_at = time.perf_counter()
+            try:
+                function_output = self.use_function(function_name, **function_args)
+            except Exception as e:
+                await self._emit(ToolCallFinished, conversation, run['id'], tool_call_id=tool_call['id'], function_name=function_name,
+                                 output=None, error=str(e), duration=time.perf_counter() - started_at)
+                raise
+            await self._emit(ToolCallFinished, conversation, run['id'], tool_call_id=tool_call['id'], function_name=function_name,
+                             output=function_output, error=None, duration=time.perf_counter() - started_at)
             tool_outputs.append({
                 "tool_call_id": tool_call['id'],
                 "output": function_output,
@@ -158,41 +315,164 @@ class Assistant:
         await self.__http.request(
             "post", 
             f"threads/{thread_id}/runs/{run_id}/submit_tool_outputs",
-            json={"tool_outputs": tool_outputs})
+            {"tool_outputs": tool_outputs})
 
-    async def _handle_completed_run(self, run, conversation):
+    async def _handle_completed_run(self, run, conversation, emitted_message_ids=()):
         logger.info(f"Run completed for run ID: {run['id']}")
         thread_id = conversation.get_thread_id()
-        thread = await self.__http.request("get", f"threads/{thread_id}")
+        # Only the messages added since the newest known one are fetched, which keeps the count of the thread's messages exact
+        thread, new_messages = await asyncio.gather(
+            self.__http.request("get", f"threads/{thread_id}"),
+            self._list_messages(thread_id, conversation.get_newest_message_id()))
         conversation.set_thread(thread)
         conversation.set_run(run)
-        messages = await self.__http.request("get", f"threads/{thread_id}/messages")
-        conversation.set_messages(messages['data'])
+        conversation.add_new_messages(new_messages)
         conversation.set_latest_response(conversation.get_messages()[0])
 
+        # Messages are listed newest first
+        for message in reversed(new_messages):
+            if message.get('run_id') == run['id'] and message['role'] == 'assistant' and message['id'] not in emitted_message_ids:
+                await self._emit(MessageCreated, conversation, run['id'],
+                                 role=message['role'], text=conversation._get_message_text(message), message=message)
+
         logger.info(f"Messages: {conversation.get_messages()}")
         logger.info(f"Response: {conversation.latest_response}")
 
         return conversation.latest_response
 
-    async def _create_new_thread(self, message):
+    async def _list_messages(self, thread_id, until_id=None):
+        """
+        Lists the messages of a thread, following every page.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            (Optional) until_id (str): Stop at this message, leaving it and everything older out. Default is None, which lists the whole thread.
+
+        Returns:
+            messages (list): The messages, newest first.
+        """
+        messages = []
+        endpoint = f"threads/{thread_id}/messages?limit=100"
+        while True:
+            page = await self.__http.request("get", endpoint)
+            for message in page['data']:
+                if message['id'] == until_id:
+                    return messages
+                messages.append(message)
+            if not page.get('has_more') or not page['data']:
+                return messages
+            endpoint = f"threads/{thread_id}/messages?limit=100&after={page['last_id']}"
+
+    async def _roll_over_conversation(self, conversation, policy):
+        """
+        Moves a conversation to a new thread seeded with a summary of its older messages and its most recent messages.
+        Runs in the background after a turn; the next message to the conversation waits for it.
+
+        Args:
+            conversation (Conversation): The conversation to roll over.
+            policy (ContextPolicy): The policy that decides what to summarize and keep.
+        """
+        old_thread_id = conversation.get_thread_id()
+        try:
+            # Only the most recent messages are kept in memory, so fetch the whole thread to summarize it
+            messages = conversation.get_messages()
+            if len(messages) < conversation.get_message_count():
+                messages = await self._list_messages(old_thread_id)
+            older, recent = policy.split_messages(messages)
+            summary = await self._summarize_messages(conversation, older, policy)
+
+            # The API only accepts user messages when creating a thread, so earlier replies are quoted
+            seed_messages = [{"role": "user", "content": f"Summary of the conversation so far:\n{summary}"}]
+            for message in recent:
+                text = conversation._get_message_text(message)
+                content = text if message['role'] == 'user' else f"({message['role']} replied): {text}"
+                seed_messages.append({"role": "user", "content": content})
+
+            new_thread = await self.__http.request("post", "threads", {"messages": seed_messages})
+            conversation.roll_over(new_thread, await self._list_messages(new_thread['id']), summary)
+            logger.info(f"Rolled conversation {conversation.id} over from thread {old_thread_id} to {new_thread['id']}")
+        except Exception as e:
+            # Not fatal: the conversation stays on its thread and tries again after the next turn
+            logger.error(f"Error rolling over conversation {conversation.id}, staying on thread {old_thread_id}: {e}")
+            return
+
+        if policy.delete_old_threads:
+            try:
+                await self.__http.request("delete", f"threads/{old_thread_id}")
+            except Exception as e:
+                logger.warning(f"Could not delete old thread {old_thread_id}: {e}")
+
+    async def _summarize_messages(self, conversation, messages, policy):
+        if policy.summarizer is not None:
+            simple_messages = [{"role": message['role'], "text": conversation._get_message_text(message)} for message in messages]
+            summary = policy.summarizer(simple_messages)
+            if asyncio.iscoroutine(summary):
+                summary = await summary
+            return summary
+
+        # Ask the assistant for the summary on the old thread, which is about to be left behind anyway
+        thread_id = conversation.get_thread_id()
+        async with self.scheduler.slot("batch"):
+            started = time.monotonic()
+            run = await self.__http.request("post", f"threads/{thread_id}/runs", {
+                "assistant_id": self.id,
+                "instructions": policy.summary_instructions,
+            })
+            self.__active_runs[run['id']] = thread_id
+            try:
+                run = await asyncio.wait_for(self._wait_for_summary_run(thread_id, run), self.run_timeout)
+            except (asyncio.CancelledError, Exception) as e:
+                # Timed out, the rollover was cancelled or polling failed, so stop the run from using up quota
+                if self.__active_runs.pop(run['id'], None):
+                    await asyncio.shield(self._cancel_run(thread_id, run['id']))
+                if isinstance(e, asyncio.TimeoutError):
+                    raise ChatRunTimeoutError(f"Summary run {run['id']} did not finish within {self.run_timeout}s.")
+                raise
+            finally:
+                self.__active_runs.pop(run['id'], None)
+            self._record_usage(run, conversation, started)
+            if run['status'] != 'completed':
+                if run['status'] == 'requires_action':
+                    await self._cancel_run(thread_id, run['id'])
+                raise ChatRunError(f"Summary run {run['id']} ended with status {run['status']}.")
+        messages = await self.__http.request("get", f"threads/{thread_id}/messages?limit=1")
+        return conversation._get_message_text(messages['data'][0])
+
+    async def _wait_for_summary_run(self, thread_id, run):
+        while run['status'] in ('queued', 'in_progress', 'cancelling'):
+            with profile_span("poll sleep", "sleep", status=run['status']):
+                await asyncio.sleep(self.__update_interval)
+            run = await self.__http.request("get", f"threads/{thread_id}/runs/{run['id']}")
+        return run
+
+    async def _create_thread_and_run(self, message, file_ids=None):
         """
-        Creates a new thread for the assistant.
+        Creates a new thread with the first message and starts a run on it, in one request.
 
         Args:
             message (str): The message to send to the assistant.
+            (Optional) file_ids (list): The IDs of files to attach to the message.
 
         Returns:
-            The new thread.
+            The new run. Its thread_id is the ID of the new thread.
         """
         try:
-            new_thread = await self.__http.request("post", "threads", { "messages":[{ "role": "user", "content": message }] })
-            logger.info(f"New thread created with ID: {new_thread['id']}")
-            return new_thread
+            run = await self.__http.request("post", "threads/runs", {
+                "assistant_id": self.id,
+                "thread": { "messages":[self._build_message(message, file_ids)] },
+            })
+            logger.info(f"New thread created with ID: {run['thread_id']}, run ID: {run['id']}")
+            return run
         except Exception as e:
             logger.error(f"Error creating new thread: {e}, for message: {message}")
             raise ChatRunError(f"Error creating new thread: {e}, for message: {message}. Please check your setup and try again.")
 
+    def _build_message(self, message, file_ids=None):
+        new_message = {"role": "user", "content": message}
+        if file_ids:
+            new_message["file_ids"] = list(file_ids)
+        return new_message
+
     async def _create_new_run(self, thread_id):
         try:
             run = await self.__http.request(
@@ -206,18 +486,20 @@ class Assistant:
             logger.error(f"Error creating new run: {e}")
             raise ChatRunError(f"Error creating new run: {e}")
 
-    async def create_conversation(self, title, description = None):
+    async def create_conversation(self, title, description = None, context_policy = None):
         """
         Starts a new conversation with the assistant.
 
         Args:
             title (str): The title of the conversation.
             (Optional) description (str): The description of the conversation. Default is None. 
+            (Optional) context_policy (ContextPolicy): Caps the conversation's thread size. Default is the assistant's context_policy.
         """
         try:
             new_conversation = Conversation({
                 "title": title,
                 "description": description,
+                "context_policy": context_policy,
             })
             self.conversations.append(new_conversation)
             self.active_conversation = new_conversation
@@ -229,14 +511,49 @@ class Assistant:
     def set_active_conversation(self, conversation):
         self.active_conversation = conversation
 
-    async def send_message(self, message, conversation=None):
+    async def send_message(self, message, conversation=None, priority="interactive", queue_timeout=None, timeout=None, file_ids=None):
         """
         Sends a message to the assistant and periodically retrieves the Run object to update the status.
 
+        The message waits in the assistant's run queue until the scheduler has a free slot for it.
+
         Args:
             message (str): The message to send to the assistant.
             (Optional) conversation (object): The conversation to send the message to. Default is active conversation.
+            (Optional) priority (str): "interactive" or "batch". Interactive messages are admitted ahead of batch ones. Default is "interactive".
+            (Optional) queue_timeout (float): Seconds the message may wait for a run slot. Default is the scheduler's queue_timeout.
+            (Optional) timeout (float): Seconds the message may take once it has a run slot. Default is the assistant's run_timeout.
+                Waiting for the conversation to roll over to a new thread is limited by it as well, after which the
+                rollover is abandoned and the message is sent on the current thread.
+            (Optional) file_ids (list): The IDs of uploaded files to attach to the message. Default is None.
+
+        If the call times out, the awaiting task is cancelled or waiting fails, e.g. because a tool function raised,
+        a run that hasn't finished is cancelled through the API as well.
+
+        Raises:
+            ChatQueueError: If the run queue is full or the message waited longer than queue_timeout.
+            ChatRunTimeoutError: If the run did not finish within the timeout.
+            ChatRunError: If the run failed, expired or was cancelled, or waiting for it failed.
         """
+        conversation = await self._resolve_conversation(conversation)
+
+        timeout = self.run_timeout if timeout is None else timeout
+        if self.profiler is not None:
+            trace = self.profiler.trace("send_message", assistant_id=self.id, conversation_id=conversation.id, priority=priority)
+        else:
+            trace = profile_span("send_message", "turn")
+        with trace:
+            # Finish moving to a new thread before queueing, so no run slot is held while waiting
+            with profile_span("rollover wait", "queue"):
+                await conversation.wait_for_rollover(timeout)
+            async with self.scheduler.slot(priority, queue_timeout):
+                try:
+                    return await asyncio.wait_for(self._send_message(message, conversation, file_ids), timeout)
+                except asyncio.TimeoutError:
+                    logger.error(f"Message timed out after {timeout}s: {message}")
+                    raise ChatRunTimeoutError(f"No response within {timeout}s. The run was cancelled, please try again.")
+
+    async def _resolve_conversation(self, conversation):
         # If no conversation is provided and there's no active conversation, create a new one
         if conversation is None and self.active_conversation is None:
             conversation = await self.create_conversation("New Conversation")
@@ -250,36 +567,96 @@ class Assistant:
         elif conversation is None and self.active_conversation is not None:
             conversation = self.active_conversation
 
-        # The rest of your code...
+        return conversation
+
+    async def stream_message(self, message, conversation=None, **kwargs):
+        """
+        Sends a message and yields the events of its run as they happen: status changes, run steps,
+        tool calls and each assistant message as soon as it is written, instead of waiting for the whole run.
+
+        Args:
+            message (str): The message to send to the assistant.
+            (Optional) conversation (object): The conversation to send the message to. Default is active conversation.
+            **kwargs: Any other `send_message` arguments, e.g. priority, timeout or file_ids.
+
+        Yields:
+            event (Event): The events of this conversation, ending after the run completes.
 
+        Raises:
+            The same errors as `send_message`, once the events before the error have been yielded.
+
+        Example:
+            async for event in assistant.stream_message("Analyze this data", conversation):
+                if isinstance(event, MessageCreated) and event.role == "assistant":
+                    print(event.text)
+        """
+        conversation = await self._resolve_conversation(conversation)
+        self.__streamed_conversations[conversation.id] = self.__streamed_conversations.get(conversation.id, 0) + 1
+        events = asyncio.Queue()
+        unsubscribe = self.events.subscribe(
+            lambda event: events.put_nowait(event) if event.conversation_id == conversation.id else None)
+        task = asyncio.ensure_future(self.send_message(message, conversation, **kwargs))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            await task
+        finally:
+            unsubscribe()
+            self.__streamed_conversations[conversation.id] -= 1
+            if not self.__streamed_conversations[conversation.id]:
+                del self.__streamed_conversations[conversation.id]
+            # Stopping the iteration early cancels the run as well
+            if not task.done():
+                task.cancel()
+
+    async def _send_message(self, message, conversation, file_ids=None):
         try:
-            logger.info(f"Active conversation: {self.active_conversation.__dict__}")
-            if self.active_conversation.get_message_count() == 0:
-                # create new thread with initial message
-                self.active_conversation.set_thread(await self._create_new_thread(message))
+            logger.info(f"Conversation: {conversation.__dict__}")
+            if conversation.get_thread() is None:
+                # Create the thread, its first message and the run in a single request
+                started = time.monotonic()
+                run = await self._create_thread_and_run(message, file_ids)
+                conversation.set_thread({"id": run['thread_id']})
+                await self._emit(MessageCreated, conversation, run['id'], role="user", text=message, message=None)
             else:
                 # Create the new message
                 logger.info(f"Sending message: {message}")
-                await self.__http.request("post", f"threads/{self.active_conversation.get_thread_id()}/messages", {
-                    "role": "user",
-                    "content": message
-                })
-
-                # Update the thread
-                thread = await self.__http.request("get", f"threads/{self.active_conversation.get_thread_id()}")
-                self.active_conversation.set_thread(thread)
-                logger.info(f"Thread updated: {self.active_conversation.get_thread()}")
-
-            # Create a new run
-            conversation.set_run(await self._create_new_run(self.active_conversation.get_thread_id()))
+                new_message = await self.__http.request("post", f"threads/{conversation.get_thread_id()}/messages", self._build_message(message, file_ids))
 
+                # Create a new run
+                started = time.monotonic()
+                run = await self._create_new_run(conversation.get_thread_id())
+                await self._emit(MessageCreated, conversation, run['id'], role="user", text=message, message=new_message)
+            conversation.set_run(run)
+            self.__active_runs[run['id']] = run['thread_id']
 
             logger.info(f"Message sent successfully: {message}")
-            response = await self._get_message_response(conversation)        
-            self.active_conversation.set_thread(await self.__http.request("get", f"threads/{self.active_conversation.get_thread_id()}"))
+            try:
+                response = await self._get_message_response(conversation)
+            except (asyncio.CancelledError, Exception):
+                # The caller stopped waiting, a tool function raised or polling failed,
+                # so stop a run that is still going from using up quota
+                finished = conversation.get_run()['status'] in RUN_TERMINAL_STATUSES
+                if self.__active_runs.pop(run['id'], None) and not finished:
+                    await asyncio.shield(self._cancel_run(run['thread_id'], run['id']))
+                raise
+            finally:
+                self.__active_runs.pop(run['id'], None)
+                if conversation.get_run()['id'] == run['id']:
+                    self._record_usage(conversation.get_run(), conversation, started)
+
+            policy = conversation.context_policy or self.context_policy
+            if policy is not None and policy.should_roll_over(conversation) and not conversation.is_rolling_over():
+                conversation.start_rollover(self._roll_over_conversation(conversation, policy))
 
             return response
 
+        except ChatRunError:
+            raise
         except Exception as e:
             logger.error(f"Error sending message: {e}")
             raise ChatMessageError(f"Error sending message: {e}. Please try again.")
@@ -335,3 +712,53 @@ class Assistant:
         except Exception as e:
             logger.error(f"Error deleting conversation: {e}")
             raise ChatConversationError(f"Error deleting conversation: {e}. Please try again.")
+
+    async def delete_conversations(self, conversation_ids=None, older_than=None, max_concurrency=8):
+        """
+        Deletes many conversations and their threads at once. Deletes run concurrently and back off together when the API rate limits.
+
+        Args:
+            (Optional) conversation_ids (list): The IDs of the conversations to delete.
+            (Optional) older_than (float): Only delete conversations created more than this many seconds ago.
+            (Optional) max_concurrency (int): The maximum number of deletes running at once. Default is 8.
+
+        Returns:
+            report (list): One dictionary per conversation with its id, whether it was deleted, and the error if it wasn't.
+                IDs in conversation_ids that match no conversation are reported with the error "not found".
+
+        Raises:
+            ChatConversationError: If neither conversation_ids nor older_than is given.
+        """
+        if conversation_ids is None and older_than is None:
+            raise ChatConversationError("No conversations selected. Please provide conversation_ids or older_than.")
+
+        now = datetime.datetime.now()
+        selected = [
+            conversation for conversation in self.conversations
+            if (conversation_ids is None or conversation.id in conversation_ids)
+            and (older_than is None or (now - conversation.created_at).total_seconds() > older_than)
+        ]
+
+        # Conversations that never sent a message have no thread to delete
+        with_thread = [conversation for conversation in selected if conversation.get_thread() is not None]
+        thread_report = await bulk_delete(
+            self.__http,
+            [(conversation.get_thread_id(), f"threads/{conversation.get_thread_id()}") for conversation in with_thread],
+            max_concurrency)
+        thread_results = {conversation.id: result for conversation, result in zip(with_thread, thread_report)}
+
+        report = []
+        for conversation in selected:
+            result = thread_results.get(conversation.id, {"deleted": True, "error": None})
+            if result['deleted']:
+                self.conversations.remove(conversation)
+                if self.active_conversation is conversation:
+                    self.active_conversation = None
+            report.append({"id": conversation.id, "deleted": result['deleted'], "error": result['error']})
+        # Every requested ID gets an entry, including ones this assistant has no conversation for
+        selected_ids = {conversation.id for conversation in selected}
+        for conversation_id in conversation_ids or []:
+            if conversation_id not in selected_ids:
+                report.append({"id": conversation_id, "deleted": False, "error": "not found"})
+        logger.info(f"Deleted {sum(1 for result in report if result['deleted'])}/{len(report)} conversations.")
+        return report
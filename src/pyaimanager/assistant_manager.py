@@ -1,8 +1,27 @@
+import asyncio
+import fnmatch
+import hashlib
+import json
 import time
 from .utils.logging import logger
-from .utils.exceptions import ChatAssistantError
+from .utils.exceptions import ChatAssistantError, ChatAPIError
+from .utils.bulk_delete import bulk_delete
+from .utils.concurrency import gather_limited
 from .assistant import Assistant
+from .file_manager import FileManager
 from .utils.http_requests import HTTPRequest
+from .utils.run_scheduler import RunScheduler
+from .utils.usage_tracker import UsageTracker
+from .utils.profiler import Profiler
+
+# Assistant fields accepted by the OpenAI API
+ASSISTANT_API_KEYS = ['name', 'description', 'model', 'instructions', 'tools', 'file_ids', 'metadata']
+
+# Metadata key holding the content hash of the spec an assistant was last reconciled with
+SPEC_HASH_KEY = 'pyaimanager_spec_hash'
+
+# Shared cache key of the assistant list, also used as the name of the lease for fetching it
+ASSISTANTS_CACHE_KEY = 'assistants'
 
 class AssistantManager:
     """
@@ -11,28 +30,45 @@ class AssistantManager:
 
     Initialization Parameters:
         api_key (str): An Open API key for the Assistant API.
-        assistant_params (dict): A dictionary of parameters to create a new assistant.
+        (Optional) scheduler_config (dict): Keyword arguments for the RunScheduler given to each assistant,
+            e.g. {"max_in_flight": 8, "queue_timeout": 10}. Default is None, which uses the RunScheduler defaults.
+        (Optional) json_codec (str or JSONCodec): "json", "orjson", "msgspec" or a codec instance used for API bodies.
+            Default is None, which picks the fastest installed backend.
+        (Optional) cache (SharedCache): A cache shared with other managers and processes, e.g. a SQLiteCache. The list of
+            assistants and the file upload index are kept in it, so only one of the processes sharing it fetches the
+            assistants from the API when they are stale. Default is None, which keeps everything in this manager.
+        (Optional) http_config (dict): Keyword arguments for the HTTPRequest, e.g. {"hedge_reads": True} to resend
+            slow GET requests. Default is None, which uses the HTTPRequest defaults.
 
     Lets you create, update, and delete assistants, as well as set an active assistant to use for sending messages.
     """
-    def __init__(self, api_key):
-
-        self.__http = HTTPRequest(api_key)
+    def __init__(self, api_key, scheduler_config=None, json_codec=None, cache=None, http_config=None):
+
+        self.__http = HTTPRequest(api_key, json_codec, **(http_config or {}))
+        self.__scheduler_config = scheduler_config or {}
+        self.cache = cache
+        self.files = FileManager(self.__http, cache=cache)
+        self.usage = UsageTracker()
+        self.profiler = None
         self.assistants = []
         self.active_assistant = None
         self.__time_between_updates = 5 # minutes
         self.__last_updated = 0
 
     @classmethod
-    async def create(cls, api_key):
+    async def create(cls, api_key, scheduler_config=None, json_codec=None, cache=None, http_config=None):
         """
         Creates an AssistantManager instance.
 
         Args:
             api_key (str): An OpenAI API key.
+            (Optional) scheduler_config (dict): Keyword arguments for the RunScheduler given to each assistant.
+            (Optional) json_codec (str or JSONCodec): The JSON codec used for API bodies.
+            (Optional) cache (SharedCache): A cache shared with other managers and processes.
+            (Optional) http_config (dict): Keyword arguments for the HTTPRequest.
         """
         logger.debug("Creating AssistantManager instance")
-        instance = cls(api_key)
+        instance = cls(api_key, scheduler_config, json_codec, cache, http_config)
         try:
             await instance.synchronize_assistants()
         except Exception as e:
@@ -41,6 +77,29 @@ class AssistantManager:
         logger.info("AssistantManager instance created")
         return instance
     
+    async def close(self):
+        """
+        Shuts the manager down, cancelling any runs the local assistants are still waiting on
+        so they don't keep using quota after the process exits, and closing the connection pool.
+
+        Returns:
+            cancelled (list): The IDs of the runs that were cancelled.
+        """
+        cancelled = []
+        for assistant in self.assistants:
+            cancelled.extend(await assistant.cancel_active_runs())
+        if cancelled:
+            logger.info(f"Cancelled {len(cancelled)} orphaned runs on shutdown.")
+        self.usage.stop_export()
+        await self.__http.close()
+        return cancelled
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
 # ---------------------------------------------------------------------------- #
 #                     Assistant Data Fetching and Updating                     #
 # ---------------------------------------------------------------------------- #
@@ -50,20 +109,27 @@ class AssistantManager:
         Fetches the list of assistants from the API.
 
         Returns:
-            assistants (list): The list of assistants fetched from the API.
+            assistants (list): The list of assistants fetched from the API, following every page.
         """
-        try:
-            response = await self.__http.request("get", "assistants")
-        except Exception as e:
-            logger.error(f"Error fetching assistants from API: {e}")
-            raise ChatAssistantError(f"Error fetching assistants from API. Please check your OpenAI configuration.")
-        else:
-            if 'data' in response:
-                logger.info("Assistants retrieved from API successfully.")
-                return response['data']
-            else:
+        assistants = []
+        endpoint = "assistants?limit=100"
+        while True:
+            try:
+                response = await self.__http.request("get", endpoint)
+            except Exception as e:
+                logger.error(f"Error fetching assistants from API: {e}")
+                raise ChatAssistantError(f"Error fetching assistants from API. Please check your OpenAI configuration.")
+            if 'data' not in response:
                 logger.error("Unexpected response format from API.")
                 raise ChatAssistantError("Unexpected response format from API.")
+
+            assistants.extend(response['data'])
+            if not response.get('has_more') or not response['data']:
+                break
+            endpoint = f"assistants?limit=100&after={response['last_id']}"
+
+        logger.info("Assistants retrieved from API successfully.")
+        return assistants
             
     def is_data_stale(self):
         """
@@ -87,24 +153,71 @@ class AssistantManager:
             return self.assistants
 
         try:
-            logger.debug("Fetching list of assistants from API.")
-            openai_assistants = await self._fetch_assistants_from_api()
-            for openai_assistant in openai_assistants:
-                # Check if the assistant exists locally
-                local_assistant = await self._check_existing_assistant(openai_assistant['id'])
-                if local_assistant:
-                    # Update the local assistant
-                    local_assistant.update(openai_assistant)
-                else:
-                    # Add the new assistant to the local list
-                    self.assistants.append(Assistant(openai_assistant, self.__http, openai_assistant.get('functions', {})))
-            self.__last_updated = time.time()
+            if self.cache is not None:
+                if await self._synchronize_from_cache():
+                    return self.assistants
+            else:
+                logger.debug("Fetching list of assistants from API.")
+                await self._apply_assistants(await self._fetch_assistants_from_api(), time.time())
             logger.info("Local list of assistants synchronized successfully.")
         except Exception as e:
             logger.error(f"Error synchronizing list of assistants: {str(e)}")
             raise ChatAssistantError(f"Error synchronizing list of assistants: \n {str(e)}. \n Please check your OpenAI configuration or try again later.")
         return self.assistants
     
+    async def _apply_assistants(self, openai_assistants, fetched_at):
+        for openai_assistant in openai_assistants:
+            # Check if the assistant exists locally
+            local_assistant = await self._check_existing_assistant(openai_assistant['id'])
+            if local_assistant:
+                # Update the local assistant
+                local_assistant.update(openai_assistant)
+            else:
+                # Add the new assistant to the local list
+                self.assistants.append(self._build_assistant(openai_assistant))
+        # Drop assistants deleted elsewhere
+        ids = {openai_assistant['id'] for openai_assistant in openai_assistants}
+        self.assistants = [assistant for assistant in self.assistants if assistant.id in ids]
+        self.__last_updated = fetched_at
+
+    async def _synchronize_from_cache(self, lease_ttl=30, wait=10):
+        """
+        Synchronizes the local list of assistants through the shared cache. If no other process has stored a fresh
+        list, takes the sync lease and fetches it from the API, otherwise waits for the process holding the lease.
+
+        Returns:
+            from_cache (bool): True if the list was taken from the cache, False if it was fetched from the API.
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            snapshot = self.cache.get(ASSISTANTS_CACHE_KEY)
+            if snapshot is not None:
+                logger.debug("Using the list of assistants from the shared cache.")
+                await self._apply_assistants(snapshot['assistants'], snapshot['fetched_at'])
+                return True
+            if self.cache.acquire_lease(ASSISTANTS_CACHE_KEY, lease_ttl):
+                break
+            if time.monotonic() >= deadline:
+                logger.warning("Timed out waiting for another process to synchronize assistants, fetching them here.")
+                break
+            await asyncio.sleep(0.1)
+
+        try:
+            logger.debug("Fetching list of assistants from API.")
+            fetched_at = time.time()
+            openai_assistants = await self._fetch_assistants_from_api()
+            ttl = self.__time_between_updates * 60
+            self.cache.set(ASSISTANTS_CACHE_KEY, {"fetched_at": fetched_at, "assistants": openai_assistants}, ttl)
+            await self._apply_assistants(openai_assistants, fetched_at)
+            return False
+        finally:
+            self.cache.release_lease(ASSISTANTS_CACHE_KEY)
+
+    def _invalidate_cached_assistants(self):
+        # Other processes fetch the list again the next time theirs is stale
+        if self.cache is not None:
+            self.cache.delete(ASSISTANTS_CACHE_KEY)
+
 # ---------------------------------------------------------------------------- #
 #                      Active Assistant Getting and Setting                    #
 # ---------------------------------------------------------------------------- #
@@ -166,10 +279,13 @@ class AssistantManager:
 
     async def create_assistant(self, assistant):
         """
-        Checks if an assistant exists, and creates one if it doesn't.
+        Checks if an assistant with the same name exists, and creates one if it doesn't.
 
         Args:
             assistant (dict): A dictionary containing the assistant's name, description, model, tools, and instructions, and optionally file_ids and metadata.
+
+        Returns:
+            assistant (object): The existing or new assistant. Use `reconcile_assistants` to also update an existing assistant to match.
         """
         logger.info("Attempting to create assistant")
 
@@ -177,8 +293,12 @@ class AssistantManager:
         self.validate_assistant(assistant)
 
         # Check if an assistant with this name already exists
-        existing_assistant = await self._check_existing_assistant(assistant['name'])
+        existing_assistant = await self.get_assistant_by_name(assistant['name'])
         if existing_assistant:
+            logger.info(f"Assistant already exists: {existing_assistant.name}, id: {existing_assistant.id}")
+            # Functions are local only, so the API copy doesn't have them
+            if assistant.get('functions'):
+                existing_assistant.functions = assistant['functions']
             return existing_assistant
 
         # Create a new assistant
@@ -189,16 +309,32 @@ class AssistantManager:
             if assistant.id == id:
                 return assistant
         return None
+
+    def _build_assistant(self, assistant):
+        """
+        Builds a local Assistant object that shares this manager's HTTP handler and usage tracker.
+
+        Args:
+            assistant (dict): The assistant data, as returned by the OpenAI API.
+
+        Returns:
+            assistant (Assistant): The new Assistant object, with its own run scheduler.
+        """
+        new_assistant = Assistant(assistant, self.__http, RunScheduler(**self.__scheduler_config), self.usage)
+        new_assistant.profiler = self.profiler
+        return new_assistant
+
     async def _create_new_assistant(self, assistant):
         try: 
             # Filter assistant dict to only include keys expected by OpenAI API
-            openai_keys = ['name', 'description', 'model', 'instructions', 'tools', 'file_ids', 'metadata']
-            openai_args = {key: assistant[key] for key in openai_keys if key in assistant}
+            openai_args = {key: assistant[key] for key in ASSISTANT_API_KEYS if key in assistant}
 
             # Create new assistant
             openai_assistant = await self.__http.request("post", "assistants", openai_args)
             combined_assistant = {**assistant, **openai_assistant}  # Combine dictionaries, giving priority to openai_assistant
-            new_assistant = Assistant(combined_assistant, self.__http)
+            new_assistant = self._build_assistant(combined_assistant)
+            self.assistants.append(new_assistant)
+            self._invalidate_cached_assistants()
             logger.info(f"Created Assistant: {new_assistant.name}")
             return new_assistant
         except Exception as e:
@@ -253,6 +389,69 @@ class AssistantManager:
             logger.error(f"Error retrieving assistants: {e}")
             raise ChatAssistantError("Error retrieving assistants. Please check your OpenAI configuration.")
         
+    def get_queue_metrics(self):
+        """
+        Gets the run queue metrics of every local assistant.
+
+        Returns:
+            metrics (dict): The RunScheduler metrics of each assistant, keyed by assistant ID.
+        """
+        return {assistant.id: assistant.scheduler.get_metrics() for assistant in self.assistants}
+
+    def get_usage(self, group="assistant", sort_by="total_tokens", top=None):
+        """
+        Gets the tokens and latency of the runs of every local assistant, added up per assistant, model or conversation.
+        Use `usage.start_export` to hand the counters to a metrics system periodically.
+
+        Args:
+            (Optional) group (str): "assistant", "model" or "conversation". Default is "assistant".
+            (Optional) sort_by (str): The counter to sort by, e.g. "total_tokens", "runs" or "latency_total". Default is "total_tokens".
+            (Optional) top (int): Only return this many entries. Default is None, which returns all of them.
+
+        Returns:
+            usage (list): One dictionary of counters per assistant, model or conversation, largest first.
+        """
+        return self.usage.get_usage(group, sort_by, top)
+
+    def enable_profiling(self, sample_rate=0.01, max_traces=100):
+        """
+        Records where the time of a sample of `send_message` turns goes: queueing, API requests, JSON decoding,
+        poll sleeps and tool functions. Export the traces with `profiler.export(path, format="chrome")` or "speedscope".
+
+        Args:
+            (Optional) sample_rate (float): The share of turns to record, between 0 and 1. Default is 0.01.
+            (Optional) max_traces (int): The number of recent traces to keep. Default is 100.
+
+        Returns:
+            profiler (Profiler): The profiler collecting the traces of every local assistant.
+        """
+        self.profiler = Profiler(sample_rate, max_traces)
+        for assistant in self.assistants:
+            assistant.profiler = self.profiler
+        logger.info(f"Profiling enabled for {sample_rate:.0%} of turns.")
+        return self.profiler
+
+    def disable_profiling(self):
+        """
+        Stops recording traces. Traces already recorded stay in the returned profiler.
+
+        Returns:
+            profiler (Profiler): The profiler that was in use, or None if profiling wasn't enabled.
+        """
+        profiler, self.profiler = self.profiler, None
+        for assistant in self.assistants:
+            assistant.profiler = None
+        return profiler
+
+    def get_http_metrics(self):
+        """
+        Gets how many GET requests were deduplicated and hedged, see HTTPRequest.get_metrics.
+
+        Returns:
+            metrics (dict): The HTTP metrics of this manager's connection pool.
+        """
+        return self.__http.get_metrics()
+
 # ---------------------------------------------------------------------------- #
 #                            Assistant Modification                            #
 # ---------------------------------------------------------------------------- #
@@ -270,11 +469,18 @@ class AssistantManager:
         if not any(key in assistant.__dict__ for key in updated_info):
             logger.error("No attributes to update.")
             raise ChatAssistantError("No attributes to update. Please provide attributes to update.")
+
+        # Only send what actually changed
+        changes = self.diff_assistant(assistant, updated_info)
+        if not changes:
+            logger.info(f"No changes for assistant: {assistant.name}, skipping update.")
+            return assistant
         
         # Update assistant
         try: 
-            oai_updated_assistant = await self.__http.request("post", f"assistants/{assistant.id}", updated_info)
+            oai_updated_assistant = await self.__http.request("post", f"assistants/{assistant.id}", changes)
             updated_assistant = assistant.update(oai_updated_assistant)
+            self._invalidate_cached_assistants()
             
             if oai_updated_assistant:
                 return updated_assistant
@@ -282,10 +488,187 @@ class AssistantManager:
             logger.error(f"Error updating assistant: {e}")
             raise ChatAssistantError(f"Error updating assistant. Please ensure the information is correct.")
         
+    def diff_assistant(self, assistant, spec):
+        """
+        Compares an assistant with the desired values.
+
+        Args:
+            assistant (object): The assistant to compare.
+            spec (dict): The desired values. Keys the API doesn't accept are ignored.
+
+        Returns:
+            changes (dict): The fields whose values differ, with their desired values.
+        """
+        changes = {}
+        for key in ASSISTANT_API_KEYS:
+            if key not in spec:
+                continue
+            current, desired = getattr(assistant, key, None), spec[key]
+            if key == 'file_ids':
+                # Order doesn't matter for attached files
+                current, desired = sorted(current or []), sorted(desired or [])
+            elif key == 'tools':
+                current, desired = current or [], desired or []
+            elif key == 'metadata':
+                current, desired = current or {}, desired or {}
+            if current != desired:
+                changes[key] = spec[key]
+        return changes
+
+    def _get_spec_hash(self, spec):
+        # Normalized the same way as diff_assistant, so equal hashes mean no changes
+        content = {key: spec[key] for key in ASSISTANT_API_KEYS if key in spec}
+        if 'metadata' in content:
+            content['metadata'] = {key: value for key, value in (content['metadata'] or {}).items() if key != SPEC_HASH_KEY}
+        if 'file_ids' in content:
+            content['file_ids'] = sorted(content['file_ids'] or [])
+        if 'tools' in content:
+            content['tools'] = content['tools'] or []
+        canonical = json.dumps(content, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+    def _get_assistant_hash(self, assistant, spec):
+        # Hashes the assistant's current values of the fields the spec sets
+        return self._get_spec_hash({key: getattr(assistant, key, None) for key in ASSISTANT_API_KEYS if key in spec})
+
+    async def reconcile_assistants(self, specs, delete_missing=False, max_concurrency=8, dry_run=False):
+        """
+        Makes the assistants on the API match a list of desired specs, matched by name, issuing only the writes needed.
+
+        The assistants are fetched fresh from the API, and one is left unchanged only when the hash of its current
+        fields matches the spec's hash, so changes made elsewhere are reverted. The spec's hash is also stored in the
+        assistant's metadata, marking it as managed by reconcile. Assistants that share a spec's name beyond the one
+        kept are duplicates and are deleted. Creates, updates and deletes run concurrently.
+
+        Args:
+            specs (list): Assistant dictionaries as accepted by `create_assistant`. Names must be unique.
+            (Optional) delete_missing (bool): Also delete assistants created by a previous reconcile whose name is no longer in specs. Default is False.
+            (Optional) max_concurrency (int): The maximum number of writes running at once. Default is 8.
+            (Optional) dry_run (bool): Only plan the changes, without writing anything. Default is False.
+
+        Returns:
+            report (list): One dictionary per planned action:
+                name (str): The assistant name.
+                id (str): The assistant ID, None for creates until they're done.
+                action (str): "create", "update", "delete" or "unchanged".
+                changes (dict): The fields sent for creates and updates, None otherwise.
+                done (bool): True if the action was carried out, False on dry runs and errors.
+                error (str): The error message if the action failed, None otherwise.
+        """
+        for spec in specs:
+            self.validate_assistant(spec)
+        names = [spec['name'] for spec in specs]
+        if len(names) != len(set(names)):
+            raise ChatAssistantError("Assistant names in specs must be unique.")
+
+        # The local list may predate changes made elsewhere, which must be seen to be reverted
+        await self._apply_assistants(await self._fetch_assistants_from_api(), time.time())
+        by_name = {}
+        for assistant in sorted(self.assistants, key=lambda assistant: assistant.created_at):
+            by_name.setdefault(assistant.name, []).append(assistant)
+
+        plan = []
+        for spec in specs:
+            spec_hash = self._get_spec_hash(spec)
+            metadata = {**(spec.get('metadata') or {}), SPEC_HASH_KEY: spec_hash}
+            existing = by_name.get(spec['name'], [])
+            if not existing:
+                plan.append({"name": spec['name'], "id": None, "action": "create", "changes": {**spec, "metadata": metadata}, "spec": spec})
+                continue
+
+            # Keep the assistant already matching the spec if there is one, otherwise the oldest
+            keeper = next((assistant for assistant in existing if self._get_assistant_hash(assistant, spec) == spec_hash), existing[0])
+            if spec.get('functions'):
+                keeper.functions = spec['functions']
+            for duplicate in existing:
+                if duplicate is not keeper:
+                    plan.append({"name": duplicate.name, "id": duplicate.id, "action": "delete", "changes": None})
+
+            # The marker alone isn't trusted, as the fields may have been changed since it was written
+            if self._get_assistant_hash(keeper, spec) == spec_hash and (keeper.metadata or {}).get(SPEC_HASH_KEY) == spec_hash:
+                plan.append({"name": keeper.name, "id": keeper.id, "action": "unchanged", "changes": None})
+                continue
+            changes = self.diff_assistant(keeper, {**spec, "metadata": metadata})
+            plan.append({"name": keeper.name, "id": keeper.id, "action": "update", "changes": changes, "assistant": keeper})
+
+        if delete_missing:
+            for name, assistants in by_name.items():
+                if name in names:
+                    continue
+                for assistant in assistants:
+                    # Only touch assistants a reconcile created, never unrelated ones
+                    if SPEC_HASH_KEY in (assistant.metadata or {}):
+                        plan.append({"name": assistant.name, "id": assistant.id, "action": "delete", "changes": None})
+
+        if not dry_run:
+            await self._apply_reconcile_plan(plan, max_concurrency)
+
+        report = []
+        for item in plan:
+            report.append({
+                "name": item['name'],
+                "id": item['id'],
+                "action": item['action'],
+                "changes": {key: value for key, value in item['changes'].items() if key in ASSISTANT_API_KEYS} if item['changes'] else None,
+                "done": item.get('done', item['action'] == "unchanged"),
+                "error": item.get('error'),
+            })
+        counts = {action: sum(1 for item in report if item['action'] == action) for action in ("create", "update", "delete", "unchanged")}
+        logger.info(f"Reconciled assistants{' (dry run)' if dry_run else ''}: {counts}")
+        return report
+
+    async def _apply_reconcile_plan(self, plan, max_concurrency):
+        async def write(item):
+            try:
+                if item['action'] == "create":
+                    created = await self._create_new_assistant(item['changes'])
+                    item['id'] = created.id
+                elif item['action'] == "update":
+                    await self.update_assistant(item['assistant'], item['changes'])
+                item['done'] = True
+            except Exception as e:
+                item['done'], item['error'] = False, str(e)
+
+        writes = [item for item in plan if item['action'] in ("create", "update")]
+        deletes = [item for item in plan if item['action'] == "delete"]
+        delete_report, _ = await asyncio.gather(
+            bulk_delete(self.__http, [(item['id'], f"assistants/{item['id']}") for item in deletes], max_concurrency),
+            gather_limited(write, writes, max_concurrency))
+        for item, result in zip(deletes, delete_report):
+            item['done'], item['error'] = result['deleted'], result['error']
+            if result['deleted']:
+                self._remove_local_assistant(item['id'])
+
+    async def attach_files(self, assistant, file_ids):
+        """
+        Attaches uploaded files to an assistant, keeping the files it already has.
+
+        Args:
+            assistant (object): The assistant to attach the files to.
+            file_ids (list): The IDs of the files to attach, e.g. from `manager.files.upload_files`.
+
+        Returns:
+            assistant (object): The updated assistant.
+        """
+        merged_file_ids = list(dict.fromkeys((assistant.file_ids or []) + list(file_ids)))
+        if merged_file_ids == (assistant.file_ids or []):
+            logger.info(f"Files already attached to assistant: {assistant.name}")
+            return assistant
+        return await self.update_assistant(assistant, {"file_ids": merged_file_ids})
+
 # ---------------------------------------------------------------------------- #
 #                              Assistant Deletion                              #
 # ---------------------------------------------------------------------------- #
 
+    def _remove_local_assistant(self, assistant_id):
+        assistant = next((assistant for assistant in self.assistants if assistant.id == assistant_id), None)
+        if assistant is not None:
+            self.assistants.remove(assistant)
+            if self.active_assistant and self.active_assistant.id == assistant_id:
+                self.active_assistant = None
+        self._invalidate_cached_assistants()
+        return assistant
+
     async def delete_assistant(self, assistant_id):
         """
         Deletes an assistant by ID.
@@ -299,25 +682,81 @@ class AssistantManager:
                 id (str): The ID of the assistant that was to be deleted.
         """
         try: 
-            assistant = await self.get_assistant_by_id(assistant_id)
-            if not assistant:
-                logger.info(f"No assistant found with ID: {assistant_id}. Assuming it's already deleted.")
-                return {
-                    "deleted": True,
-                    "id": assistant_id
-                }
-
             deleted = await self.__http.request("delete", f"assistants/{assistant_id}")
-
-            if deleted['deleted']:
-                logger.info(f"Deleted assistant: {assistant.name}")
-                self.assistants.remove(assistant)
-                if self.active_assistant and self.active_assistant.id == assistant.id:
-                    self.active_assistant = None
-                return {
-                    "deleted": True,
-                    "id": assistant.id
-                }
+        except ChatAPIError as e:
+            if e.status != 404:
+                logger.error(f"Error deleting assistant: {e}")
+                raise ChatAssistantError(f"Error deleting assistant. Please ensure the id is correct.")
+            logger.info(f"No assistant found with ID: {assistant_id}. Assuming it's already deleted.")
+            deleted = {"deleted": True}
         except Exception as e:
             logger.error(f"Error deleting assistant: {e}")
-            raise ChatAssistantError(f"Error deleting assistant. Please ensure the id is correct.")
\ No newline at end of file
+            raise ChatAssistantError(f"Error deleting assistant. Please ensure the id is correct.")
+
+        if deleted['deleted']:
+            logger.info(f"Deleted assistant: {assistant_id}")
+            self._remove_local_assistant(assistant_id)
+        return {
+            "deleted": deleted['deleted'],
+            "id": assistant_id
+        }
+
+    async def delete_assistants(self, ids=None, name_pattern=None, metadata=None, older_than=None, max_concurrency=8):
+        """
+        Deletes many assistants at once. Deletes run concurrently and back off together when the API rate limits.
+
+        Assistants given by ID are always deleted. The other filters select from the synchronized list of
+        assistants and are combined, so an assistant has to match all of them.
+
+        Args:
+            (Optional) ids (list): The IDs of assistants to delete.
+            (Optional) name_pattern (str): A shell-style pattern the name has to match, e.g. "Test *".
+            (Optional) metadata (dict): Key/value pairs the assistant's metadata has to contain.
+            (Optional) older_than (float): Only delete assistants created more than this many seconds ago.
+            (Optional) max_concurrency (int): The maximum number of deletes running at once. Default is 8.
+
+        Returns:
+            report (list): One dictionary per assistant with its id, whether it was deleted, and the error if it wasn't.
+
+        Raises:
+            ChatAssistantError: If no ids or filters are given.
+        """
+        if ids is None and name_pattern is None and metadata is None and older_than is None:
+            raise ChatAssistantError("No assistants selected. Please provide ids or at least one filter.")
+
+        selected_ids = list(ids or [])
+        if name_pattern is not None or metadata is not None or older_than is not None:
+            await self.synchronize_assistants()
+            now = time.time()
+            for assistant in self.assistants:
+                if name_pattern is not None and not fnmatch.fnmatchcase(assistant.name or "", name_pattern):
+                    continue
+                if metadata is not None and any((assistant.metadata or {}).get(key) != value for key, value in metadata.items()):
+                    continue
+                if older_than is not None and now - assistant.created_at <= older_than:
+                    continue
+                selected_ids.append(assistant.id)
+        selected_ids = list(dict.fromkeys(selected_ids))
+
+        logger.info(f"Deleting {len(selected_ids)} assistants.")
+        report = await bulk_delete(
+            self.__http,
+            [(assistant_id, f"assistants/{assistant_id}") for assistant_id in selected_ids],
+            max_concurrency)
+        for result in report:
+            if result['deleted']:
+                self._remove_local_assistant(result['id'])
+        return report
+
+    async def delete_threads(self, thread_ids, max_concurrency=8):
+        """
+        Deletes many threads by ID at once, e.g. threads left behind by earlier processes.
+
+        Args:
+            thread_ids (list): The IDs of the threads to delete.
+            (Optional) max_concurrency (int): The maximum number of deletes running at once. Default is 8.
+
+        Returns:
+            report (list): One dictionary per thread with its id, whether it was deleted, and the error if it wasn't.
+        """
+        return await bulk_delete(self.__http, [(thread_id, f"threads/{thread_id}") for thread_id in thread_ids], max_concurrency)
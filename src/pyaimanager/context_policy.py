@@ -0,0 +1,60 @@
+class ContextPolicy:
+    """
+    Caps how long a conversation's thread can grow.
+
+    Every run reprocesses the whole thread, so long conversations get slower and more expensive each turn.
+    When a conversation has more than `max_messages` messages, it is rolled over in the background to a new
+    thread seeded with a summary of the older messages and the last `keep_last` messages as they were.
+
+    Initialization Parameters:
+        (Optional) max_messages (int): The number of messages after which the conversation is rolled over. Default is 40.
+        (Optional) keep_last (int): The number of recent messages copied to the new thread. Default is 6.
+        (Optional) summarizer (callable): A function, sync or async, that takes the older messages as a list of
+            {"role": str, "text": str} dictionaries (oldest first) and returns a summary string. Default is None,
+            which asks the assistant itself for the summary using `summary_instructions`.
+        (Optional) summary_instructions (str): The run instructions used when the assistant writes the summary.
+        (Optional) delete_old_threads (bool): Delete the old thread after rolling over. Default is False,
+            which keeps its ID in the conversation's previous_thread_ids.
+    """
+    DEFAULT_SUMMARY_INSTRUCTIONS = (
+        "Summarize the conversation so far for your own future reference. Keep every fact, decision, open question "
+        "and user preference needed to continue the conversation. Reply with the summary only and do not use any tools."
+    )
+
+    def __init__(self, max_messages=40, keep_last=6, summarizer=None, summary_instructions=None, delete_old_threads=False):
+        if keep_last < 0 or keep_last >= max_messages:
+            raise ValueError("keep_last must be between 0 and max_messages - 1")
+
+        self.max_messages = max_messages
+        self.keep_last = keep_last
+        self.summarizer = summarizer
+        self.summary_instructions = summary_instructions or self.DEFAULT_SUMMARY_INSTRUCTIONS
+        self.delete_old_threads = delete_old_threads
+
+    def should_roll_over(self, conversation):
+        """
+        Checks if a conversation has grown past the limit.
+
+        Args:
+            conversation (Conversation): The conversation to check.
+
+        Returns:
+            bool: True if the conversation should be rolled over to a new thread, False otherwise.
+        """
+        return conversation.get_message_count() > self.max_messages
+
+    def split_messages(self, messages):
+        """
+        Splits a thread's messages into the ones to summarize and the ones to keep.
+
+        Args:
+            messages (list): The thread's messages, newest first as returned by the API.
+
+        Returns:
+            (tuple):
+                older (list): The messages to summarize, oldest first.
+                recent (list): The messages to copy to the new thread, oldest first.
+        """
+        chronological = list(reversed(messages))
+        split_at = len(chronological) - self.keep_last
+        return chronological[:split_at], chronological[split_at:]
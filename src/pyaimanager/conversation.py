@@ -1,8 +1,13 @@
 
+import asyncio
 import uuid
 import datetime
 from .utils.logging import logger
 from .utils.exceptions import ChatAssistantError
+from .utils.usage_tracker import UsageCounter
+
+# The number of most recent messages kept in memory, the whole thread is fetched when it is needed
+MAX_KEPT_MESSAGES = 100
 
 class Conversation:
     def __init__(self, conversation):
@@ -12,8 +17,14 @@ class Conversation:
         self.created_at = datetime.datetime.now()
         self.__run = None
         self.__thread = None
-        self.messages = []
+        self.messages = []  # the most recent messages of the thread, newest first
+        self.message_count = 0  # the number of messages on the thread, including ones no longer kept in memory
         self.latest_response = None
+        self.context_policy = conversation.get('context_policy')
+        self.summary = None
+        self.previous_thread_ids = []
+        self.__rollover_task = None
+        self.__usage = UsageCounter()
 
     def set_thread(self, thread):
         self.__thread = thread
@@ -33,21 +44,62 @@ class Conversation:
     def get_run_id(self):
         return self.__run['id']
 
+    def add_usage(self, run, latency):
+        self.__usage.add(run.get('usage') or {}, latency, run['status'] != 'completed')
+
+    def get_usage(self):
+        return self.__usage.as_dict()
+
     def get_message_count(self):
-        return len(self.messages)
+        return self.message_count
     
     def set_latest_response(self, response):
         self.latest_response = response
 
     def set_messages(self, messages):
-        self.messages = messages
+        self.messages = messages[:MAX_KEPT_MESSAGES]
+        self.message_count = len(messages)
 
     def add_message(self, message):
         self.messages.append(message)
 
+    def add_new_messages(self, messages):
+        # Messages added to the thread since the newest one known, newest first
+        self.messages = (messages + self.messages)[:MAX_KEPT_MESSAGES]
+        self.message_count += len(messages)
+
+    def get_newest_message_id(self):
+        return self.messages[0]['id'] if self.messages else None
+
     def get_messages(self):
         return self.messages
 
+    def start_rollover(self, coroutine):
+        self.__rollover_task = asyncio.ensure_future(coroutine)
+
+    def is_rolling_over(self):
+        return self.__rollover_task is not None and not self.__rollover_task.done()
+
+    async def wait_for_rollover(self, timeout=None):
+        task = self.__rollover_task
+        if task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            # Give up on the new thread, the conversation stays on its current one and tries again after the next turn
+            task.cancel()
+            await asyncio.wait({task})
+        finally:
+            if self.__rollover_task is task:
+                self.__rollover_task = None
+
+    def roll_over(self, thread, messages, summary):
+        self.previous_thread_ids.append(self.get_thread_id())
+        self.__thread = thread
+        self.set_messages(messages)
+        self.summary = summary
+
     def get_messages_simple(self):
         messages = []
         for message in self.messages:
@@ -57,6 +109,9 @@ class Conversation:
     def _get_message_simple(self, message):
         print("simple message:", message)
         return {"role": message['role'], "text": message['content'][0]['text']['value']}
+
+    def _get_message_text(self, message):
+        return "\n".join(content['text']['value'] for content in message['content'] if content['type'] == 'text')
         
     
       
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from .utils.logging import logger
+
+# ---------------------------------------------------------------------------- #
+#                                  Event Types                                 #
+# ---------------------------------------------------------------------------- #
+
+@dataclass
+class Event:
+    """
+    Base class of every event emitted by an assistant. Subscribe to it to receive all events.
+    """
+    assistant_id: str
+    conversation_id: str
+    thread_id: str
+    run_id: str
+    timestamp: float = field(init=False)
+
+    def __post_init__(self):
+        self.timestamp = time.time()
+
+@dataclass
+class RunStatusEvent(Event):
+    """
+    Base class of the run status events, emitted when a run's status changes.
+    """
+    status: str
+    run: dict
+
+@dataclass
+class RunQueued(RunStatusEvent):
+    pass
+
+@dataclass
+class RunInProgress(RunStatusEvent):
+    pass
+
+@dataclass
+class RunRequiresAction(RunStatusEvent):
+    pass
+
+@dataclass
+class RunCompleted(RunStatusEvent):
+    pass
+
+@dataclass
+class RunFailed(RunStatusEvent):
+    """
+    Emitted when a run ends as failed, expired or cancelled.
+    """
+    error: str
+
+@dataclass
+class ToolCallStarted(Event):
+    tool_call_id: str
+    function_name: str
+    arguments: dict
+
+@dataclass
+class ToolCallFinished(Event):
+    """
+    Emitted when a tool function returns or raises. error is None if it returned.
+    """
+    tool_call_id: str
+    function_name: str
+    output: object
+    error: str
+    duration: float
+
+@dataclass
+class RunStepEvent(Event):
+    """
+    Emitted when a run step appears or its status changes, e.g. a tool_calls step with code_interpreter
+    output or a message_creation step. Subscribing to it makes the assistant fetch run steps while its
+    runs are in progress. Subscribers to Event only get them for streamed messages, or for every run if the
+    assistant's fetch_run_steps is set.
+    """
+    step: dict
+    step_type: str
+    status: str
+
+@dataclass
+class MessageCreated(Event):
+    """
+    Emitted for the user's message when it is sent, and for each assistant message as soon as its
+    run step completes when steps are fetched, otherwise when the run completes.
+    message is the API message object, or None when the API didn't return one.
+    """
+    role: str
+    text: str
+    message: dict
+
+
+RUN_STATUS_EVENTS = {
+    'queued': RunQueued,
+    'in_progress': RunInProgress,
+    'requires_action': RunRequiresAction,
+    'completed': RunCompleted,
+    'failed': RunFailed,
+    'expired': RunFailed,
+    'cancelled': RunFailed,
+}
+
+# ---------------------------------------------------------------------------- #
+#                                   Event Bus                                  #
+# ---------------------------------------------------------------------------- #
+
+class EventBus:
+    """
+    Delivers an assistant's events to subscribers.
+
+    Subscribers are sync or async callables that take the event. They receive every event that is an instance
+    of the type they subscribed to, so subscribing to RunStatusEvent receives all status changes and subscribing
+    to Event receives everything. A subscriber that raises is logged and doesn't affect the run.
+    """
+    def __init__(self):
+        self.__subscribers = []  # (event type, callback)
+
+    def subscribe(self, callback, event_type=Event):
+        """
+        Subscribes a callback to events of a type.
+
+        Args:
+            callback (callable): A sync or async function that takes the event.
+            (Optional) event_type (type): The event type to receive, including its subclasses. Default is Event, i.e. all events.
+
+        Returns:
+            unsubscribe (callable): A function that removes the subscription.
+        """
+        subscription = (event_type, callback)
+        self.__subscribers.append(subscription)
+
+        def unsubscribe():
+            if subscription in self.__subscribers:
+                self.__subscribers.remove(subscription)
+        return unsubscribe
+
+    def has_subscribers(self, event_type=Event):
+        """
+        Checks if anyone would receive an event of a type, so callers can skip building events no one listens to.
+
+        Args:
+            (Optional) event_type (type): The event type. Default is Event.
+
+        Returns:
+            bool: True if at least one subscriber receives events of this type.
+        """
+        return any(issubclass(event_type, subscribed_type) for subscribed_type, _ in self.__subscribers)
+
+    def has_specific_subscribers(self, event_type):
+        """
+        Checks if anyone subscribed to an event type itself or one of its subclasses, not counting subscribers
+        to its base classes such as Event.
+
+        Args:
+            event_type (type): The event type.
+
+        Returns:
+            bool: True if at least one subscriber asked for events of this type specifically.
+        """
+        return any(issubclass(subscribed_type, event_type) for subscribed_type, _ in self.__subscribers)
+
+    async def emit(self, event):
+        """
+        Delivers an event to its subscribers and waits for the async ones to finish.
+
+        Args:
+            event (Event): The event to deliver.
+        """
+        pending = []
+        for event_type, callback in list(self.__subscribers):
+            if not isinstance(event, event_type):
+                continue
+            try:
+                result = callback(event)
+                if asyncio.iscoroutine(result):
+                    pending.append(result)
+            except Exception as e:
+                logger.error(f"Error in {type(event).__name__} subscriber {callback}: {e}")
+        if pending:
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.error(f"Error in {type(event).__name__} subscriber: {result}")
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import mmap
+import os
+from .utils.logging import logger
+from .utils.exceptions import ChatFileError
+from .utils.concurrency import gather_limited
+
+class FileManager:
+    """
+    Uploads files that assistants and messages can use through their file_ids.
+
+    Files are streamed to the API in chunks, read from disk through a memory map, so memory use stays flat
+    no matter how large the file is. Every upload is indexed by the SHA-256 hash of its content, and uploading
+    the same content again returns the file that already exists instead of uploading a copy.
+
+    Initialization Parameters:
+        http_request_handler (HTTPRequest): The HTTP handler used to talk to the API.
+        (Optional) chunk_size (int): The number of bytes read and sent at a time. Default is 1 MiB.
+        (Optional) max_concurrency (int): The maximum number of uploads running at once in `upload_files`. Default is 4.
+        (Optional) cache (SharedCache): A cache shared with other processes, so content uploaded by any of them isn't uploaded again. Default is None.
+    """
+    def __init__(self, http_request_handler, chunk_size=1024 * 1024, max_concurrency=4, cache=None):
+        self.__http = http_request_handler
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.__index = {}  # content hash -> file object
+        self.__pending = {}  # content hash -> upload task, so identical concurrent uploads share one request
+
+# ---------------------------------------------------------------------------- #
+#                                Reading Files                                 #
+# ---------------------------------------------------------------------------- #
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        for offset in range(0, size, self.chunk_size):
+                            digest.update(view[offset:offset + self.chunk_size])
+                    finally:
+                        view.release()
+        return digest.hexdigest()
+
+    async def _read_file_chunks(self, path):
+        # Copying a chunk out of the memory map reads it from disk, so it runs in the executor like hashing does
+        loop = asyncio.get_running_loop()
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, size, self.chunk_size):
+                    yield await loop.run_in_executor(None, self._read_chunk, mapped, offset)
+
+    def _read_chunk(self, mapped, offset):
+        return mapped[offset:offset + self.chunk_size]
+
+    async def _hash_chunks(self, chunks, digest):
+        async for chunk in chunks:
+            digest.update(chunk)
+            yield chunk
+
+# ---------------------------------------------------------------------------- #
+#                                File Uploading                                #
+# ---------------------------------------------------------------------------- #
+
+    async def _upload(self, chunks, file_name, purpose):
+        try:
+            uploaded = await self.__http.upload("files", {"purpose": purpose}, file_name, chunks)
+            logger.info(f"Uploaded file: {file_name}, id: {uploaded['id']}")
+            return uploaded
+        except Exception as e:
+            logger.error(f"Error uploading file {file_name}: {e}")
+            raise ChatFileError(f"Error uploading file {file_name}: {e}. Please try again.")
+
+    def _get_indexed(self, content_hash):
+        if content_hash not in self.__index and self.cache is not None:
+            cached = self.cache.get(f"file:{content_hash}")
+            if cached is not None:
+                self.__index[content_hash] = cached
+        return self.__index.get(content_hash)
+
+    def _add_to_index(self, content_hash, uploaded):
+        self.__index[content_hash] = uploaded
+        if self.cache is not None:
+            self.cache.set(f"file:{content_hash}", uploaded)
+
+    async def _upload_once(self, content_hash, file_name, upload):
+        existing = self._get_indexed(content_hash)
+        if existing is not None:
+            logger.info(f"File {file_name} already uploaded as {existing['id']}, skipping upload.")
+            return existing
+        if content_hash in self.__pending:
+            return await asyncio.shield(self.__pending[content_hash])
+
+        task = asyncio.ensure_future(upload())
+        self.__pending[content_hash] = task
+        try:
+            uploaded = await task
+            self._add_to_index(content_hash, uploaded)
+            return uploaded
+        finally:
+            self.__pending.pop(content_hash, None)
+
+    async def upload_file(self, file, file_name=None, purpose="assistants"):
+        """
+        Uploads a file, or returns the existing file if the same content was uploaded before.
+
+        Args:
+            file (str, os.PathLike or AsyncIterable[bytes]): The path of the file, or an async stream of its content.
+            (Optional) file_name (str): The file name to upload with. Required for streams, defaults to the base name of the path.
+            (Optional) purpose (str): The purpose of the file. Default is "assistants".
+
+        Returns:
+            file (dict): The file object. Entries added with `load_index` only contain the file's "id".
+
+        Raises:
+            ChatFileError: If the upload fails or a stream is given without a file name.
+        """
+        if isinstance(file, (str, os.PathLike)):
+            path = os.fspath(file)
+            file_name = file_name or os.path.basename(path)
+            loop = asyncio.get_running_loop()
+            content_hash = await loop.run_in_executor(None, self._hash_file, path)
+            return await self._upload_once(content_hash, file_name, lambda: self._upload(self._read_file_chunks(path), file_name, purpose))
+
+        if file_name is None:
+            raise ChatFileError("A file_name is required when uploading from a stream.")
+
+        # The hash of a stream is only known once it has been sent
+        digest = hashlib.sha256()
+        uploaded = await self._upload(self._hash_chunks(file, digest), file_name, purpose)
+        content_hash = digest.hexdigest()
+        existing = self._get_indexed(content_hash)
+        if existing is not None:
+            logger.info(f"File {file_name} duplicates {existing['id']}, removing the new copy.")
+            await self.delete_file(uploaded['id'])
+            return existing
+        self._add_to_index(content_hash, uploaded)
+        return uploaded
+
+    async def upload_files(self, files, purpose="assistants", max_concurrency=None):
+        """
+        Uploads several files concurrently.
+
+        Args:
+            files (list): File paths, or (file, file_name) tuples for streams or custom names.
+            (Optional) purpose (str): The purpose of the files. Default is "assistants".
+            (Optional) max_concurrency (int): The maximum number of uploads running at once. Default is the manager's max_concurrency.
+
+        Returns:
+            files (list): The file objects, in the same order as the given files.
+        """
+        def upload(file):
+            if isinstance(file, tuple):
+                return self.upload_file(file[0], file[1], purpose)
+            return self.upload_file(file, purpose=purpose)
+
+        return await gather_limited(upload, files, max_concurrency or self.max_concurrency)
+
+# ---------------------------------------------------------------------------- #
+#                           File Listing and Deletion                          #
+# ---------------------------------------------------------------------------- #
+
+    async def list_files(self, purpose="assistants"):
+        """
+        Lists the files uploaded to the API.
+
+        Args:
+            (Optional) purpose (str): Only list files with this purpose. Default is "assistants".
+
+        Returns:
+            files (list): The file objects.
+        """
+        try:
+            response = await self.__http.request("get", f"files?purpose={purpose}")
+            return response['data']
+        except Exception as e:
+            logger.error(f"Error listing files: {e}")
+            raise ChatFileError(f"Error listing files: {e}. Please try again.")
+
+    async def delete_file(self, file_id):
+        """
+        Deletes an uploaded file and removes it from the content index.
+
+        Args:
+            file_id (str): The ID of the file to delete.
+
+        Returns:
+            (dict):
+                deleted (bool): True if the file was deleted, False otherwise.
+                id (str): The ID of the file.
+        """
+        try:
+            deleted = await self.__http.request("delete", f"files/{file_id}")
+        except Exception as e:
+            logger.error(f"Error deleting file {file_id}: {e}")
+            raise ChatFileError(f"Error deleting file {file_id}: {e}. Please try again.")
+        removed = [key for key, value in self.__index.items() if value['id'] == file_id]
+        for content_hash in removed:
+            del self.__index[content_hash]
+            if self.cache is not None:
+                self.cache.delete(f"file:{content_hash}")
+        return {
+            "deleted": deleted['deleted'],
+            "id": file_id
+        }
+
+# ---------------------------------------------------------------------------- #
+#                                 Content Index                                #
+# ---------------------------------------------------------------------------- #
+
+    def get_index(self):
+        """
+        Gets the content index, so it can be saved and loaded again with `load_index`.
+
+        Returns:
+            index (dict): File IDs keyed by the SHA-256 hash of their content.
+        """
+        return {content_hash: file['id'] for content_hash, file in self.__index.items()}
+
+    def load_index(self, index):
+        """
+        Adds known uploads to the content index, so their content isn't uploaded again.
+
+        Args:
+            index (dict): File IDs keyed by the SHA-256 hash of their content, as returned by `get_index`.
+        """
+        for content_hash, file_id in index.items():
+            self.__index.setdefault(content_hash, {"id": file_id})
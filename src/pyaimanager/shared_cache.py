@@ -0,0 +1,232 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Bumped when the layout of cached values changes, so processes running an older version never read them
+CACHE_FORMAT_VERSION = 1
+
+class SharedCache:
+    """
+    The interface of the caches shared between AssistantManagers, FileManagers and WorkerPool workers.
+
+    Values are JSON-serializable objects stored under string keys, with an optional time to live. Every write
+    of a key increases its version, so readers can tell if a value changed since they last applied it.
+    Leases let one of several processes take on a job, such as synchronizing assistants, while the others wait for its result.
+
+    Subclass it to use another store, e.g. Redis, by implementing `get_entry`, `set`, `delete`, `acquire_lease` and `release_lease`.
+    """
+    def get(self, key):
+        """
+        Gets a value.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            value (object): The value, or None if the key doesn't exist or has expired.
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        """
+        Gets a value with its version.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            (tuple): (value, version), or None if the key doesn't exist or has expired.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores a value.
+
+        Args:
+            key (str): The key.
+            value (object): A JSON-serializable value.
+            (Optional) ttl (float): Seconds until the value expires. Default is None, which keeps it until it is deleted.
+
+        Returns:
+            version (int): The new version of the key.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """
+        Deletes a value. Deleting a key that doesn't exist does nothing.
+
+        Args:
+            key (str): The key.
+        """
+        raise NotImplementedError
+
+    def acquire_lease(self, name, ttl):
+        """
+        Tries to take a lease. A lease that isn't released expires after ttl seconds, so a crashed holder can't block the others.
+
+        Args:
+            name (str): The name of the lease.
+            ttl (float): Seconds until the lease expires.
+
+        Returns:
+            bool: True if this cache instance now holds the lease, False if someone else does.
+        """
+        raise NotImplementedError
+
+    def release_lease(self, name):
+        """
+        Releases a lease held by this cache instance. Releasing a lease held by someone else does nothing.
+
+        Args:
+            name (str): The name of the lease.
+        """
+        raise NotImplementedError
+
+
+class MemoryCache(SharedCache):
+    """
+    A SharedCache kept in memory, shared by the managers and threads of one process.
+
+    Initialization Parameters:
+        None
+    """
+    def __init__(self):
+        self.__entries = {}  # key -> (value, version, expires_at)
+        self.__leases = {}  # name -> expires_at
+        self.__lock = threading.Lock()
+
+    def get_entry(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None or (entry[2] is not None and entry[2] <= time.time()):
+                return None
+            return entry[0], entry[1]
+
+    def set(self, key, value, ttl=None):
+        # Round trip through JSON so callers get the same copies as from a cross-process cache
+        value = json.loads(json.dumps(value))
+        with self.__lock:
+            version = self.__entries[key][1] + 1 if key in self.__entries else 1
+            self.__entries[key] = (value, version, time.time() + ttl if ttl is not None else None)
+            return version
+
+    def delete(self, key):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def acquire_lease(self, name, ttl):
+        with self.__lock:
+            now = time.time()
+            if self.__leases.get(name, 0) > now:
+                return False
+            self.__leases[name] = now + ttl
+            return True
+
+    def release_lease(self, name):
+        with self.__lock:
+            self.__leases.pop(name, None)
+
+
+class SQLiteCache(SharedCache):
+    """
+    A SharedCache stored in a SQLite database file, shared by every process on the host that opens the same file.
+
+    The database uses write-ahead logging, so readers never wait for writers. Each process and thread opens its
+    own connection. Instances can be pickled, e.g. to hand them to WorkerPool workers, and reopen the file on arrival.
+
+    Initialization Parameters:
+        path (str): The path of the database file. It is created if it doesn't exist.
+        (Optional) namespace (str): A prefix for every key, so several applications can share one file. Default is "pyaimanager".
+        (Optional) timeout (float): Seconds to wait for another process's write to finish. Default is 5.
+
+    Example:
+        cache = SQLiteCache("/tmp/pyaimanager.db")
+        manager = await AssistantManager.create(api_key, cache=cache)
+    """
+    def __init__(self, path, namespace="pyaimanager", timeout=5):
+        self.path = os.fspath(path)
+        self.namespace = namespace
+        self.timeout = timeout
+        self.__owner = uuid.uuid4().hex
+        self.__local = threading.local()
+        self._get_connection()
+
+    def __getstate__(self):
+        return {"path": self.path, "namespace": self.namespace, "timeout": self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _get_connection(self):
+        connection = getattr(self.__local, "connection", None)
+        # A forked child must not use its parent's connection
+        if connection is None or self.__local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, version INTEGER NOT NULL, expires_at REAL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases "
+                "(name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self.__local.connection = connection
+            self.__local.pid = os.getpid()
+        return connection
+
+    def _get_owner(self):
+        # Forked children share the instance but must not share its leases
+        return f"{self.__owner}:{os.getpid()}"
+
+    def _get_key(self, key):
+        return f"{self.namespace}:v{CACHE_FORMAT_VERSION}:{key}"
+
+    def get_entry(self, key):
+        row = self._get_connection().execute(
+            "SELECT value, version FROM entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (self._get_key(key), time.time())).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        row = self._get_connection().execute(
+            "INSERT INTO entries (key, value, version, expires_at) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, version = version + 1, expires_at = excluded.expires_at "
+            "RETURNING version",
+            (self._get_key(key), json.dumps(value), expires_at)).fetchone()
+        return row[0]
+
+    def delete(self, key):
+        self._get_connection().execute("DELETE FROM entries WHERE key = ?", (self._get_key(key),))
+
+    def acquire_lease(self, name, ttl):
+        now = time.time()
+        # Takes the lease if it is free, expired or already ours, in a single atomic statement
+        row = self._get_connection().execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ? OR leases.owner = excluded.owner "
+            "RETURNING owner",
+            (self._get_key(name), self._get_owner(), now + ttl, now)).fetchone()
+        return row is not None
+
+    def release_lease(self, name):
+        self._get_connection().execute(
+            "DELETE FROM leases WHERE name = ? AND owner = ?", (self._get_key(name), self._get_owner()))
+
+    def clear_expired(self):
+        """
+        Removes expired values and leases from the database file.
+        """
+        now = time.time()
+        connection = self._get_connection()
+        connection.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        connection.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
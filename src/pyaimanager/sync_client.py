@@ -0,0 +1,264 @@
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+from .utils.logging import logger
+from .assistant_manager import AssistantManager
+
+class BackgroundLoop:
+    """
+    A single event loop per process, running on a daemon thread.
+
+    Any thread can hand it a coroutine and block on the result, or get a `concurrent.futures.Future` for it.
+    Everything running on the loop shares the same connection pool and run schedulers.
+    """
+    __instance = None
+    __lock = threading.Lock()
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="pyaimanager-loop", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @classmethod
+    def get(cls):
+        """
+        Gets the background loop of this process, starting it if needed.
+
+        Returns:
+            loop (BackgroundLoop): The shared background loop.
+        """
+        with cls.__lock:
+            instance = cls.__instance
+            # A forked child inherits the object but not the thread running the loop
+            if instance is None or instance.pid != os.getpid() or not instance.thread.is_alive():
+                instance = cls.__instance = cls()
+                atexit.register(instance.stop)
+            return instance
+
+    def submit(self, coroutine):
+        """
+        Schedules a coroutine on the background loop.
+
+        Args:
+            coroutine (coroutine): The coroutine to run.
+
+        Returns:
+            future (concurrent.futures.Future): A future for the coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine, timeout=None):
+        """
+        Runs a coroutine on the background loop and blocks until it finishes.
+
+        Args:
+            coroutine (coroutine): The coroutine to run.
+            (Optional) timeout (float): Seconds to wait for the result. Default is None, which waits forever.
+
+        Returns:
+            The coroutine's result.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the coroutine didn't finish within the timeout. The coroutine is cancelled.
+        """
+        if threading.current_thread() is self.thread:
+            coroutine.close()
+            raise RuntimeError("Blocking calls can't be made from the background loop itself. Await the AssistantManager method instead.")
+        future = self.submit(coroutine)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Stop the coroutine too, e.g. so a message that timed out cancels its run
+            future.cancel()
+            raise
+
+    def stop(self):
+        """
+        Stops the background loop.
+        """
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class SyncAssistantManager:
+    """
+    A thread-safe, blocking wrapper around AssistantManager for synchronous applications such as WSGI servers.
+
+    Every call runs on one background event loop per process, so calls from different threads run concurrently
+    and share the manager's connection pool and run schedulers, instead of each call starting its own event loop.
+    Methods ending in `_future` return a `concurrent.futures.Future` instead of blocking.
+
+    Initialization Parameters:
+        api_key (str): An Open API key for the Assistant API.
+        (Optional) scheduler_config (dict): Keyword arguments for the RunScheduler given to each assistant.
+        (Optional) json_codec (str or JSONCodec): The JSON codec used for API bodies.
+        (Optional) cache (SharedCache): A cache shared with other managers and processes, e.g. a SQLiteCache.
+        (Optional) http_config (dict): Keyword arguments for the HTTPRequest, e.g. {"hedge_reads": True}.
+
+    Example:
+        manager = SyncAssistantManager(api_key)
+        assistant = manager.get_assistant_by_name("Chatbot")
+        conversation = manager.create_conversation(assistant, "Support chat")
+        response = manager.send_message(assistant, "Hello!", conversation)
+    """
+    def __init__(self, api_key, scheduler_config=None, json_codec=None, cache=None, http_config=None):
+        self.__loop = BackgroundLoop.get()
+        self.manager = self.__loop.run(AssistantManager.create(api_key, scheduler_config, json_codec, cache, http_config))
+        logger.info("SyncAssistantManager instance created")
+
+    def run(self, coroutine, timeout=None):
+        """
+        Runs any AssistantManager or Assistant coroutine on the background loop and blocks until it finishes.
+
+        Args:
+            coroutine (coroutine): The coroutine to run, e.g. manager.manager.get_assistants().
+            (Optional) timeout (float): Seconds to wait for the result. Default is None, which waits forever.
+
+        Returns:
+            The coroutine's result.
+        """
+        return self.__loop.run(coroutine, timeout)
+
+    def submit(self, coroutine):
+        """
+        Schedules any AssistantManager or Assistant coroutine on the background loop without blocking.
+
+        Args:
+            coroutine (coroutine): The coroutine to run.
+
+        Returns:
+            future (concurrent.futures.Future): A future for the coroutine's result.
+        """
+        return self.__loop.submit(coroutine)
+
+# ---------------------------------------------------------------------------- #
+#                                  Assistants                                  #
+# ---------------------------------------------------------------------------- #
+
+    def synchronize_assistants(self):
+        return self.run(self.manager.synchronize_assistants())
+
+    def create_assistant(self, assistant):
+        return self.run(self.manager.create_assistant(assistant))
+
+    def get_assistants(self):
+        return self.run(self.manager.get_assistants())
+
+    def get_assistant_by_name(self, name):
+        return self.run(self.manager.get_assistant_by_name(name))
+
+    def get_assistant_by_id(self, id):
+        return self.run(self.manager.get_assistant_by_id(id))
+
+    def update_assistant(self, assistant, updated_info):
+        return self.run(self.manager.update_assistant(assistant, updated_info))
+
+    def reconcile_assistants(self, specs, **kwargs):
+        return self.run(self.manager.reconcile_assistants(specs, **kwargs))
+
+    def delete_assistant(self, assistant_id):
+        return self.run(self.manager.delete_assistant(assistant_id))
+
+    def delete_assistants(self, **filters):
+        return self.run(self.manager.delete_assistants(**filters))
+
+    def delete_threads(self, thread_ids, max_concurrency=8):
+        return self.run(self.manager.delete_threads(thread_ids, max_concurrency))
+
+    def get_queue_metrics(self):
+        return self.run(self._get_queue_metrics())
+
+    async def _get_queue_metrics(self):
+        # Read the schedulers on the loop thread that updates them
+        return self.manager.get_queue_metrics()
+
+    def enable_profiling(self, sample_rate=0.01, max_traces=100):
+        return self.run(self._call(self.manager.enable_profiling, sample_rate, max_traces))
+
+    def disable_profiling(self):
+        return self.run(self._call(self.manager.disable_profiling))
+
+    async def _call(self, function, *args):
+        # Changes the assistants on the loop thread that uses them
+        return function(*args)
+
+    def get_usage(self, group="assistant", sort_by="total_tokens", top=None):
+        return self.run(self._get_usage(group, sort_by, top))
+
+    async def _get_usage(self, group, sort_by, top):
+        return self.manager.get_usage(group, sort_by, top)
+
+# ---------------------------------------------------------------------------- #
+#                                 Conversations                                #
+# ---------------------------------------------------------------------------- #
+
+    def create_conversation(self, assistant, title, description=None):
+        return self.run(assistant.create_conversation(title, description))
+
+    def send_message(self, assistant, message, conversation=None, **kwargs):
+        """
+        Sends a message and blocks until the assistant responds.
+
+        Args:
+            assistant (Assistant): The assistant to send the message to.
+            message (str): The message to send.
+            (Optional) conversation (object): The conversation to send the message to. Default is the assistant's active conversation.
+                Pass a conversation explicitly when several threads talk to the same assistant.
+            **kwargs: Any other `Assistant.send_message` arguments, e.g. priority, timeout or file_ids.
+
+        Returns:
+            dict: The response from the completed run.
+        """
+        return self.run(assistant.send_message(message, conversation, **kwargs))
+
+    def send_message_future(self, assistant, message, conversation=None, **kwargs):
+        """
+        Sends a message without blocking.
+
+        Returns:
+            future (concurrent.futures.Future): A future for the response from the completed run.
+        """
+        return self.submit(assistant.send_message(message, conversation, **kwargs))
+
+    def send_messages(self, messages, **kwargs):
+        """
+        Sends several messages concurrently and blocks until all of them are answered.
+
+        Args:
+            messages (list): (assistant, message, conversation) tuples.
+            **kwargs: Any other `Assistant.send_message` arguments, applied to every message, e.g. priority="batch".
+
+        Returns:
+            responses (list): The responses in the same order as the messages. Failed messages return their exception.
+        """
+        return self.run(self._send_messages(messages, **kwargs))
+
+    def send_messages_future(self, messages, **kwargs):
+        """
+        Sends several messages concurrently without blocking.
+
+        Returns:
+            future (concurrent.futures.Future): A future for the list of responses.
+        """
+        return self.submit(self._send_messages(messages, **kwargs))
+
+    async def _send_messages(self, messages, **kwargs):
+        return await asyncio.gather(
+            *(assistant.send_message(message, conversation, **kwargs) for assistant, message, conversation in messages),
+            return_exceptions=True)
+
+    def close(self):
+        """
+        Cancels runs still in progress and closes the connection pool. The background loop keeps running for other managers.
+
+        Returns:
+            cancelled (list): The IDs of the runs that were cancelled.
+        """
+        return self.run(self.manager.close())
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from .logging import logger
+from .exceptions import ChatAPIError
+from .concurrency import gather_limited
+
+async def bulk_delete(http_request_handler, items, max_concurrency=8, max_retries=3):
+    """
+    Deletes API objects concurrently, backing off when the API rate limits.
+
+    When any delete is rate limited, every delete waits until the Retry-After time has passed
+    before sending more requests. Objects that no longer exist count as deleted.
+
+    Args:
+        http_request_handler (HTTPRequest): The HTTP handler used to talk to the API.
+        items (list): (object_id, endpoint) tuples, e.g. ("thread_abc123", "threads/thread_abc123").
+        (Optional) max_concurrency (int): The maximum number of deletes running at once. Default is 8.
+        (Optional) max_retries (int): How often a rate limited or failed delete is retried. Default is 3.
+
+    Returns:
+        report (list): One dictionary per item, in the same order as the items:
+            id (str): The ID of the object.
+            deleted (bool): True if the object was deleted or didn't exist, False otherwise.
+            error (str): The error message if the delete failed, None otherwise.
+    """
+    resume_at = 0.0
+
+    async def delete(item):
+        nonlocal resume_at
+        object_id, endpoint = item
+        for attempt in range(max_retries + 1):
+            delay = resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                deleted = await http_request_handler.request("delete", endpoint)
+                return {"id": object_id, "deleted": bool(deleted.get('deleted')), "error": None}
+            except ChatAPIError as e:
+                if e.status == 404:
+                    logger.info(f"{object_id} not found, assuming it's already deleted.")
+                    return {"id": object_id, "deleted": True, "error": None}
+                retryable = e.status == 429 or (e.status is not None and e.status >= 500)
+                if not retryable or attempt == max_retries:
+                    logger.error(f"Error deleting {object_id}: {e}")
+                    return {"id": object_id, "deleted": False, "error": str(e)}
+                backoff = e.retry_after if e.retry_after is not None else 2 ** attempt
+                resume_at = max(resume_at, time.monotonic() + backoff)
+                logger.warning(f"Delete of {object_id} got status {e.status}, retrying in {backoff}s.")
+            except Exception as e:
+                logger.error(f"Error deleting {object_id}: {e}")
+                return {"id": object_id, "deleted": False, "error": str(e)}
+
+    report = await gather_limited(delete, items, max_concurrency)
+    logger.info(f"Bulk delete finished: {sum(1 for result in report if result['deleted'])}/{len(report)} deleted.")
+    return report
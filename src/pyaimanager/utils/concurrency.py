@@ -0,0 +1,22 @@
+import asyncio
+
+async def gather_limited(function, items, limit, return_exceptions=False):
+    """
+    Runs an async function for every item, with at most `limit` calls running at once.
+
+    Args:
+        function (callable): An async function that takes a single item.
+        items (iterable): The items to run the function for.
+        limit (int): The maximum number of calls running at the same time.
+        (Optional) return_exceptions (bool): Return exceptions as results instead of raising the first one. Default is False.
+
+    Returns:
+        results (list): The results, in the same order as the items.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item):
+        async with semaphore:
+            return await function(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=return_exceptions)
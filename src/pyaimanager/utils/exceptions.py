@@ -4,14 +4,26 @@ class AssistantManagerError(Exception):
 class ChatRunError(Exception):
     pass
 
+class ChatRunTimeoutError(ChatRunError):
+    pass
+
 class ChatMessageError(Exception):
     pass
 
 class ChatAPIError(Exception):
-    pass
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
 
 class ChatAssistantError(Exception):
     pass
 
 class ChatConversationError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class ChatQueueError(Exception):
+    pass
+
+class ChatFileError(Exception):
+    pass
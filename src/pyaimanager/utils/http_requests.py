@@ -1,23 +1,95 @@
-import aiohttp
-import json
+import asyncio
+import re
+import time
+from collections import deque
 # import logger
 from .logging import logger
+from .json_codec import get_codec
+from .exceptions import ChatAPIError
+from .profiler import profile_span
 
 import logging
 
+# Path segments that are object IDs, e.g. "thread_abc123", so latencies are kept per kind of endpoint
+ID_SEGMENT = re.compile(r"^[a-z]+_[A-Za-z0-9]+$")
+
 class HTTPRequest:
-    def __init__(self, api_key):
+    def __init__(self, api_key, codec=None, max_connections=100, dedupe_reads=True, hedge_reads=False,
+                 hedge_percentile=0.95, hedge_min_delay=0.05, hedge_max_delay=2.0, hedge_min_samples=20):
         """
         Initialize a new HTTPRequest instance.
 
+        Requests share one connection pool, created on first use in the running event loop. The pool belongs to that loop,
+        so use an HTTPRequest from one event loop, e.g. a single `asyncio.run` or the SyncAssistantManager's background loop,
+        and close it before the loop ends. Used from another loop, it opens a new pool and closes the old one on its loop
+        if that loop is still running, otherwise the old pool's connections are leaked and a warning is logged.
+
+        GET requests are idempotent, so two tricks cut their tail latency. Identical GETs sent while one is
+        already in flight wait for that response instead of sending their own, and each caller decodes its own copy,
+        so a GET that joins one may see the state from when that one was sent.
+        With hedging, a GET that hasn't answered after the usual time for its endpoint (its recent 95th percentile
+        latency) is sent a second time, usually on another connection. The first response wins and the other request is cancelled.
+
         Args:
             api_key (str): The API key to use for requests.
+            (Optional) codec (str or JSONCodec): The JSON codec for request and response bodies, see `get_codec`. Default is the fastest installed backend.
+            (Optional) max_connections (int): The maximum number of open connections in the pool. Default is 100.
+            (Optional) dedupe_reads (bool): Share the response of identical GETs in flight at the same time. Default is True.
+            (Optional) hedge_reads (bool): Send a second copy of slow GETs. Default is False.
+            (Optional) hedge_percentile (float): The latency percentile of an endpoint after which its GETs are hedged. Default is 0.95.
+            (Optional) hedge_min_delay (float): The shortest wait in seconds before hedging. Default is 0.05.
+            (Optional) hedge_max_delay (float): The longest wait in seconds before hedging, also used until an
+                endpoint has hedge_min_samples latencies. Default is 2.0.
+            (Optional) hedge_min_samples (int): The number of latencies an endpoint needs before its percentile is used. Default is 20.
         """
         self.api_key = api_key
+        self.codec = get_codec(codec)
         self.base_url = "https://api.openai.com/v1/"
+        self.max_connections = max_connections
+        self.dedupe_reads = dedupe_reads
+        self.hedge_reads = hedge_reads
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_delay = hedge_max_delay
+        self.hedge_min_samples = hedge_min_samples
         self.logger = logging.getLogger(__name__)
+        self.__session = None
+        self.__session_loop = None
+        self.__pending_reads = {}  # URL -> task fetching it
+        self.__latencies = {}  # endpoint kind -> recent GET latencies in seconds
+        self.__stats = {"reads": 0, "deduplicated": 0, "hedged": 0, "hedge_wins": 0}
+
+    def _get_session(self):
+        # aiohttp is imported on the first request rather than with the package
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        # A session is bound to the loop it was created in
+        if self.__session is None or self.__session.closed or self.__session_loop is not loop:
+            if self.__session is not None and not self.__session.closed:
+                self._close_stale_session(self.__session, self.__session_loop)
+            self.__session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections))
+            self.__session_loop = loop
+        return self.__session
+
+    def _close_stale_session(self, session, loop):
+        # A session can only be closed on its own loop, which may be running in another thread
+        if loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            self.logger.warning("The connection pool was created in an event loop that has stopped, so its connections "
+                                "can't be closed. Use one event loop per HTTPRequest and close it before the loop ends.")
 
-    async def request(self, request_type, endpoint, data=None):
+    async def close(self):
+        """
+        Closes the connection pool. A new one is created if more requests are sent afterwards.
+        """
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+        self.__session = None
+        self.__session_loop = None
+
+    async def request(self, request_type, endpoint, data=None, response_type=None):
         """
         Send an HTTP request.
 
@@ -25,47 +97,202 @@ class HTTPRequest:
             request_type (str): The type of the request ('get', 'post', 'put', 'delete').
             endpoint (str): The endpoint to send the request to.
             data (dict, optional): The data to send with the request.
+            response_type (type, optional): A type to decode the response into, e.g. a dataclass or msgspec.Struct.
+
+        Returns:
+            dict: The response from the server, or an instance of response_type if given.
+        """
+        url = self.base_url + endpoint
+        headers = self._get_headers("application/json")
+
+        request_type = request_type.lower()
+        if request_type not in ('get', 'post', 'put', 'delete'):
+            raise ValueError("Invalid request type")
+        with profile_span(f"{request_type.upper()} {self._get_endpoint_kind(url)}", "http", endpoint=endpoint):
+            if request_type == 'get':
+                raw = await self._read(url)
+            else:
+                body = self.codec.encode(data) if data is not None and request_type in ('post', 'put') else None
+                self.logger.debug(f"Sending {request_type} request to {url} with data {data}")
+                async with self._get_session().request(request_type, url, headers=headers, data=body) as response:
+                    raw = await self._read_response(response)
+            with profile_span("decode", "json", size=len(raw)):
+                return self.codec.decode(raw, response_type)
+
+# ---------------------------------------------------------------------------- #
+#                                     Reads                                    #
+# ---------------------------------------------------------------------------- #
+
+    async def _read(self, url):
+        """
+        Sends a GET request, sharing the response with identical GETs already in flight.
+
+        Returns:
+            bytes: The raw response body, decoded by each caller so no one shares a mutable response.
+        """
+        self.__stats['reads'] += 1
+        if not self.dedupe_reads:
+            return await self._read_hedged(url)
+
+        loop = asyncio.get_running_loop()
+        pending = self.__pending_reads.get(url)
+        if pending is not None and not pending.done() and pending.get_loop() is loop:
+            self.__stats['deduplicated'] += 1
+        else:
+            pending = loop.create_task(self._read_hedged(url))
+            self.__pending_reads[url] = pending
+            pending.add_done_callback(lambda task: self._forget_read(url, task))
+        # One caller giving up must not cancel the request for the others
+        return await asyncio.shield(pending)
+
+    def _forget_read(self, url, task):
+        if self.__pending_reads.get(url) is task:
+            del self.__pending_reads[url]
+        if not task.cancelled():
+            task.exception()  # Retrieved here in case every caller gave up
+
+    async def _read_hedged(self, url):
+        if not self.hedge_reads:
+            return await self._read_once(url)
+
+        primary = asyncio.ensure_future(self._read_once(url))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._get_hedge_delay(url))
+            if not done:
+                self.__stats['hedged'] += 1
+                self.logger.debug(f"GET {url} is slow, sending a hedged request.")
+                tasks.add(asyncio.ensure_future(self._read_once(url)))
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    error = task.exception()
+                    if error is None:
+                        if task is not primary:
+                            self.__stats['hedge_wins'] += 1
+                        return task.result()
+                    # The other copy can only help with errors that may not happen again
+                    retryable = not isinstance(error, ChatAPIError) or error.status is None or error.status == 429 or error.status >= 500
+                    if not tasks or not retryable:
+                        raise error
+        finally:
+            for task in tasks:
+                if task.done() and not task.cancelled():
+                    task.exception()
+                task.cancel()
+
+    async def _read_once(self, url):
+        self.logger.debug(f"Sending get request to {url}")
+        started = time.monotonic()
+        async with self._get_session().get(url, headers=self._get_headers("application/json")) as response:
+            body = await self._read_response(response)
+        self._record_latency(url, time.monotonic() - started)
+        return body
+
+    def _get_endpoint_kind(self, url):
+        path = url[len(self.base_url):].split("?", 1)[0]
+        return "/".join("{id}" if ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+    def _record_latency(self, url, latency):
+        kind = self._get_endpoint_kind(url)
+        latencies = self.__latencies.get(kind)
+        if latencies is None:
+            latencies = self.__latencies[kind] = deque(maxlen=200)
+        latencies.append(latency)
+
+    def _get_hedge_delay(self, url):
+        latencies = self.__latencies.get(self._get_endpoint_kind(url))
+        if latencies is None or len(latencies) < self.hedge_min_samples:
+            return self.hedge_max_delay
+        ordered = sorted(latencies)
+        percentile = ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile))]
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, percentile))
+
+    def get_metrics(self):
+        """
+        Gets the GET request metrics.
+
+        Returns:
+            metrics (dict):
+                reads (int): GET requests made by callers.
+                deduplicated (int): GETs that shared the response of an identical GET in flight.
+                hedged (int): GETs that were sent a second time because they were slow.
+                hedge_wins (int): Hedged GETs answered first by the second copy.
+                hedge_delays (dict): The current wait before hedging, in seconds, per kind of endpoint.
+        """
+        return {
+            **self.__stats,
+            "hedge_delays": {kind: self._get_hedge_delay(self.base_url + kind) for kind in self.__latencies},
+        }
+
+    async def upload(self, endpoint, fields, file_name, chunks):
+        """
+        Send a multipart file upload. The file is streamed with chunked transfer encoding,
+        so it is never held in memory as a whole.
+
+        Args:
+            endpoint (str): The endpoint to send the upload to.
+            fields (dict): Extra form fields to send with the file, e.g. {"purpose": "assistants"}.
+            file_name (str): The file name to report to the server.
+            chunks (AsyncIterable[bytes]): The file content.
 
         Returns:
             dict: The response from the server.
         """
+        import aiohttp
+
         url = self.base_url + endpoint
+        # aiohttp sets the multipart Content-Type and boundary itself
+        headers = self._get_headers()
+
+        form = aiohttp.FormData()
+        for name, value in fields.items():
+            form.add_field(name, value)
+        form.add_field("file", chunks, filename=file_name, content_type="application/octet-stream")
+
+        self.logger.debug(f"Uploading {file_name} to {url} with fields {fields}")
+        async with self._get_session().post(url, headers=headers, data=form) as response:
+            return await self._handle_response(response)
+
+    def _get_retry_after(self, response):
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    def _get_headers(self, content_type=None):
         headers = {
-            "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
             "OpenAI-Beta": "assistants=v1",
-        } 
-
-        session = aiohttp.ClientSession()
-        self.logger.debug(f"Sending {request_type} request to {url} with data {data}")
-        if request_type.lower() == 'get':
-            response = await session.get(url, headers=headers)
-        elif request_type.lower() == 'post':
-            response = await session.post(url, headers=headers, data=json.dumps(data))
-        elif request_type.lower() == 'put':
-            response = await session.put(url, headers=headers, data=json.dumps(data))
-        elif request_type.lower() == 'delete':
-            response = await session.delete(url, headers=headers)
-        else:
-            session.close()
-            raise ValueError("Invalid request type")
-
-        result = await self._handle_response(response)
-        await session.close()
-        return result
+        }
+        if content_type:
+            headers["Content-Type"] = content_type
+        return headers
 
-    async def _handle_response(self, response):
+    async def _handle_response(self, response, response_type=None):
         """
         Handle the response from an HTTP request.
 
         Args:
             response (aiohttp.ClientResponse): The response to handle.
+            response_type (type, optional): A type to decode the response into.
 
         Returns:
             dict: The parsed JSON response.
+
+        Raises:
+            ChatAPIError: If the response status is not 2xx. The error carries the status code and,
+                for rate limited requests, the number of seconds to wait from the Retry-After header.
         """
-        if not 200 <= response.status < 300:
-            self.logger.error(f"HTTP request failed with status code {response.status}, response: {await response.text()}")
-            raise Exception(f"HTTP request failed with status code {response.status}, response: {await response.text()}")
+        return self.codec.decode(await self._read_response(response), response_type)
 
-        return await response.json()
\ No newline at end of file
+    async def _read_response(self, response):
+        if not 200 <= response.status < 300:
+            text = await response.text()
+            self.logger.error(f"HTTP request failed with status code {response.status}, response: {text}")
+            raise ChatAPIError(
+                f"HTTP request failed with status code {response.status}, response: {text}",
+                status=response.status,
+                retry_after=self._get_retry_after(response))
+        return await response.read()
\ No newline at end of file
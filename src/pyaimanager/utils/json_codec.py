@@ -0,0 +1,119 @@
+import dataclasses
+import json
+
+class JSONCodec:
+    """
+    Encodes request bodies and decodes response bodies using the standard library `json` module.
+
+    Codecs work on bytes so bodies can be sent and read without building intermediate strings.
+    Subclasses swap in a faster backend.
+    """
+    name = "json"
+
+    def encode(self, obj):
+        """
+        Encodes an object to JSON.
+
+        Args:
+            obj (object): The object to encode.
+
+        Returns:
+            bytes: The UTF-8 encoded JSON.
+        """
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data, type=None):
+        """
+        Decodes JSON into Python objects.
+
+        Args:
+            data (bytes or str): The JSON to decode.
+            (Optional) type (type): A dataclass or other type to build from the decoded object. Default is None, which returns plain dicts and lists.
+
+        Returns:
+            The decoded object.
+        """
+        return self._convert(json.loads(data), type)
+
+    def _convert(self, obj, type):
+        if type is None:
+            return obj
+        if dataclasses.is_dataclass(type) and isinstance(obj, dict):
+            # Ignore keys the dataclass doesn't declare, the API adds fields over time
+            field_names = {field.name for field in dataclasses.fields(type)}
+            return type(**{key: value for key, value in obj.items() if key in field_names})
+        return type(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec backed by `orjson`, if it is installed.
+    """
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.__orjson = orjson
+
+    def encode(self, obj):
+        return self.__orjson.dumps(obj)
+
+    def decode(self, data, type=None):
+        return self._convert(self.__orjson.loads(data), type)
+
+
+class MsgspecCodec(JSONCodec):
+    """
+    JSON codec backed by `msgspec`, if it is installed. Typed decoding goes straight into
+    `msgspec.Struct` or dataclass types without building intermediate dicts.
+    """
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self.__msgspec = msgspec
+        self.__encoder = msgspec.json.Encoder()
+        self.__decoder = msgspec.json.Decoder()
+
+    def encode(self, obj):
+        return self.__encoder.encode(obj)
+
+    def decode(self, data, type=None):
+        if type is None:
+            return self.__decoder.decode(data)
+        return self.__msgspec.json.decode(data, type=type)
+
+
+CODECS = {
+    JSONCodec.name: JSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+def get_codec(codec=None):
+    """
+    Gets a JSON codec.
+
+    Args:
+        (Optional) codec (str or JSONCodec): "json", "orjson", "msgspec", "auto" or a codec instance.
+            Default is None, which behaves like "auto" and picks the fastest installed backend.
+
+    Returns:
+        codec (JSONCodec): The codec to use.
+
+    Raises:
+        ValueError: If the codec name is unknown.
+        ImportError: If the requested backend isn't installed.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is None or codec == "auto":
+        for codec_class in (OrjsonCodec, MsgspecCodec):
+            try:
+                return codec_class()
+            except ImportError:
+                continue
+        return JSONCodec()
+    if codec not in CODECS:
+        raise ValueError(f"Unknown JSON codec: {codec}. Expected one of {list(CODECS)} or 'auto'.")
+    return CODECS[codec]()
@@ -12,8 +12,11 @@ console_handler.setLevel(logging.WARNING)
 console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
 
-log_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chat.log')
-file_handler = RotatingFileHandler(log_file_path, maxBytes=10485760, backupCount=1)
-file_handler.setLevel(logging.INFO)
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
\ No newline at end of file
+# Set PYAIMANAGER_LOG_FILE to move the log file, or to an empty string to turn file logging off.
+# The file is only opened when the first record is written, so importing the package has no file side effects.
+log_file_path = os.environ.get('PYAIMANAGER_LOG_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chat.log'))
+if log_file_path:
+    file_handler = RotatingFileHandler(log_file_path, maxBytes=10485760, backupCount=1, delay=True)
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
\ No newline at end of file
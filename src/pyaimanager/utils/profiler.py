@@ -0,0 +1,259 @@
+import asyncio
+import contextvars
+import json
+import os
+import random
+import time
+from collections import deque
+
+# The span that new spans are added to, set while a sampled turn is running in the current task
+_current_span = contextvars.ContextVar("pyaimanager_current_span", default=None)
+
+class Span:
+    """
+    A timed section of a turn, e.g. an HTTP request or a poll sleep, with the spans that ran inside it.
+    Times are seconds from `time.perf_counter`.
+    """
+    __slots__ = ("name", "category", "args", "start", "end", "lane", "children")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = time.perf_counter()
+        self.end = None
+        self.lane = _get_lane()
+        self.children = []
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "category": self.category,
+            "args": self.args,
+            "start": self.start,
+            "duration": (self.end or time.perf_counter()) - self.start,
+            "children": [child.as_dict() for child in self.children],
+        }
+
+
+class _SpanContext:
+    __slots__ = ("span", "token", "on_exit")
+
+    def __init__(self, span, on_exit=None):
+        self.span = span
+        self.on_exit = on_exit
+
+    def __enter__(self):
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.args = {**self.span.args, "error": exc_type.__name__}
+        _current_span.reset(self.token)
+        if self.on_exit is not None:
+            self.on_exit(self.span)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return None
+
+_NO_SPAN = _NoSpan()
+
+def _get_lane():
+    # Spans of concurrent tasks can overlap, so each task gets its own lane in the exported timeline
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else 0
+
+def profile_span(name, category, **args):
+    """
+    Times a section of code as part of the turn being profiled. Does nothing, cheaply, when no sampled turn is running.
+
+    Args:
+        name (str): The name of the span, e.g. "GET threads/{id}/runs/{id}".
+        category (str): The kind of work, e.g. "http", "json", "sleep", "tool" or "queue".
+        **args: Details shown with the span.
+
+    Returns:
+        A context manager for the span.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NO_SPAN
+    span = Span(name, category, args)
+    parent.children.append(span)
+    return _SpanContext(span)
+
+
+class Profiler:
+    """
+    Records a tree of timed spans for each profiled `send_message` turn: the wait for a run slot, every API
+    request and the JSON decoding of its response, each poll sleep and each tool function call.
+
+    Only a sample of the turns is recorded, so the profiler can stay on in production. The most recent traces
+    are kept and can be exported for the Chrome trace viewer (chrome://tracing or https://ui.perfetto.dev)
+    or for https://www.speedscope.app.
+
+    Initialization Parameters:
+        (Optional) sample_rate (float): The share of turns to record, between 0 and 1. Default is 1.0.
+        (Optional) max_traces (int): The number of recent traces to keep. Default is 100.
+    """
+    def __init__(self, sample_rate=1.0, max_traces=100):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.__traces = deque(maxlen=max_traces)  # (root span, wall clock start)
+        self.__random = random.Random()
+
+    def trace(self, name, **args):
+        """
+        Records a turn if it is sampled. Inside a turn that is already being recorded, this adds a span to it instead.
+
+        Args:
+            name (str): The name of the turn, e.g. "send_message".
+            **args: Details shown with the turn, e.g. the assistant and conversation IDs.
+
+        Returns:
+            A context manager for the turn's root span.
+        """
+        if _current_span.get() is not None:
+            return profile_span(name, "turn", **args)
+        if self.__random.random() >= self.sample_rate:
+            return _NO_SPAN
+        wall_start = time.time()
+        return _SpanContext(Span(name, "turn", args), lambda span: self.__traces.append((span, wall_start)))
+
+    def get_traces(self):
+        """
+        Gets the recorded traces, oldest first.
+
+        Returns:
+            traces (list): The root span of each turn as nested dictionaries with name, category, args,
+                start, duration (in seconds) and children.
+        """
+        return [span.as_dict() for span, _ in list(self.__traces)]
+
+    def clear(self):
+        """
+        Drops the recorded traces.
+        """
+        self.__traces.clear()
+
+# ---------------------------------------------------------------------------- #
+#                                   Exporting                                  #
+# ---------------------------------------------------------------------------- #
+
+    def _get_lanes(self):
+        # Splits every trace into lanes of properly nested spans, one per task that ran part of the turn
+        lanes = []
+        for number, (root, wall_start) in enumerate(list(self.__traces)):
+            tops = {}
+            pending = [(root, None)]
+            while pending:
+                span, parent_lane = pending.pop()
+                if span.lane != parent_lane:
+                    tops.setdefault(span.lane, []).append(span)
+                pending.extend((child, span.lane) for child in span.children)
+            for index, spans in enumerate(tops.values()):
+                name = f"{root.name} #{number + 1}" + (f" task {index}" if index else "")
+                lanes.append((name, root, wall_start, sorted(spans, key=lambda span: span.start)))
+        return lanes
+
+    def to_chrome_trace(self):
+        """
+        Converts the recorded traces to the Chrome trace event format.
+
+        Returns:
+            trace (dict): A JSON-serializable trace, with one row per turn and task.
+        """
+        events = []
+        pid = os.getpid()
+        for tid, (name, root, wall_start, spans) in enumerate(self._get_lanes(), start=1):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+            pending = list(spans)
+            while pending:
+                span = pending.pop()
+                end = span.end if span.end is not None else time.perf_counter()
+                events.append({
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (wall_start + span.start - root.start) * 1e6,
+                    "dur": (end - span.start) * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": span.args,
+                })
+                pending.extend(child for child in span.children if child.lane == span.lane)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_speedscope(self):
+        """
+        Converts the recorded traces to the speedscope file format.
+
+        Returns:
+            profile (dict): A JSON-serializable profile, with one evented profile per turn and task.
+        """
+        frames = {}
+        profiles = []
+
+        def get_frame(span):
+            return frames.setdefault((span.name, span.category), len(frames))
+
+        for name, root, _, spans in self._get_lanes():
+            events = []
+
+            def add(span, parent_end):
+                start = span.start - root.start
+                end = min(span.end if span.end is not None else time.perf_counter(), parent_end) - root.start
+                events.append({"type": "O", "frame": get_frame(span), "at": start})
+                for child in sorted(span.children, key=lambda child: child.start):
+                    if child.lane == span.lane:
+                        add(child, end + root.start)
+                events.append({"type": "C", "frame": get_frame(span), "at": max(start, end)})
+
+            for span in spans:
+                add(span, float("inf"))
+            profiles.append({
+                "type": "evented",
+                "name": name,
+                "unit": "seconds",
+                "startValue": events[0]['at'],
+                "endValue": events[-1]['at'],
+                "events": events,
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": f"{name} ({category})"} for name, category in frames]},
+            "profiles": profiles,
+            "name": "pyaimanager",
+            "exporter": "pyaimanager",
+        }
+
+    def export(self, path, format="chrome"):
+        """
+        Writes the recorded traces to a file.
+
+        Args:
+            path (str): The path of the file to write.
+            (Optional) format (str): "chrome" for the Chrome trace viewer or "speedscope". Default is "chrome".
+        """
+        if format == "chrome":
+            data = self.to_chrome_trace()
+        elif format == "speedscope":
+            data = self.to_speedscope()
+        else:
+            raise ValueError(f"Unknown profile format: {format}. Expected 'chrome' or 'speedscope'.")
+        with open(path, "w") as file:
+            json.dump(data, file)
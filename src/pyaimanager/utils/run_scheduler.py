@@ -0,0 +1,191 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from .logging import logger
+from .exceptions import ChatQueueError
+from .profiler import profile_span
+
+# Lower rank is admitted first.
+PRIORITIES = {
+    "interactive": 0,
+    "batch": 1,
+}
+
+class RunScheduler:
+    """
+    Admission control for the runs of a single assistant.
+
+    Each call to `Assistant.send_message` takes a slot before it starts a run and gives it back when the run is done.
+    When all slots are busy, requests wait in a bounded priority queue. Interactive requests are always admitted
+    ahead of batch requests, and `reserved_interactive` slots are kept for interactive work only, so background
+    jobs can never take the whole capacity.
+
+    Initialization Parameters:
+        max_in_flight (int): The maximum number of runs in progress at the same time. Default is 4.
+        max_queue_size (int): The maximum number of waiting requests, or None for no limit. Default is 64.
+        queue_timeout (float): Seconds a request may wait for a slot before it is dropped, or None to wait forever. Default is 30.
+        reserved_interactive (int): Slots that batch requests may not use. Default is 1.
+    """
+    def __init__(self, max_in_flight=4, max_queue_size=64, queue_timeout=30, reserved_interactive=1):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if not 0 <= reserved_interactive < max_in_flight:
+            raise ValueError("reserved_interactive must be between 0 and max_in_flight - 1")
+
+        self.max_in_flight = max_in_flight
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        self.reserved_interactive = reserved_interactive
+
+        self.__waiters = []  # heap of (rank, sequence, future, queued_at)
+        self.__sequence = itertools.count()
+        self.__in_flight = {name: 0 for name in PRIORITIES}
+        self.__stats = {
+            name: {"admitted": 0, "rejected": 0, "shed": 0, "queue_time_total": 0.0, "queue_time_max": 0.0}
+            for name in PRIORITIES
+        }
+
+    def _get_rank(self, priority):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}. Expected one of {list(PRIORITIES)}.")
+        return PRIORITIES[priority]
+
+    def _get_priority_name(self, rank):
+        return next(name for name, value in PRIORITIES.items() if value == rank)
+
+    def _can_admit(self, rank):
+        in_flight = sum(self.__in_flight.values())
+        if in_flight >= self.max_in_flight:
+            return False
+        if rank > PRIORITIES["interactive"] and in_flight >= self.max_in_flight - self.reserved_interactive:
+            return False
+        return True
+
+    def _prune_waiters(self):
+        # Drop waiters that timed out or were cancelled while queued
+        while self.__waiters and self.__waiters[0][2].done():
+            heapq.heappop(self.__waiters)
+
+    def _get_queue_depth(self, rank=None):
+        return sum(1 for waiter in self.__waiters if not waiter[2].done() and (rank is None or waiter[0] == rank))
+
+    def _has_waiters_ahead(self, rank):
+        return any(not waiter[2].done() and waiter[0] <= rank for waiter in self.__waiters)
+
+    def _admit(self, rank, queued_at):
+        name = self._get_priority_name(rank)
+        waited = time.monotonic() - queued_at
+        self.__in_flight[name] += 1
+        self.__stats[name]["admitted"] += 1
+        self.__stats[name]["queue_time_total"] += waited
+        self.__stats[name]["queue_time_max"] = max(self.__stats[name]["queue_time_max"], waited)
+
+    def _wake_waiters(self):
+        self._prune_waiters()
+        while self.__waiters and self._can_admit(self.__waiters[0][0]):
+            rank, _, future, queued_at = heapq.heappop(self.__waiters)
+            self._admit(rank, queued_at)
+            future.set_result(None)
+            self._prune_waiters()
+
+    async def acquire(self, priority="interactive", timeout=None):
+        """
+        Waits for a free run slot.
+
+        Args:
+            (Optional) priority (str): "interactive" or "batch". Default is "interactive".
+            (Optional) timeout (float): Seconds to wait before the request is dropped. Default is the scheduler's queue_timeout.
+
+        Raises:
+            ChatQueueError: If the queue is full or the request waited longer than the timeout.
+        """
+        rank = self._get_rank(priority)
+        timeout = self.queue_timeout if timeout is None else timeout
+        queued_at = time.monotonic()
+
+        if not self._has_waiters_ahead(rank) and self._can_admit(rank):
+            self._admit(rank, queued_at)
+            return
+
+        if self.max_queue_size is not None and self._get_queue_depth() >= self.max_queue_size:
+            self.__stats[priority]["rejected"] += 1
+            logger.warning(f"Run queue full ({self.max_queue_size} waiting), rejecting {priority} request.")
+            raise ChatQueueError(f"The run queue is full ({self.max_queue_size} waiting). Please try again later.")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.__waiters, (rank, next(self.__sequence), future, queued_at))
+        logger.debug(f"Queued {priority} request, queue depth: {self._get_queue_depth()}")
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the timeout fired
+                self.release(priority)
+            self.__stats[priority]["shed"] += 1
+            logger.warning(f"Dropped {priority} request after waiting {timeout}s for a run slot.")
+            raise ChatQueueError(f"Request waited longer than {timeout}s for a run slot. Please try again later.")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(priority)
+            raise
+
+    def release(self, priority="interactive"):
+        """
+        Gives back a run slot taken with `acquire` and admits the next waiting request.
+
+        Args:
+            (Optional) priority (str): The priority the slot was acquired with. Default is "interactive".
+        """
+        self._get_rank(priority)
+        if self.__in_flight[priority] <= 0:
+            raise RuntimeError(f"release() called without a matching acquire() for priority {priority}")
+        self.__in_flight[priority] -= 1
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def slot(self, priority="interactive", timeout=None):
+        """
+        Context manager that holds a run slot for the duration of the block.
+
+        Args:
+            (Optional) priority (str): "interactive" or "batch". Default is "interactive".
+            (Optional) timeout (float): Seconds to wait before the request is dropped. Default is the scheduler's queue_timeout.
+        """
+        with profile_span("queue wait", "queue", priority=priority):
+            await self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def get_metrics(self):
+        """
+        Gets the current queue depth, in-flight runs and counters per priority.
+
+        Returns:
+            metrics (dict): A dictionary with the following keys:
+                in_flight (int): The number of runs currently holding a slot.
+                queue_depth (int): The number of requests currently waiting.
+                priorities (dict): Per-priority in_flight, queue_depth, admitted, rejected, shed,
+                    queue_time_avg and queue_time_max values, keyed by priority name.
+        """
+        priorities = {}
+        for name, rank in PRIORITIES.items():
+            stats = self.__stats[name]
+            priorities[name] = {
+                "in_flight": self.__in_flight[name],
+                "queue_depth": self._get_queue_depth(rank),
+                "admitted": stats["admitted"],
+                "rejected": stats["rejected"],
+                "shed": stats["shed"],
+                "queue_time_avg": stats["queue_time_total"] / stats["admitted"] if stats["admitted"] else 0.0,
+                "queue_time_max": stats["queue_time_max"],
+            }
+        return {
+            "in_flight": sum(self.__in_flight.values()),
+            "queue_depth": self._get_queue_depth(),
+            "priorities": priorities,
+        }
@@ -0,0 +1,209 @@
+import asyncio
+import time
+from collections import OrderedDict
+from .logging import logger
+
+# The groups usage is counted by, and the name of their key in reports
+GROUPS = {
+    "assistant": "assistant_id",
+    "model": "model",
+    "conversation": "conversation_id",
+}
+
+class UsageCounter:
+    """
+    Running totals of the runs of one assistant, model or conversation.
+    """
+    __slots__ = ("runs", "failed", "prompt_tokens", "completion_tokens", "total_tokens", "latency_total", "latency_max")
+
+    def __init__(self):
+        self.runs = 0
+        self.failed = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def add(self, usage, latency, failed):
+        self.runs += 1
+        self.failed += int(failed)
+        self.prompt_tokens += usage.get('prompt_tokens') or 0
+        self.completion_tokens += usage.get('completion_tokens') or 0
+        self.total_tokens += usage.get('total_tokens') or 0
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def as_dict(self):
+        return {
+            "runs": self.runs,
+            "failed": self.failed,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "latency_total": self.latency_total,
+            "latency_max": self.latency_max,
+            "latency_avg": self.latency_total / self.runs if self.runs else 0.0,
+        }
+
+
+class UsageTracker:
+    """
+    Adds up the tokens and latency of finished runs per assistant, model and conversation.
+
+    Every run that completes or fails is recorded with the token usage reported on the run object and the
+    seconds from creating the run to its last status. Counters for conversations are capped at `max_conversations`,
+    dropping the conversations that haven't had a run for the longest time first.
+
+    Initialization Parameters:
+        (Optional) max_conversations (int): The maximum number of conversations to keep counters for. Default is 10000.
+    """
+    def __init__(self, max_conversations=10000):
+        self.max_conversations = max_conversations
+        self.__counters = {group: OrderedDict() for group in GROUPS}
+        self.__totals = UsageCounter()
+        self.__started_at = time.time()
+        self.__export_task = None
+
+    def record(self, run, assistant_id, conversation_id, latency, model=None):
+        """
+        Records a finished run.
+
+        Args:
+            run (dict): The run object, with its usage if the API reported it.
+            assistant_id (str): The ID of the assistant that ran it.
+            conversation_id (str): The ID of the conversation it ran in.
+            latency (float): Seconds from creating the run to its last status.
+            (Optional) model (str): The model, if the run object doesn't say. Default is None.
+        """
+        usage = run.get('usage') or {}
+        failed = run.get('status') != 'completed'
+        keys = {
+            "assistant": assistant_id,
+            "model": run.get('model') or model,
+            "conversation": conversation_id,
+        }
+        self.__totals.add(usage, latency, failed)
+        for group, key in keys.items():
+            counters = self.__counters[group]
+            counter = counters.get(key)
+            if counter is None:
+                counter = counters[key] = UsageCounter()
+            else:
+                counters.move_to_end(key)
+            counter.add(usage, latency, failed)
+
+        conversations = self.__counters['conversation']
+        while len(conversations) > self.max_conversations:
+            conversations.popitem(last=False)
+
+    def get_usage(self, group="assistant", sort_by="total_tokens", top=None):
+        """
+        Gets the usage counters of a group, largest first.
+
+        Args:
+            (Optional) group (str): "assistant", "model" or "conversation". Default is "assistant".
+            (Optional) sort_by (str): The counter to sort by, e.g. "total_tokens", "runs" or "latency_total". Default is "total_tokens".
+            (Optional) top (int): Only return this many entries. Default is None, which returns all of them.
+
+        Returns:
+            usage (list): One dictionary per assistant, model or conversation, with its key (e.g. "assistant_id") and its counters:
+                runs, failed, prompt_tokens, completion_tokens, total_tokens, latency_total, latency_max and latency_avg.
+        """
+        if group not in GROUPS:
+            raise ValueError(f"Unknown usage group: {group}. Expected one of {list(GROUPS)}.")
+        usage = [{GROUPS[group]: key, **counter.as_dict()} for key, counter in self.__counters[group].items()]
+        usage.sort(key=lambda entry: entry[sort_by], reverse=True)
+        return usage[:top] if top is not None else usage
+
+    def get_totals(self):
+        """
+        Gets the counters of all runs together.
+
+        Returns:
+            totals (dict): The same counters as `get_usage` returns per entry.
+        """
+        return self.__totals.as_dict()
+
+    def get_snapshot(self, include_conversations=True):
+        """
+        Gets every counter, e.g. to export them.
+
+        Args:
+            (Optional) include_conversations (bool): Include the per-conversation counters. Default is True.
+
+        Returns:
+            snapshot (dict):
+                started_at (float): When counting started, as a Unix timestamp.
+                ended_at (float): When the snapshot was taken, as a Unix timestamp.
+                totals (dict): The counters of all runs.
+                assistants (list): The counters per assistant.
+                models (list): The counters per model.
+                conversations (list): The counters per conversation, if included.
+        """
+        snapshot = {
+            "started_at": self.__started_at,
+            "ended_at": time.time(),
+            "totals": self.get_totals(),
+            "assistants": self.get_usage("assistant"),
+            "models": self.get_usage("model"),
+        }
+        if include_conversations:
+            snapshot["conversations"] = self.get_usage("conversation")
+        return snapshot
+
+    def reset(self):
+        """
+        Clears every counter.
+        """
+        self.__counters = {group: OrderedDict() for group in GROUPS}
+        self.__totals = UsageCounter()
+        self.__started_at = time.time()
+
+# ---------------------------------------------------------------------------- #
+#                                   Exporting                                  #
+# ---------------------------------------------------------------------------- #
+
+    def start_export(self, exporter, interval=60, reset=True):
+        """
+        Hands a snapshot of the counters to an exporter every interval, e.g. to write them to a metrics system.
+        Must be called from a running event loop. Starting a new export stops the previous one.
+
+        Args:
+            exporter (callable): A sync or async function that takes the snapshot returned by `get_snapshot`.
+            (Optional) interval (float): Seconds between exports. Default is 60.
+            (Optional) reset (bool): Clear the counters after each export, so every snapshot covers one interval. Default is True.
+        """
+        self.stop_export()
+        self.__export_task = asyncio.ensure_future(self._export_periodically(exporter, interval, reset))
+
+    def stop_export(self):
+        """
+        Stops the periodic export.
+        """
+        if self.__export_task is not None:
+            self.__export_task.cancel()
+            self.__export_task = None
+
+    async def export(self, exporter, reset=True):
+        """
+        Hands a snapshot of the counters to an exporter once.
+
+        Args:
+            exporter (callable): A sync or async function that takes the snapshot returned by `get_snapshot`.
+            (Optional) reset (bool): Clear the counters after the export. Default is True.
+        """
+        snapshot = self.get_snapshot()
+        if reset:
+            self.reset()
+        try:
+            result = exporter(snapshot)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"Error exporting usage: {e}")
+
+    async def _export_periodically(self, exporter, interval, reset):
+        while True:
+            await asyncio.sleep(interval)
+            await self.export(exporter, reset)
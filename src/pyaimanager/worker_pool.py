@@ -0,0 +1,366 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+from collections import OrderedDict
+from .utils.logging import logger
+from .utils.exceptions import ChatAssistantError, ChatMessageError
+
+class WorkerPool:
+    """
+    Spreads conversations over several worker processes so one host can use all of its cores
+    for JSON handling, tool functions and logging.
+
+    Every conversation is owned by one worker, picked by a stable hash of its conversation key, and each
+    worker runs its own AssistantManager and event loop. Messages for the same conversation are handled
+    in the order they were sent; different conversations run concurrently.
+
+    Tool functions are sent to the workers, so they must be picklable (plain module-level functions).
+
+    Initialization Parameters:
+        api_key (str): An Open API key for the Assistant API.
+        (Optional) workers (int): The number of worker processes. Default is the number of CPUs.
+        (Optional) functions (dict): Tool functions keyed by name, given to every assistant in the workers.
+        (Optional) scheduler_config (dict): Keyword arguments for the RunScheduler of each assistant in each worker.
+        (Optional) json_codec (str): The JSON codec name used by the workers.
+        (Optional) start_method (str): The multiprocessing start method. Default is "spawn".
+        (Optional) cache (SharedCache): A cache shared by the workers, e.g. a SQLiteCache. Only one worker fetches the
+            assistants when they are stale, and the thread of each conversation key is kept in it, so a conversation
+            continues on the same thread after a worker restarts or the pool is resized. Default is None.
+        (Optional) http_config (dict): Keyword arguments for the HTTPRequest of each worker, e.g. {"hedge_reads": True}.
+        (Optional) max_conversations (int): The maximum number of conversations each worker keeps in memory. The least
+            recently used ones are dropped first; with a cache they continue on their thread when they get another message,
+            without one they start a new thread. Default is 10000.
+
+    Example:
+        with WorkerPool(api_key, workers=8, functions=functions) as pool:
+            response = await pool.send_message(assistant_id, "Hello!", conversation_key=session_id)
+    """
+    def __init__(self, api_key, workers=None, functions=None, scheduler_config=None, json_codec=None, start_method="spawn", cache=None, http_config=None, max_conversations=10000):
+        self.workers = workers or os.cpu_count() or 1
+        self.__config = {
+            "api_key": api_key,
+            "functions": functions,
+            "scheduler_config": scheduler_config,
+            "json_codec": json_codec,
+            "cache": cache,
+            "http_config": http_config,
+            "max_conversations": max_conversations,
+        }
+        self.__context = multiprocessing.get_context(start_method)
+        self.__processes = []
+        self.__request_queues = []
+        self.__result_queue = None
+        self.__reader = None
+        self.__pending = {}  # request ID -> (worker index, future)
+        self.__pending_lock = threading.Lock()
+        self.__request_ids = itertools.count()
+        self.__running = False
+
+    def start(self):
+        """
+        Starts the worker processes.
+
+        Returns:
+            pool (WorkerPool): This pool.
+        """
+        if self.__running:
+            return self
+        self.__result_queue = self.__context.Queue()
+        for index in range(self.workers):
+            request_queue = self.__context.Queue()
+            process = self.__context.Process(
+                target=_run_worker,
+                args=(index, self.__config, request_queue, self.__result_queue),
+                name=f"pyaimanager-worker-{index}",
+                daemon=True)
+            process.start()
+            self.__request_queues.append(request_queue)
+            self.__processes.append(process)
+        self.__running = True
+        self.__reader = threading.Thread(target=self._read_results, name="pyaimanager-pool-reader", daemon=True)
+        self.__reader.start()
+        logger.info(f"Started worker pool with {self.workers} workers.")
+        return self
+
+    def get_worker_index(self, conversation_key):
+        """
+        Gets the worker that owns a conversation. The hash is stable across processes and restarts.
+
+        Args:
+            conversation_key (str): The conversation key.
+
+        Returns:
+            index (int): The index of the owning worker.
+        """
+        digest = hashlib.blake2b(str(conversation_key).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.workers
+
+# ---------------------------------------------------------------------------- #
+#                                   Dispatching                                #
+# ---------------------------------------------------------------------------- #
+
+    def _submit(self, worker_index, operation, payload):
+        if not self.__running:
+            raise ChatAssistantError("The worker pool is not running. Please call start() first.")
+        request_id = next(self.__request_ids)
+        future = concurrent.futures.Future()
+        with self.__pending_lock:
+            self.__pending[request_id] = (worker_index, future)
+        self.__request_queues[worker_index].put((request_id, operation, payload))
+        return future
+
+    def _read_results(self):
+        while self.__running or self.__pending:
+            try:
+                item = self.__result_queue.get(timeout=1)
+            except queue.Empty:
+                self._fail_dead_workers()
+                continue
+            if item is None:
+                break
+            request_id, succeeded, value = item
+            with self.__pending_lock:
+                _, future = self.__pending.pop(request_id, (None, None))
+            if future is None:
+                continue
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _fail_dead_workers(self):
+        dead = {index for index, process in enumerate(self.__processes) if not process.is_alive()}
+        if not dead:
+            return
+        with self.__pending_lock:
+            failed = [request_id for request_id, (index, _) in self.__pending.items() if index in dead]
+            for request_id in failed:
+                _, future = self.__pending.pop(request_id)
+                future.set_exception(ChatAssistantError(f"Worker process exited before answering request {request_id}."))
+        if failed:
+            logger.error(f"Workers {sorted(dead)} exited, failed {len(failed)} pending requests.")
+
+    def send_message_future(self, assistant_id, message, conversation_key, **kwargs):
+        """
+        Sends a message to the worker that owns the conversation without blocking.
+
+        Args:
+            assistant_id (str): The ID of the assistant to send the message to.
+            message (str): The message to send.
+            conversation_key (str): A stable ID for the conversation, e.g. a session ID or thread ID.
+            **kwargs: Any other `Assistant.send_message` arguments, e.g. priority or timeout.
+
+        Returns:
+            future (concurrent.futures.Future): A future for the response from the completed run.
+        """
+        payload = {
+            "assistant_id": assistant_id,
+            "message": message,
+            "conversation_key": conversation_key,
+            "kwargs": kwargs,
+        }
+        return self._submit(self.get_worker_index(conversation_key), "send_message", payload)
+
+    async def send_message(self, assistant_id, message, conversation_key, **kwargs):
+        """
+        Sends a message to the worker that owns the conversation and waits for the response.
+
+        Args:
+            assistant_id (str): The ID of the assistant to send the message to.
+            message (str): The message to send.
+            conversation_key (str): A stable ID for the conversation, e.g. a session ID or thread ID.
+            **kwargs: Any other `Assistant.send_message` arguments, e.g. priority or timeout.
+
+        Returns:
+            dict: The response from the completed run.
+        """
+        return await asyncio.wrap_future(self.send_message_future(assistant_id, message, conversation_key, **kwargs))
+
+    def get_metrics(self, timeout=10):
+        """
+        Collects and adds up the metrics of every worker.
+
+        Args:
+            (Optional) timeout (float): Seconds to wait for each worker. Default is 10.
+
+        Returns:
+            metrics (dict):
+                handled (int): Messages answered across all workers.
+                failed (int): Messages that raised an error across all workers.
+                conversations (int): Conversations owned across all workers.
+                workers (list): The metrics of each worker, including its run queue metrics and token usage.
+        """
+        futures = [self._submit(index, "metrics", None) for index in range(self.workers)]
+        workers = [future.result(timeout) for future in futures]
+        return {
+            "handled": sum(worker['handled'] for worker in workers),
+            "failed": sum(worker['failed'] for worker in workers),
+            "conversations": sum(worker['conversations'] for worker in workers),
+            "workers": workers,
+        }
+
+    def close(self, timeout=30):
+        """
+        Stops the workers after they finish the messages already sent to them. Each worker cancels runs still in progress.
+
+        Args:
+            (Optional) timeout (float): Seconds to wait for each worker to exit. Default is 30.
+        """
+        if not self.__running:
+            return
+        for request_queue in self.__request_queues:
+            request_queue.put(None)
+        for process in self.__processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Worker {process.name} did not exit in time, terminating it.")
+                process.terminate()
+        self.__running = False
+        self._fail_dead_workers()
+        self.__result_queue.put(None)
+        self.__reader.join(timeout)
+        self.__processes = []
+        self.__request_queues = []
+        logger.info("Worker pool stopped.")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------------------------- #
+#                                Worker Process                                #
+# ---------------------------------------------------------------------------- #
+
+def _run_worker(index, config, request_queue, result_queue):
+    asyncio.run(_Worker(index, config, request_queue, result_queue).serve())
+
+
+class _Worker:
+    def __init__(self, index, config, request_queue, result_queue):
+        self.index = index
+        self.config = config
+        self.request_queue = request_queue
+        self.result_queue = result_queue
+        self.manager = None
+        # (assistant ID, conversation key) -> the assistant, its Conversation, a lock keeping the conversation's messages
+        # in order and the number of messages holding or waiting for the lock; least recently used first
+        self.conversations = OrderedDict()
+        self.max_conversations = config.get('max_conversations', 10000)
+        self.handled = 0
+        self.failed = 0
+
+    async def serve(self):
+        from .assistant_manager import AssistantManager
+
+        self.manager = AssistantManager(self.config['api_key'], self.config['scheduler_config'], self.config['json_codec'], self.config['cache'], self.config['http_config'])
+        loop = asyncio.get_running_loop()
+        tasks = set()
+        while True:
+            request = await loop.run_in_executor(None, self.request_queue.get)
+            if request is None:
+                break
+            task = asyncio.create_task(self.handle(*request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.manager.close()
+
+    async def handle(self, request_id, operation, payload):
+        try:
+            if operation == "send_message":
+                value = await self.send_message(**payload)
+                self.handled += 1
+            elif operation == "metrics":
+                value = self.get_metrics()
+            else:
+                raise ValueError(f"Unknown worker operation: {operation}")
+            self.respond(request_id, True, value)
+        except Exception as e:
+            if operation == "send_message":
+                self.failed += 1
+            self.respond(request_id, False, e)
+
+    def respond(self, request_id, succeeded, value):
+        try:
+            pickle.dumps(value)
+        except Exception as e:
+            # Anything put on the queue has to be picklable, or the queue drops it silently
+            succeeded, value = False, ChatMessageError(f"Worker {self.index} could not send back the result: {e}")
+        self.result_queue.put((request_id, succeeded, value))
+
+    async def get_assistant(self, assistant_id):
+        assistant = await self.manager.get_assistant_by_id(assistant_id)
+        if assistant is None:
+            raise ChatAssistantError(f"No assistant found with ID: {assistant_id}.")
+        if self.config['functions'] and not assistant.functions:
+            assistant.functions = self.config['functions']
+        return assistant
+
+    async def send_message(self, assistant_id, message, conversation_key, kwargs):
+        key = (assistant_id, conversation_key)
+        entry = self.conversations.get(key)
+        if entry is None:
+            entry = self.conversations[key] = {"assistant": None, "conversation": None, "lock": asyncio.Lock(), "pending": 0}
+        self.conversations.move_to_end(key)
+        entry['pending'] += 1
+        try:
+            async with entry['lock']:
+                assistant = await self.get_assistant(assistant_id)
+                cache = self.manager.cache
+                cache_key = f"thread:{assistant_id}:{conversation_key}"
+                if entry['conversation'] is None:
+                    conversation = await assistant.create_conversation(str(conversation_key))
+                    thread_id = cache.get(cache_key) if cache is not None else None
+                    if thread_id is not None:
+                        # Continue the thread another worker, or this one before dropping the conversation, started for this key
+                        conversation.set_thread({"id": thread_id})
+                    entry['assistant'], entry['conversation'] = assistant, conversation
+                conversation = entry['conversation']
+                response = await assistant.send_message(message, conversation, **kwargs)
+                if cache is not None and cache.get(cache_key) != conversation.get_thread_id():
+                    cache.set(cache_key, conversation.get_thread_id())
+                return response
+        finally:
+            entry['pending'] -= 1
+            if entry['conversation'] is None and not entry['pending']:
+                # The first message failed before the conversation was created
+                del self.conversations[key]
+            self.evict_conversations()
+
+    def evict_conversations(self):
+        # Drops the least recently used conversations, but never one with messages holding or waiting for its lock
+        excess = len(self.conversations) - self.max_conversations
+        for key, entry in list(self.conversations.items()):
+            if excess <= 0:
+                break
+            if entry['pending']:
+                continue
+            del self.conversations[key]
+            excess -= 1
+            assistant, conversation = entry['assistant'], entry['conversation']
+            if conversation is not None and conversation in assistant.conversations:
+                assistant.conversations.remove(conversation)
+                if assistant.active_conversation is conversation:
+                    assistant.active_conversation = None
+
+    def get_metrics(self):
+        return {
+            "worker": self.index,
+            "pid": os.getpid(),
+            "handled": self.handled,
+            "failed": self.failed,
+            "conversations": len(self.conversations),
+            "queues": self.manager.get_queue_metrics(),
+            "usage": self.manager.usage.get_snapshot(include_conversations=False),
+            "http": self.manager.get_http_metrics(),
+        }
@@ -0,0 +1,276 @@
+import asyncio
+import itertools
+import os
+import sys
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pyaimanager.utils.json_codec import JSONCodec
+from pyaimanager.utils.exceptions import ChatAPIError
+
+class FakeAPI:
+    """
+    An in-memory stand-in for HTTPRequest that answers the Assistants API endpoints the library uses,
+    so the control flow can be tested offline.
+
+    Runs go through the statuses in `statuses`, one per poll, and stay on the last one. When a run polls as
+    "requires_action" it asks for `tool_calls`, and when it polls as "completed" the assistant replies with
+    `reply` on its thread. Every request is recorded in `calls` as (method, endpoint, data).
+
+    Initialization Parameters:
+        (Optional) statuses (list or callable): The run statuses returned by successive polls, or a function building
+            them from the run. Default is ["completed"].
+        (Optional) tool_calls (list): (function name, arguments dict) tuples requested on "requires_action".
+        (Optional) steps (list): The run steps returned by successive step fetches, staying on the last one. Each entry is
+            a list of steps, or a function that builds it from the run and its thread's messages.
+        (Optional) reply (str or callable): The text of the assistant's reply, or a function building it from the
+            thread's messages, oldest first. Default is "Hello!".
+        (Optional) usage (dict): The usage reported on finished runs.
+        (Optional) poll_delay (float): Seconds each run poll takes. Default is 0.
+        (Optional) upload_delay (float): Seconds each file upload takes. Default is 0.
+    """
+    def __init__(self, statuses=("completed",), tool_calls=(), steps=(), reply="Hello!", usage=None, poll_delay=0, upload_delay=0):
+        self.codec = JSONCodec()
+        self.statuses = statuses if callable(statuses) else list(statuses)
+        self.tool_calls = list(tool_calls)
+        self.steps = list(steps)
+        self.reply = reply
+        self.usage = usage
+        self.poll_delay = poll_delay
+        self.upload_delay = upload_delay
+        self.calls = []
+        self.uploads = []  # (file name, content) of every upload
+        self.uploads_in_flight = 0
+        self.max_uploads_in_flight = 0
+        self.threads = {}  # thread ID -> messages, oldest first
+        self.runs = {}  # run ID -> run
+        self.assistants = {}  # assistant ID -> assistant
+        self.failures = {}  # (method, endpoint) -> statuses to fail with, in order
+        self.__polls = {}  # run ID -> number of polls
+        self.__step_fetches = 0
+        self.__ids = itertools.count(1)
+
+    def _new_id(self, prefix):
+        return f"{prefix}_{next(self.__ids)}"
+
+    def fail(self, method, endpoint, *statuses):
+        """
+        Makes the next requests to an endpoint fail with the given HTTP statuses, one per request.
+        """
+        self.failures.setdefault((method, endpoint), []).extend(statuses)
+
+    def get_calls(self, method=None, contains=""):
+        return [call for call in self.calls if (method is None or call[0] == method) and contains in call[1]]
+
+    def add_thread(self, texts):
+        """
+        Creates a thread with alternating user and assistant messages.
+
+        Returns:
+            thread_id (str): The ID of the new thread.
+        """
+        thread_id = self._new_id("thread")
+        self.threads[thread_id] = []
+        for index, text in enumerate(texts):
+            self._add_message(thread_id, "user" if index % 2 == 0 else "assistant", text)
+        return thread_id
+
+    def _add_message(self, thread_id, role, text, run_id=None):
+        message = {
+            "id": self._new_id("msg"),
+            "object": "thread.message",
+            "thread_id": thread_id,
+            "role": role,
+            "run_id": run_id,
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+        }
+        self.threads[thread_id].append(message)
+        return message
+
+    def _new_run(self, thread_id, assistant_id, instructions=None):
+        run = {"id": self._new_id("run"), "object": "thread.run", "thread_id": thread_id, "assistant_id": assistant_id,
+               "instructions": instructions, "status": "queued", "model": "gpt-4", "usage": None}
+        self.runs[run['id']] = run
+        return dict(run)
+
+    def _poll_run(self, run_id):
+        run = self.runs[run_id]
+        if run['status'] in ('cancelling', 'cancelled'):
+            run['status'] = 'cancelled'
+            return dict(run)
+        polls = self.__polls.get(run_id, 0)
+        self.__polls[run_id] = polls + 1
+        statuses = self.statuses(run) if callable(self.statuses) else self.statuses
+        status = statuses[min(polls, len(statuses) - 1)]
+        if status != run['status'] and status == 'completed':
+            reply = self.reply(self.threads[run['thread_id']]) if callable(self.reply) else self.reply
+            self._add_message(run['thread_id'], "assistant", reply, run_id)
+        run['status'] = status
+        run['required_action'] = None
+        run['last_error'] = None
+        if status == 'requires_action':
+            run['required_action'] = {"type": "submit_tool_outputs", "submit_tool_outputs": {"tool_calls": [
+                {"id": f"call_{index}", "type": "function", "function": {"name": name, "arguments": self.codec.encode(arguments).decode()}}
+                for index, (name, arguments) in enumerate(self.tool_calls)
+            ]}}
+        if status == 'failed':
+            run['last_error'] = {"code": "server_error", "message": "Something went wrong"}
+        if status in ('completed', 'failed', 'expired', 'cancelled'):
+            run['usage'] = self.usage
+        return dict(run)
+
+    def _list_messages(self, thread_id, query):
+        limit = int(query.get('limit', ['20'])[0])
+        messages = list(reversed(self.threads[thread_id]))
+        if query.get('order', ['desc'])[0] == 'asc':
+            messages.reverse()
+        if 'after' in query:
+            ids = [message['id'] for message in messages]
+            messages = messages[ids.index(query['after'][0]) + 1:]
+        page = messages[:limit]
+        return {"object": "list", "data": page, "first_id": page[0]['id'] if page else None,
+                "last_id": page[-1]['id'] if page else None, "has_more": len(messages) > limit}
+
+    def _list_steps(self, run_id, query):
+        steps = self.steps[min(self.__step_fetches, len(self.steps) - 1)] if self.steps else []
+        self.__step_fetches += 1
+        if callable(steps):
+            run = self.runs[run_id]
+            steps = steps(run, self.threads[run['thread_id']])
+        if 'after' in query:
+            ids = [step['id'] for step in steps]
+            steps = steps[ids.index(query['after'][0]) + 1:]
+        return {"object": "list", "data": steps, "has_more": False, "last_id": steps[-1]['id'] if steps else None}
+
+    async def request(self, method, endpoint, data=None, response_type=None):
+        self.calls.append((method, endpoint, data))
+        failures = self.failures.get((method, endpoint))
+        if failures:
+            status = failures.pop(0)
+            raise ChatAPIError(f"HTTP request failed with status code {status}", status=status,
+                               retry_after=0.05 if status == 429 else None)
+
+        path, _, query_string = endpoint.partition("?")
+        query = parse_qs(query_string)
+        parts = path.split("/")
+        await asyncio.sleep(0)
+
+        if parts[0] == "assistants":
+            return self._assistants(method, parts, data)
+        if parts[0] == "files":
+            return {"id": f"file_{path}", "deleted": True} if method == "delete" else {"data": []}
+        if parts[0] != "threads":
+            raise ChatAPIError(f"Unknown endpoint {endpoint}", status=404)
+
+        if method == "post" and path == "threads/runs":
+            thread_id = self.add_thread([])
+            for message in data['thread']['messages']:
+                self._add_message(thread_id, "user", message['content'])
+            return self._new_run(thread_id, data['assistant_id'])
+        if method == "post" and path == "threads":
+            thread_id = self.add_thread([])
+            for message in data.get('messages', []):
+                self._add_message(thread_id, "user", message['content'])
+            return {"id": thread_id, "object": "thread"}
+
+        thread_id = parts[1]
+        if thread_id not in self.threads:
+            raise ChatAPIError(f"No thread found with id '{thread_id}'", status=404)
+        rest = parts[2:]
+        if not rest:
+            if method == "delete":
+                del self.threads[thread_id]
+                return {"id": thread_id, "deleted": True}
+            return {"id": thread_id, "object": "thread"}
+        if rest[0] == "messages":
+            if method == "post":
+                return self._add_message(thread_id, "user", data['content'])
+            if len(rest) == 2:
+                return next(message for message in self.threads[thread_id] if message['id'] == rest[1])
+            return self._list_messages(thread_id, query)
+        if rest[0] == "runs":
+            if len(rest) == 1:
+                return self._new_run(thread_id, data['assistant_id'], data.get('instructions'))
+            run_id = rest[1]
+            if len(rest) == 2:
+                if self.poll_delay:
+                    await asyncio.sleep(self.poll_delay)
+                return self._poll_run(run_id)
+            if rest[2] == "cancel":
+                self.runs[run_id]['status'] = "cancelling"
+                return dict(self.runs[run_id])
+            if rest[2] == "submit_tool_outputs":
+                return dict(self.runs[run_id])
+            if rest[2] == "steps":
+                return self._list_steps(run_id, query)
+        raise ChatAPIError(f"Unknown endpoint {endpoint}", status=404)
+
+    def add_assistant(self, **fields):
+        """
+        Creates an assistant, as if it had been created through the API.
+
+        Returns:
+            assistant (dict): The new assistant.
+        """
+        assistant = {"id": self._new_id("asst"), "object": "assistant", "created_at": next(self.__ids), "name": None,
+                     "description": None, "model": "gpt-4", "instructions": None, "tools": [], "file_ids": [], "metadata": {}, **fields}
+        self.assistants[assistant['id']] = assistant
+        return dict(assistant)
+
+    def _assistants(self, method, parts, data):
+        if len(parts) == 1:
+            if method == "get":
+                return {"object": "list", "data": [dict(assistant) for assistant in self.assistants.values()], "has_more": False}
+            return self.add_assistant(**data)
+        assistant_id = parts[1]
+        if assistant_id not in self.assistants:
+            raise ChatAPIError(f"No assistant found with id '{assistant_id}'", status=404)
+        if method == "delete":
+            del self.assistants[assistant_id]
+            return {"id": assistant_id, "deleted": True}
+        if method == "post":
+            self.assistants[assistant_id].update(data)
+        return dict(self.assistants[assistant_id])
+
+    async def upload(self, endpoint, fields, file_name, chunks):
+        self.calls.append(("upload", endpoint, fields))
+        self.uploads_in_flight += 1
+        self.max_uploads_in_flight = max(self.max_uploads_in_flight, self.uploads_in_flight)
+        try:
+            content = b"".join([bytes(chunk) async for chunk in chunks])
+            await asyncio.sleep(self.upload_delay)
+        finally:
+            self.uploads_in_flight -= 1
+        failures = self.failures.get(("upload", endpoint))
+        if failures:
+            status = failures.pop(0)
+            raise ChatAPIError(f"HTTP request failed with status code {status}", status=status)
+        self.uploads.append((file_name, content))
+        return {"id": self._new_id("file"), "object": "file", "bytes": len(content), "filename": file_name, **fields}
+
+    def get_metrics(self):
+        return {"reads": len(self.get_calls("get"))}
+
+    async def close(self):
+        pass
+
+
+def make_assistant(api, functions=None, **kwargs):
+    """
+    Builds an Assistant that talks to a FakeAPI and polls without waiting.
+    """
+    from pyaimanager.assistant import Assistant
+
+    assistant = Assistant({
+        "id": "asst_test",
+        "object": "assistant",
+        "name": "Test Assistant",
+        "created_at": 0,
+        "description": None,
+        "model": "gpt-4",
+        "instructions": "You are a test assistant.",
+        "functions": functions,
+    }, api, **kwargs)
+    assistant._Assistant__update_interval = 0
+    return assistant
@@ -0,0 +1,34 @@
+import asyncio
+from base_test import BaseTest
+
+class TestBulkDelete(BaseTest):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.loop.run_until_complete(super().setUp())
+
+    async def test_delete_assistants_by_name_pattern(self):
+        # create a few assistants to clean up
+        created = []
+        for index in range(3):
+            created.append(await self.manager.create_assistant({**self.test_assistant, "name": f"Bulk Test Assistant {index}"}))
+
+        # delete them all in one call
+        report = await self.manager.delete_assistants(name_pattern="Bulk Test Assistant *")
+        deleted_ids = {result['id'] for result in report if result['deleted']}
+        for assistant in created:
+            self.assertIn(assistant.id, deleted_ids, f"Assistant {assistant.name} should have been deleted.")
+
+        # check that they were removed from the list
+        for assistant in created:
+            local_assistant = await self.manager.get_assistant_by_id(assistant.id)
+            self.assertIsNone(local_assistant, "Assistant was not removed from the list.")
+
+    async def test_delete_conversations(self):
+        assistant = await self.manager.create_assistant(self.test_assistant)
+        conversation = await assistant.create_conversation("Bulk Test Conversation")
+        await assistant.send_message("Hello!", conversation)
+
+        report = await assistant.delete_conversations(conversation_ids=[conversation.id])
+        self.assertEqual(report, [{"id": conversation.id, "deleted": True, "error": None}])
+        self.assertNotIn(conversation, assistant.conversations)
+        await super().tearDown()
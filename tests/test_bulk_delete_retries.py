@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI, make_assistant
+from pyaimanager.utils.bulk_delete import bulk_delete
+from pyaimanager.utils.exceptions import ChatAPIError
+
+class FakeDeleteHandler:
+    """
+    Answers deletes with the next scripted error of the endpoint, or as deleted once its script has run out.
+    Scripted errors are (status, retry_after) tuples. Every request is recorded with its time.
+    """
+    def __init__(self, errors=None):
+        self.errors = {endpoint: list(statuses) for endpoint, statuses in (errors or {}).items()}
+        self.requests = []
+
+    async def request(self, method, endpoint, data=None, response_type=None):
+        self.requests.append((endpoint, time.monotonic()))
+        await asyncio.sleep(0)
+        errors = self.errors.get(endpoint)
+        if errors:
+            status, retry_after = errors.pop(0)
+            raise ChatAPIError(f"HTTP request failed with status code {status}", status=status, retry_after=retry_after)
+        return {"id": endpoint.split("/")[-1], "deleted": True}
+
+    def get_attempts(self, endpoint):
+        return [at for requested, at in self.requests if requested == endpoint]
+
+def make_items(count):
+    return [(f"thread_{index}", f"threads/thread_{index}") for index in range(count)]
+
+class TestBulkDeleteRetries(unittest.TestCase):
+    def test_rate_limit_backs_off_every_delete(self):
+        handler = FakeDeleteHandler({"threads/thread_0": [(429, 0.2)]})
+        started = time.monotonic()
+        report = asyncio.run(bulk_delete(handler, make_items(6), max_concurrency=2))
+
+        self.assertTrue(all(result['deleted'] for result in report))
+        self.assertGreaterEqual(handler.get_attempts("threads/thread_0")[1] - started, 0.2)
+
+        # Deletes started after the 429 wait for its Retry-After too, not only the one that was rate limited
+        rate_limited_at = handler.get_attempts("threads/thread_0")[0]
+        for index in range(2, 6):
+            self.assertGreaterEqual(handler.get_attempts(f"threads/thread_{index}")[0] - rate_limited_at, 0.2)
+
+    def test_missing_objects_count_as_deleted(self):
+        handler = FakeDeleteHandler({"threads/thread_1": [(404, None)]})
+        report = asyncio.run(bulk_delete(handler, make_items(2)))
+
+        self.assertEqual(report, [
+            {"id": "thread_0", "deleted": True, "error": None},
+            {"id": "thread_1", "deleted": True, "error": None},
+        ])
+        self.assertEqual(len(handler.get_attempts("threads/thread_1")), 1)
+
+    def test_server_errors_are_retried_up_to_the_limit(self):
+        handler = FakeDeleteHandler({
+            "threads/thread_0": [(500, 0.01), (503, 0.01)],
+            "threads/thread_1": [(500, 0.01)] * 3,
+        })
+        report = asyncio.run(bulk_delete(handler, make_items(2), max_retries=2))
+
+        self.assertTrue(report[0]['deleted'])
+        self.assertEqual(len(handler.get_attempts("threads/thread_0")), 3)
+        self.assertFalse(report[1]['deleted'])
+        self.assertIn("500", report[1]['error'])
+        self.assertEqual(len(handler.get_attempts("threads/thread_1")), 3)
+
+    def test_client_errors_are_not_retried(self):
+        handler = FakeDeleteHandler({"threads/thread_0": [(400, None)]})
+        report = asyncio.run(bulk_delete(handler, make_items(1)))
+
+        self.assertFalse(report[0]['deleted'])
+        self.assertEqual(len(handler.get_attempts("threads/thread_0")), 1)
+
+    def test_concurrency_is_limited(self):
+        in_flight = []
+        most_in_flight = 0
+        handler = FakeDeleteHandler()
+        request = handler.request
+
+        async def counting_request(method, endpoint, data=None, response_type=None):
+            nonlocal most_in_flight
+            in_flight.append(endpoint)
+            most_in_flight = max(most_in_flight, len(in_flight))
+            try:
+                await asyncio.sleep(0.01)
+                return await request(method, endpoint, data)
+            finally:
+                in_flight.remove(endpoint)
+
+        handler.request = counting_request
+        report = asyncio.run(bulk_delete(handler, make_items(10), max_concurrency=3))
+        self.assertEqual([result['id'] for result in report], [f"thread_{index}" for index in range(10)])
+        self.assertTrue(all(result['deleted'] for result in report))
+        self.assertEqual(most_in_flight, 3)
+
+
+class TestDeleteConversations(unittest.IsolatedAsyncioTestCase):
+    async def test_unknown_ids_are_reported(self):
+        api = FakeAPI()
+        assistant = make_assistant(api)
+        conversation = await assistant.create_conversation("Chat")
+        await assistant.send_message("Hello", conversation)
+        thread_id = conversation.get_thread_id()
+
+        report = await assistant.delete_conversations(conversation_ids=[conversation.id, "conv_missing"])
+        self.assertEqual(report, [
+            {"id": conversation.id, "deleted": True, "error": None},
+            {"id": "conv_missing", "deleted": False, "error": "not found"},
+        ])
+        self.assertNotIn(thread_id, api.threads)
+        self.assertEqual(assistant.conversations, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI, make_assistant
+from pyaimanager.context_policy import ContextPolicy
+
+def get_texts(api, thread_id):
+    return [message['content'][0]['text']['value'] for message in api.threads[thread_id]]
+
+def stuck_summary_runs(run):
+    # Summary runs are the only runs with instructions
+    return ["in_progress"] if run['instructions'] else ["completed"]
+
+def get_summary_runs(api):
+    return [run for run in api.runs.values() if run['instructions']]
+
+class TestContextPolicy(unittest.IsolatedAsyncioTestCase):
+    async def test_message_count_follows_the_whole_thread(self):
+        api = FakeAPI()
+        assistant = make_assistant(api)
+        conversation = await assistant.create_conversation("Long chat")
+
+        # More messages than one page of the messages list
+        for index in range(15):
+            await assistant.send_message(f"Message {index}", conversation)
+        self.assertEqual(conversation.get_message_count(), 30)
+
+        # Each turn only lists the newest page, up to the messages it already knows
+        self.assertEqual(len(api.get_calls("get", "/messages?limit=100")), 15)
+
+    async def test_rolls_over_with_default_policy(self):
+        api = FakeAPI()
+        assistant = make_assistant(api)
+        assistant.context_policy = ContextPolicy(summarizer=lambda messages: f"{len(messages)} messages")
+        conversation = await assistant.create_conversation("Long chat")
+
+        for index in range(21):
+            await assistant.send_message(f"Message {index}", conversation)
+            await conversation.wait_for_rollover()
+
+        # 42 messages went past the default 40, so the first thread was summarized and left
+        self.assertEqual(len(conversation.previous_thread_ids), 1)
+        self.assertEqual(conversation.summary, "36 messages")
+        self.assertEqual(conversation.get_message_count(), 7)
+
+    async def test_summarizes_every_older_message(self):
+        api = FakeAPI(reply="Noted.")
+        # Longer than the messages kept in memory, and than one page of the messages list
+        thread_id = api.add_thread([f"Old message {index}" for index in range(120)])
+        summarized = []
+        def summarize(messages):
+            summarized.extend(messages)
+            return "Summary"
+
+        assistant = make_assistant(api)
+        conversation = await assistant.create_conversation("Continued chat", context_policy=ContextPolicy(100, 4, summarize))
+        conversation.set_thread({"id": thread_id})
+
+        await assistant.send_message("New message", conversation)
+        await conversation.wait_for_rollover()
+
+        self.assertEqual(conversation.previous_thread_ids, [thread_id])
+        self.assertEqual([message['text'] for message in summarized], [f"Old message {index}" for index in range(118)])
+        self.assertEqual(get_texts(api, conversation.get_thread_id()), [
+            "Summary of the conversation so far:\nSummary",
+            "Old message 118",
+            "(assistant replied): Old message 119",
+            "New message",
+            "(assistant replied): Noted.",
+        ])
+        self.assertEqual(conversation.get_message_count(), 5)
+
+    async def test_assistant_writes_summary_and_old_thread_is_deleted(self):
+        # Summary runs are the only runs without a new user message
+        api = FakeAPI(reply=lambda messages: "The summary" if messages[-1]['role'] == "assistant" else "Hi!")
+        assistant = make_assistant(api)
+        conversation = await assistant.create_conversation("Chat", context_policy=ContextPolicy(4, 1, delete_old_threads=True))
+
+        for index in range(3):
+            await assistant.send_message(f"Message {index}", conversation)
+            await conversation.wait_for_rollover()
+
+        old_thread_id = conversation.previous_thread_ids[0]
+        self.assertNotIn(old_thread_id, api.threads)
+        summary_runs = [data for method, endpoint, data in api.get_calls("post", f"threads/{old_thread_id}/runs") if data.get('instructions')]
+        self.assertEqual(len(summary_runs), 1)
+        self.assertEqual(conversation.summary, "The summary")
+
+    async def start_stuck_rollover(self, api, assistant):
+        conversation = await assistant.create_conversation("Chat", context_policy=ContextPolicy(4, 1))
+        for index in range(3):
+            await assistant.send_message(f"Message {index}", conversation)
+        while not get_summary_runs(api):
+            await asyncio.sleep(0.01)
+        return conversation
+
+    async def test_stuck_summary_run_does_not_block_the_next_message(self):
+        api = FakeAPI(statuses=stuck_summary_runs, reply="Hi!")
+        assistant = make_assistant(api)
+        conversation = await self.start_stuck_rollover(api, assistant)
+        thread_id = conversation.get_thread_id()
+
+        started = time.monotonic()
+        response = await assistant.send_message("Next", conversation, timeout=0.2)
+        self.assertLess(time.monotonic() - started, 2)
+
+        # The rollover was abandoned and its run cancelled, so the message went to the old thread
+        self.assertEqual(response['thread_id'], thread_id)
+        self.assertEqual(conversation.previous_thread_ids, [])
+        summary_run = get_summary_runs(api)[0]
+        self.assertEqual(len(api.get_calls("post", f"runs/{summary_run['id']}/cancel")), 1)
+
+    async def test_summary_run_has_a_deadline(self):
+        api = FakeAPI(statuses=stuck_summary_runs)
+        assistant = make_assistant(api)
+        assistant.run_timeout = 0.1
+        conversation = await self.start_stuck_rollover(api, assistant)
+
+        await asyncio.wait_for(conversation.wait_for_rollover(), 2)
+        self.assertEqual(conversation.previous_thread_ids, [])
+        self.assertEqual(get_summary_runs(api)[0]['status'], "cancelling")
+
+    async def test_summary_run_is_cancelled_on_close(self):
+        api = FakeAPI(statuses=stuck_summary_runs)
+        assistant = make_assistant(api)
+        conversation = await self.start_stuck_rollover(api, assistant)
+
+        self.assertEqual(await assistant.cancel_active_runs(), [get_summary_runs(api)[0]['id']])
+        await asyncio.wait_for(conversation.wait_for_rollover(), 2)
+        self.assertEqual(conversation.previous_thread_ids, [])
+
+    def test_split_messages(self):
+        policy = ContextPolicy(max_messages=4, keep_last=2)
+        older, recent = policy.split_messages(["m5", "m4", "m3", "m2", "m1"])
+        self.assertEqual(older, ["m1", "m2", "m3"])
+        self.assertEqual(recent, ["m4", "m5"])
+        with self.assertRaises(ValueError):
+            ContextPolicy(max_messages=4, keep_last=4)
+
+if __name__ == '__main__':
+    unittest.main()
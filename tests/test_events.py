@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI, make_assistant
+from pyaimanager.events import (EventBus, Event, RunStatusEvent, RunQueued, RunInProgress, RunRequiresAction, RunCompleted,
+                                RunFailed, ToolCallStarted, ToolCallFinished, MessageCreated)
+from pyaimanager.utils.exceptions import ChatRunError
+
+def get_weather(city):
+    return f"Sunny in {city}"
+
+class TestRunEvents(unittest.IsolatedAsyncioTestCase):
+    async def test_events_follow_the_status_sequence(self):
+        api = FakeAPI(statuses=["queued", "queued", "in_progress", "requires_action", "in_progress", "completed"],
+                      tool_calls=[("get_weather", {"city": "Oslo"})], reply="It's sunny.")
+        assistant = make_assistant(api, functions={"get_weather": get_weather})
+        events = []
+        assistant.events.subscribe(events.append)
+
+        await assistant.send_message("What's the weather?")
+        self.assertEqual([type(event) for event in events], [
+            MessageCreated, RunQueued, RunInProgress, RunRequiresAction, ToolCallStarted,
+            ToolCallFinished, RunInProgress, RunCompleted, MessageCreated,
+        ])
+        self.assertEqual((events[0].role, events[0].text), ("user", "What's the weather?"))
+        self.assertEqual(events[4].arguments, {"city": "Oslo"})
+        self.assertEqual((events[5].output, events[5].error), ("Sunny in Oslo", None))
+        self.assertEqual((events[-1].role, events[-1].text), ("assistant", "It's sunny."))
+
+        run_id = next(iter(api.runs))
+        conversation = assistant.active_conversation
+        for event in events:
+            self.assertEqual((event.assistant_id, event.conversation_id, event.run_id), (assistant.id, conversation.id, run_id))
+            self.assertEqual(event.thread_id, conversation.get_thread_id())
+
+    async def test_failed_run_emits_error(self):
+        api = FakeAPI(statuses=["in_progress", "failed"])
+        assistant = make_assistant(api)
+        failures = []
+        assistant.events.subscribe(failures.append, RunFailed)
+
+        with self.assertRaises(ChatRunError):
+            await assistant.send_message("Hello")
+        self.assertEqual([(event.status, event.error) for event in failures], [("failed", "Something went wrong")])
+
+    async def test_raising_tool_emits_error(self):
+        def broken(city):
+            raise ValueError("Service down")
+
+        api = FakeAPI(statuses=["requires_action"], tool_calls=[("get_weather", {"city": "Oslo"})])
+        assistant = make_assistant(api, functions={"get_weather": broken})
+        finished = []
+        assistant.events.subscribe(finished.append, ToolCallFinished)
+
+        with self.assertRaises(ChatRunError):
+            await assistant.send_message("What's the weather?")
+        self.assertEqual([(event.output, event.error) for event in finished], [(None, "Service down")])
+
+    async def test_steps_are_only_fetched_for_step_subscribers(self):
+        api = FakeAPI(statuses=["in_progress", "completed"])
+        assistant = make_assistant(api)
+        assistant.events.subscribe(lambda event: None, RunStatusEvent)
+
+        await assistant.send_message("Hello")
+        self.assertEqual(api.get_calls("get", "/steps"), [])
+
+
+class TestEventBus(unittest.IsolatedAsyncioTestCase):
+    def make_event(self, event_class=RunCompleted):
+        return event_class("asst_abc", "conv_abc", "thread_abc", "run_abc", status="completed", run={})
+
+    async def test_subscribers_receive_subclasses(self):
+        bus = EventBus()
+        everything, statuses, failures = [], [], []
+        bus.subscribe(everything.append)
+        bus.subscribe(statuses.append, RunStatusEvent)
+        bus.subscribe(failures.append, RunFailed)
+
+        await bus.emit(self.make_event())
+        self.assertEqual((len(everything), len(statuses), len(failures)), (1, 1, 0))
+        self.assertTrue(bus.has_subscribers(RunCompleted))
+        self.assertTrue(bus.has_subscribers(ToolCallStarted))
+
+    async def test_async_and_raising_subscribers(self):
+        bus = EventBus()
+        received = []
+
+        async def slow(event):
+            await asyncio.sleep(0.01)
+            received.append(event)
+
+        def broken(event):
+            raise RuntimeError("subscriber bug")
+
+        async def broken_async(event):
+            raise RuntimeError("subscriber bug")
+
+        bus.subscribe(broken)
+        bus.subscribe(broken_async)
+        bus.subscribe(slow)
+        event = self.make_event()
+        await bus.emit(event)
+        self.assertEqual(received, [event])
+
+    async def test_unsubscribe(self):
+        bus = EventBus()
+        received = []
+        unsubscribe = bus.subscribe(received.append, RunStatusEvent)
+        unsubscribe()
+        unsubscribe()
+
+        await bus.emit(self.make_event())
+        self.assertEqual(received, [])
+        self.assertFalse(bus.has_subscribers(Event))
+
+if __name__ == '__main__':
+    unittest.main()
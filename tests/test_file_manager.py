@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI
+from pyaimanager.file_manager import FileManager
+from pyaimanager.shared_cache import MemoryCache
+from pyaimanager.utils.exceptions import ChatFileError
+
+async def stream(*chunks):
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+class TestFileManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as file:
+            file.write(content)
+        return path
+
+    async def test_hash_matches_content(self):
+        files = FileManager(FakeAPI(), chunk_size=7)
+        for content in (b"", b"short", os.urandom(100)):
+            with self.subTest(size=len(content)):
+                path = self.write_file("data.bin", content)
+                self.assertEqual(files._hash_file(path), hashlib.sha256(content).hexdigest())
+
+    async def test_chunks_are_read_in_executor(self):
+        api = FakeAPI()
+        files = FileManager(api, chunk_size=10)
+        content = os.urandom(95)
+        path = self.write_file("data.bin", content)
+
+        threads = set()
+        read_chunk = files._read_chunk
+        def record_thread(mapped, offset):
+            threads.add(threading.get_ident())
+            return read_chunk(mapped, offset)
+        files._read_chunk = record_thread
+
+        uploaded = await files.upload_file(path)
+        self.assertEqual(api.uploads, [("data.bin", content)])
+        self.assertEqual(uploaded['bytes'], 95)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    async def test_same_content_is_uploaded_once(self):
+        api = FakeAPI()
+        files = FileManager(api)
+        first = await files.upload_file(self.write_file("first.txt", b"same content"))
+        second = await files.upload_file(self.write_file("second.txt", b"same content"))
+
+        self.assertEqual(first['id'], second['id'])
+        self.assertEqual(len(api.uploads), 1)
+        self.assertEqual(list(files.get_index()), [hashlib.sha256(b"same content").hexdigest()])
+
+    async def test_concurrent_uploads_of_same_content_share_one_request(self):
+        api = FakeAPI(upload_delay=0.05)
+        files = FileManager(api)
+        paths = [self.write_file(f"copy_{index}.txt", b"same content") for index in range(3)]
+
+        uploaded = await asyncio.gather(*(files.upload_file(path) for path in paths))
+        self.assertEqual(len({file['id'] for file in uploaded}), 1)
+        self.assertEqual(len(api.uploads), 1)
+
+    async def test_duplicate_stream_is_removed(self):
+        api = FakeAPI()
+        files = FileManager(api)
+        existing = await files.upload_file(self.write_file("data.txt", b"hello world"))
+
+        uploaded = await files.upload_file(stream(b"hello ", b"world"), "stream.txt")
+        self.assertEqual(uploaded['id'], existing['id'])
+        self.assertEqual(len(api.get_calls("delete", "files/")), 1)
+        with self.assertRaises(ChatFileError):
+            await files.upload_file(stream(b"no name"))
+
+    async def test_index_is_shared_through_cache(self):
+        cache = MemoryCache()
+        path = self.write_file("data.txt", b"shared")
+        first_api, second_api = FakeAPI(), FakeAPI()
+        uploaded = await FileManager(first_api, cache=cache).upload_file(path)
+
+        other = FileManager(second_api, cache=cache)
+        self.assertEqual((await other.upload_file(path))['id'], uploaded['id'])
+        self.assertEqual(second_api.uploads, [])
+
+        # Deleting the file drops it from the shared index
+        await other.delete_file(uploaded['id'])
+        await FileManager(second_api, cache=cache).upload_file(path)
+        self.assertEqual(len(second_api.uploads), 1)
+
+    async def test_upload_files_limits_concurrency(self):
+        api = FakeAPI(upload_delay=0.02)
+        files = FileManager(api, max_concurrency=2)
+        paths = [self.write_file(f"file_{index}.txt", f"content {index}".encode()) for index in range(6)]
+
+        uploaded = await files.upload_files(paths + [(stream(b"streamed"), "stream.txt")])
+        self.assertEqual([file['filename'] for file in uploaded], [os.path.basename(path) for path in paths] + ["stream.txt"])
+        self.assertEqual(api.max_uploads_in_flight, 2)
+
+        await files.upload_files(paths, max_concurrency=6)
+        self.assertEqual(len(api.uploads), 7)
+
+    async def test_failed_upload_raises_and_is_not_indexed(self):
+        api = FakeAPI()
+        api.fail("upload", "files", 500)
+        files = FileManager(api)
+        path = self.write_file("data.txt", b"content")
+
+        with self.assertRaises(ChatFileError):
+            await files.upload_file(path)
+        self.assertEqual(files.get_index(), {})
+        await files.upload_file(path)
+        self.assertEqual(len(api.uploads), 1)
+
+if __name__ == '__main__':
+    unittest.main()
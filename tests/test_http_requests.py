@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pyaimanager.utils.http_requests import HTTPRequest
+from pyaimanager.utils.exceptions import ChatAPIError
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.headers = {}
+        self.body = body
+
+    async def text(self):
+        return self.body.decode()
+
+    async def read(self):
+        return self.body
+
+
+class FakeSession:
+    """
+    Answers every GET with its URL after the next of the given delays, or 0.01 seconds.
+    """
+    def __init__(self, delays=(), status=200):
+        self.delays = list(delays)
+        self.status = status
+        self.sent = 0
+
+    def get(self, url, headers=None):
+        session = self
+
+        class Request:
+            async def __aenter__(self):
+                session.sent += 1
+                await asyncio.sleep(session.delays.pop(0) if session.delays else 0.01)
+                return FakeResponse(session.status, json.dumps({"url": url}).encode())
+
+            async def __aexit__(self, *args):
+                pass
+
+        return Request()
+
+
+def make_http(session, **kwargs):
+    http = HTTPRequest("test-key", "json", **kwargs)
+    http._get_session = lambda: session
+    return http
+
+class TestHTTPRequestReads(unittest.TestCase):
+    def test_identical_reads_share_one_request(self):
+        session = FakeSession()
+        http = make_http(session)
+
+        async def read_concurrently():
+            return await asyncio.gather(*(http.request("get", "threads/thread_abc/runs/run_abc") for _ in range(5)))
+
+        responses = asyncio.run(read_concurrently())
+        self.assertEqual(session.sent, 1)
+        self.assertEqual(http.get_metrics()['deduplicated'], 4)
+
+        # Every caller gets its own copy to change
+        self.assertEqual(len({id(response) for response in responses}), 5)
+
+    def test_cancelled_reader_does_not_cancel_others(self):
+        session = FakeSession(delays=[0.2])
+        http = make_http(session)
+
+        async def cancel_one():
+            first = asyncio.ensure_future(http.request("get", "threads/thread_abc"))
+            second = asyncio.ensure_future(http.request("get", "threads/thread_abc"))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            return await second
+
+        self.assertTrue(asyncio.run(cancel_one())['url'].endswith("threads/thread_abc"))
+
+    def test_slow_read_is_hedged(self):
+        session = FakeSession()
+        http = make_http(session, hedge_reads=True, hedge_min_samples=5, hedge_min_delay=0.05)
+
+        async def read_slow():
+            # Learn the usual latency of the endpoint first
+            for _ in range(10):
+                await http.request("get", "threads/thread_abc/runs/run_abc")
+            session.delays = [2.0, 0.01]
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await http.request("get", "threads/thread_abc/runs/run_def")
+            return loop.time() - started
+
+        self.assertLess(asyncio.run(read_slow()), 1.0)
+        metrics = http.get_metrics()
+        self.assertEqual(metrics['hedged'], 1)
+        self.assertEqual(metrics['hedge_wins'], 1)
+
+    def test_client_errors_are_not_hedged(self):
+        session = FakeSession(delays=[0.2], status=404)
+        http = make_http(session, hedge_reads=True, hedge_max_delay=0.05)
+
+        with self.assertRaises(ChatAPIError) as raised:
+            asyncio.run(http.request("get", "threads/thread_missing"))
+        self.assertEqual(raised.exception.status, 404)
+
+
+class ClosableSession:
+    def __init__(self):
+        self.closed_in = None
+
+    async def close(self):
+        self.closed_in = threading.current_thread().name
+
+
+class TestHTTPRequestSessions(unittest.TestCase):
+    def test_stale_session_is_closed_on_its_running_loop(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="old-loop")
+        thread.start()
+        try:
+            session = ClosableSession()
+            HTTPRequest("test-key", "json")._close_stale_session(session, loop)
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(5)
+            self.assertEqual(session.closed_in, "old-loop")
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def test_stale_session_of_finished_loop_warns(self):
+        loop = asyncio.new_event_loop()
+        loop.close()
+        session = ClosableSession()
+        with self.assertLogs("pyaimanager.utils.http_requests", "WARNING"):
+            HTTPRequest("test-key", "json")._close_stale_session(session, loop)
+        self.assertIsNone(session.closed_in)
+
+if __name__ == '__main__':
+    unittest.main()
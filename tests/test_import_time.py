@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Imports the package in a fresh interpreter and reports what it cost
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import pyaimanager
+package_time = time.perf_counter() - start
+from pyaimanager import AssistantManager
+manager_time = time.perf_counter() - start
+from pyaimanager.utils.logging import logger
+print(json.dumps({
+    "package_time": package_time,
+    "manager_time": manager_time,
+    "loaded": [name for name in ("aiohttp", "multiprocessing", "pyaimanager.assistant_manager") if name in sys.modules],
+    "open_log_files": [handler.baseFilename for handler in logger.handlers if getattr(handler, "stream", True) is not None and hasattr(handler, "baseFilename")],
+}))
+"""
+
+class TestImportTime(unittest.TestCase):
+    # Generous budgets, these only catch heavy dependencies creeping back into the import path
+    PACKAGE_BUDGET = 0.05  # seconds
+    MANAGER_BUDGET = 0.5  # seconds
+
+    def import_package(self):
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC_PATH, os.environ.get("PYTHONPATH")]))}
+        output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, text=True, env=env, check=True)
+        return json.loads(output.stdout)
+
+    def test_package_import_is_lazy(self):
+        result = self.import_package()
+
+        # importing the package alone loads no submodules
+        self.assertLess(result['package_time'], self.PACKAGE_BUDGET, f"Importing pyaimanager took {result['package_time']:.3f}s.")
+
+        # aiohttp and multiprocessing are only loaded when they're used
+        self.assertNotIn("aiohttp", result['loaded'], "aiohttp should not be imported until the first request.")
+        self.assertNotIn("multiprocessing", result['loaded'], "multiprocessing should only be imported by WorkerPool.")
+        self.assertIn("pyaimanager.assistant_manager", result['loaded'])
+        self.assertLess(result['manager_time'], self.MANAGER_BUDGET, f"Importing AssistantManager took {result['manager_time']:.3f}s.")
+
+    def test_import_opens_no_log_file(self):
+        result = self.import_package()
+        self.assertEqual(result['open_log_files'], [], "No log file should be opened at import time.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import dataclasses
+import importlib.util
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pyaimanager.utils.json_codec import JSONCodec, OrjsonCodec, MsgspecCodec, get_codec
+from pyaimanager.utils.http_requests import HTTPRequest
+
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+HAS_MSGSPEC = importlib.util.find_spec("msgspec") is not None
+
+RUN = {
+    "id": "run_abc123",
+    "object": "thread.run",
+    "status": "completed",
+    "usage": {"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8},
+    "metadata": {"note": "héllo ✓"},
+    "file_ids": [],
+    "last_error": None,
+}
+
+@dataclasses.dataclass
+class Run:
+    id: str
+    status: str
+    usage: dict = None
+
+
+class CodecTests:
+    def make_codec(self):
+        raise NotImplementedError
+
+    def test_round_trip(self):
+        codec = self.make_codec()
+        encoded = codec.encode(RUN)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(codec.decode(encoded), RUN)
+        self.assertEqual(json.loads(encoded), RUN)
+
+    def test_decodes_str_and_bytes(self):
+        codec = self.make_codec()
+        self.assertEqual(codec.decode('{"id": "run_abc123"}'), {"id": "run_abc123"})
+        self.assertEqual(codec.decode(b'{"id": "run_abc123"}'), {"id": "run_abc123"})
+
+    def test_decodes_into_dataclass(self):
+        run = self.make_codec().decode(json.dumps(RUN).encode(), Run)
+        self.assertEqual(run, Run("run_abc123", "completed", RUN['usage']))
+
+
+class TestJSONCodec(CodecTests, unittest.TestCase):
+    def make_codec(self):
+        return JSONCodec()
+
+    def test_unknown_fields_are_ignored(self):
+        run = JSONCodec().decode(b'{"id": "run_abc123", "status": "queued", "new_field": 1}', Run)
+        self.assertEqual(run, Run("run_abc123", "queued"))
+
+
+@unittest.skipUnless(HAS_ORJSON, "orjson is not installed")
+class TestOrjsonCodec(CodecTests, unittest.TestCase):
+    def make_codec(self):
+        return OrjsonCodec()
+
+
+@unittest.skipUnless(HAS_MSGSPEC, "msgspec is not installed")
+class TestMsgspecCodec(CodecTests, unittest.TestCase):
+    def make_codec(self):
+        return MsgspecCodec()
+
+
+class TestGetCodec(unittest.TestCase):
+    def test_auto_picks_fastest_installed(self):
+        expected = OrjsonCodec if HAS_ORJSON else MsgspecCodec if HAS_MSGSPEC else JSONCodec
+        self.assertIs(type(get_codec("auto")), expected)
+        self.assertIs(type(get_codec()), expected)
+
+    def test_by_name_and_instance(self):
+        self.assertIs(type(get_codec("json")), JSONCodec)
+        codec = JSONCodec()
+        self.assertIs(get_codec(codec), codec)
+
+    def test_unknown_name(self):
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+    @unittest.skipIf(HAS_MSGSPEC, "msgspec is installed")
+    def test_missing_backend(self):
+        with self.assertRaises(ImportError):
+            get_codec("msgspec")
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    async def read(self):
+        return json.dumps(RUN).encode()
+
+
+class FakeSession:
+    def get(self, url, headers=None):
+        class Request:
+            async def __aenter__(self):
+                return FakeResponse()
+
+            async def __aexit__(self, *args):
+                pass
+
+        return Request()
+
+
+class TestResponseType(unittest.TestCase):
+    def test_request_decodes_into_response_type(self):
+        for codec in ["json"] + (["orjson"] if HAS_ORJSON else []) + (["msgspec"] if HAS_MSGSPEC else []):
+            with self.subTest(codec=codec):
+                http = HTTPRequest("test-key", codec)
+                http._get_session = lambda: FakeSession()
+                run = asyncio.run(http.request("get", "threads/thread_abc/runs/run_abc123", response_type=Run))
+                self.assertEqual(run, Run("run_abc123", "completed", RUN['usage']))
+
+if __name__ == '__main__':
+    unittest.main()
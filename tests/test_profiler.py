@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pyaimanager.utils.profiler import Profiler, profile_span
+
+async def profiled_turn(profiler):
+    with profiler.trace("send_message", conversation_id="conv_1"):
+        with profile_span("GET threads/{id}/runs/{id}", "http"):
+            with profile_span("decode", "json"):
+                pass
+        with profile_span("poll sleep", "sleep"):
+            await asyncio.sleep(0.01)
+
+        async def read(endpoint):
+            with profile_span(f"GET {endpoint}", "http"):
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(read("threads/{id}"), read("threads/{id}/messages"))
+
+class TestProfiler(unittest.TestCase):
+    def test_records_span_tree(self):
+        profiler = Profiler()
+        asyncio.run(profiled_turn(profiler))
+
+        trace, = profiler.get_traces()
+        self.assertEqual(trace['name'], "send_message")
+        self.assertEqual(trace['args'], {"conversation_id": "conv_1"})
+        self.assertEqual([child['name'] for child in trace['children']],
+                         ["GET threads/{id}/runs/{id}", "poll sleep", "GET threads/{id}", "GET threads/{id}/messages"])
+        self.assertEqual(trace['children'][0]['children'][0]['name'], "decode")
+        self.assertGreaterEqual(trace['children'][1]['duration'], 0.01)
+
+    def test_spans_outside_a_turn_are_not_recorded(self):
+        profiler = Profiler()
+        with profile_span("GET threads/{id}", "http") as span:
+            self.assertIsNone(span)
+        self.assertEqual(profiler.get_traces(), [])
+
+    def test_sampling(self):
+        profiler = Profiler(sample_rate=0)
+        asyncio.run(profiled_turn(profiler))
+        self.assertEqual(profiler.get_traces(), [])
+
+    def test_chrome_trace(self):
+        profiler = Profiler()
+        asyncio.run(profiled_turn(profiler))
+
+        events = [event for event in profiler.to_chrome_trace()['traceEvents'] if event['ph'] == "X"]
+        self.assertEqual(len(events), 6)
+        # The concurrent reads ran in their own tasks, so they get their own rows
+        self.assertEqual(len({event['tid'] for event in events}), 3)
+
+    def test_speedscope_events_are_nested(self):
+        profiler = Profiler()
+        asyncio.run(profiled_turn(profiler))
+
+        for profile in profiler.to_speedscope()['profiles']:
+            stack = []
+            for event in profile['events']:
+                if event['type'] == "O":
+                    stack.append(event['frame'])
+                else:
+                    self.assertEqual(stack.pop(), event['frame'])
+            self.assertEqual(stack, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI
+from pyaimanager.assistant_manager import AssistantManager, SPEC_HASH_KEY
+
+def make_spec(name="Helper", **fields):
+    return {"name": name, "description": "Helps out", "model": "gpt-4", "instructions": "Be helpful.", "tools": [], **fields}
+
+def get_actions(report):
+    return sorted((item['name'], item['action']) for item in report)
+
+class TestReconcileAssistants(unittest.IsolatedAsyncioTestCase):
+    def make_manager(self, api):
+        with mock.patch("pyaimanager.assistant_manager.HTTPRequest", return_value=api):
+            return AssistantManager("test-key")
+
+    def get_writes(self, api):
+        return [(method, endpoint) for method, endpoint, _ in api.calls if method in ("post", "delete")]
+
+    async def test_creates_then_leaves_unchanged(self):
+        api = FakeAPI()
+        manager = self.make_manager(api)
+
+        report = await manager.reconcile_assistants([make_spec()])
+        self.assertEqual(get_actions(report), [("Helper", "create")])
+        self.assertTrue(report[0]['done'])
+        created = api.assistants[report[0]['id']]
+        self.assertIn(SPEC_HASH_KEY, created['metadata'])
+
+        api.calls.clear()
+        report = await manager.reconcile_assistants([make_spec()])
+        self.assertEqual(get_actions(report), [("Helper", "unchanged")])
+        self.assertEqual(self.get_writes(api), [])
+
+    async def test_reverts_changes_made_elsewhere(self):
+        api = FakeAPI()
+        manager = self.make_manager(api)
+        assistant_id = (await manager.reconcile_assistants([make_spec()]))[0]['id']
+
+        # Edited outside reconcile, so the metadata marker still matches the spec
+        api.assistants[assistant_id]['instructions'] = "Be terse."
+        report = await manager.reconcile_assistants([make_spec()])
+        self.assertEqual(report[0]['action'], "update")
+        self.assertEqual(report[0]['changes'], {"instructions": "Be helpful."})
+        self.assertEqual(api.assistants[assistant_id]['instructions'], "Be helpful.")
+
+    async def test_matching_assistant_without_marker_only_gets_the_marker(self):
+        api = FakeAPI()
+        assistant_id = api.add_assistant(**make_spec())['id']
+        manager = self.make_manager(api)
+
+        report = await manager.reconcile_assistants([make_spec()])
+        self.assertEqual(report[0]['action'], "update")
+        self.assertEqual(list(report[0]['changes']), ["metadata"])
+        self.assertIn(SPEC_HASH_KEY, api.assistants[assistant_id]['metadata'])
+
+    async def test_duplicates_keep_the_matching_assistant(self):
+        api = FakeAPI()
+        oldest = api.add_assistant(**make_spec(instructions="Outdated."))['id']
+        matching = api.add_assistant(**make_spec())['id']
+        newest = api.add_assistant(**make_spec(instructions="Also outdated."))['id']
+        manager = self.make_manager(api)
+
+        report = await manager.reconcile_assistants([make_spec()])
+        deleted = sorted(item['id'] for item in report if item['action'] == "delete")
+        self.assertEqual(deleted, sorted([oldest, newest]))
+        kept = next(item for item in report if item['action'] != "delete")
+        self.assertEqual(kept['id'], matching)
+        self.assertEqual(list(api.assistants), [matching])
+        self.assertEqual([assistant.id for assistant in manager.assistants], [matching])
+
+    async def test_duplicates_keep_the_oldest_otherwise(self):
+        api = FakeAPI()
+        oldest = api.add_assistant(**make_spec(instructions="Outdated."))['id']
+        api.add_assistant(**make_spec(instructions="Also outdated."))
+        manager = self.make_manager(api)
+
+        report = await manager.reconcile_assistants([make_spec()])
+        self.assertEqual(get_actions(report), [("Helper", "delete"), ("Helper", "update")])
+        self.assertEqual(list(api.assistants), [oldest])
+        self.assertEqual(api.assistants[oldest]['instructions'], "Be helpful.")
+
+    async def test_delete_missing_only_deletes_managed_assistants(self):
+        api = FakeAPI()
+        manager = self.make_manager(api)
+        await manager.reconcile_assistants([make_spec("Helper"), make_spec("Retired")])
+        unmanaged = api.add_assistant(**make_spec("Handmade"))['id']
+
+        report = await manager.reconcile_assistants([make_spec("Helper")], delete_missing=True)
+        self.assertEqual(get_actions(report), [("Helper", "unchanged"), ("Retired", "delete")])
+        self.assertEqual(sorted(assistant['name'] for assistant in api.assistants.values()), ["Handmade", "Helper"])
+        self.assertIn(unmanaged, api.assistants)
+
+    async def test_dry_run_writes_nothing(self):
+        api = FakeAPI()
+        api.add_assistant(**make_spec("Helper", instructions="Outdated."))
+        api.add_assistant(**make_spec("Helper"))
+        manager = self.make_manager(api)
+
+        report = await manager.reconcile_assistants([make_spec("Helper"), make_spec("Writer")], dry_run=True)
+        self.assertEqual(get_actions(report), [("Helper", "delete"), ("Helper", "update"), ("Writer", "create")])
+        self.assertFalse(any(item['done'] for item in report))
+        self.assertEqual(self.get_writes(api), [])
+        self.assertEqual(len(api.assistants), 2)
+
+if __name__ == '__main__':
+    unittest.main()
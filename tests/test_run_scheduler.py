@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pyaimanager.utils.run_scheduler import RunScheduler
+from pyaimanager.utils.exceptions import ChatQueueError
+
+async def queue(scheduler, priority, admitted, timeout=None):
+    """
+    Starts a request that records its name once it is admitted, and waits until it is queued.
+    """
+    async def request():
+        await scheduler.acquire(priority, timeout)
+        admitted.append(priority)
+
+    task = asyncio.ensure_future(request())
+    await asyncio.sleep(0)
+    return task
+
+class TestRunScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_admits_up_to_max_in_flight(self):
+        scheduler = RunScheduler(max_in_flight=2, reserved_interactive=0)
+        await scheduler.acquire()
+        await scheduler.acquire()
+
+        admitted = []
+        waiting = await queue(scheduler, "interactive", admitted)
+        self.assertEqual(admitted, [])
+        self.assertEqual(scheduler.get_metrics()['queue_depth'], 1)
+
+        scheduler.release()
+        await waiting
+        self.assertEqual(admitted, ["interactive"])
+        self.assertEqual(scheduler.get_metrics()['in_flight'], 2)
+
+    async def test_interactive_admitted_before_batch(self):
+        scheduler = RunScheduler(max_in_flight=1, reserved_interactive=0)
+        await scheduler.acquire()
+
+        admitted = []
+        batch = await queue(scheduler, "batch", admitted)
+        interactive = await queue(scheduler, "interactive", admitted)
+
+        scheduler.release()
+        await interactive
+        self.assertEqual(admitted, ["interactive"])
+
+        scheduler.release()
+        await batch
+        self.assertEqual(admitted, ["interactive", "batch"])
+
+    async def test_reserved_slots_are_for_interactive_requests(self):
+        scheduler = RunScheduler(max_in_flight=2, reserved_interactive=1)
+        await scheduler.acquire("batch")
+
+        # The last slot is reserved, so a second batch request waits...
+        admitted = []
+        batch = await queue(scheduler, "batch", admitted)
+        self.assertEqual(admitted, [])
+
+        # ...while an interactive request still gets it
+        await asyncio.wait_for(scheduler.acquire("interactive"), 1)
+        self.assertEqual(scheduler.get_metrics()['in_flight'], 2)
+
+        # Batch requests only use the unreserved slots, so the waiting one needs both to be free
+        scheduler.release("batch")
+        await asyncio.sleep(0)
+        self.assertEqual(admitted, [])
+        scheduler.release("interactive")
+        await batch
+        self.assertEqual(admitted, ["batch"])
+
+    async def test_full_queue_rejects(self):
+        scheduler = RunScheduler(max_in_flight=1, max_queue_size=1, reserved_interactive=0)
+        await scheduler.acquire()
+        waiting = await queue(scheduler, "interactive", [])
+
+        with self.assertRaises(ChatQueueError):
+            await scheduler.acquire()
+        self.assertEqual(scheduler.get_metrics()['priorities']['interactive']['rejected'], 1)
+        waiting.cancel()
+
+    async def test_timed_out_requests_are_shed(self):
+        scheduler = RunScheduler(max_in_flight=1, reserved_interactive=0)
+        await scheduler.acquire()
+
+        with self.assertRaises(ChatQueueError):
+            await scheduler.acquire("batch", timeout=0.01)
+        metrics = scheduler.get_metrics()
+        self.assertEqual(metrics['priorities']['batch']['shed'], 1)
+        self.assertEqual(metrics['queue_depth'], 0)
+        self.assertEqual(metrics['in_flight'], 1)
+
+    async def test_cancelled_waiter_does_not_hold_a_slot(self):
+        scheduler = RunScheduler(max_in_flight=1, reserved_interactive=0)
+        await scheduler.acquire()
+
+        admitted = []
+        cancelled = await queue(scheduler, "interactive", admitted)
+        waiting = await queue(scheduler, "interactive", admitted)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        scheduler.release()
+        await waiting
+        self.assertEqual(admitted, ["interactive"])
+        self.assertEqual(scheduler.get_metrics()['in_flight'], 1)
+
+    async def test_slot_is_released_on_error(self):
+        scheduler = RunScheduler(max_in_flight=1, reserved_interactive=0)
+        with self.assertRaises(ValueError):
+            async with scheduler.slot():
+                raise ValueError("run failed")
+        self.assertEqual(scheduler.get_metrics()['in_flight'], 0)
+
+    async def test_metrics_counters(self):
+        scheduler = RunScheduler(max_in_flight=1, reserved_interactive=0)
+        async with scheduler.slot("batch"):
+            waiting = await queue(scheduler, "batch", [])
+            await asyncio.sleep(0.02)
+        await waiting
+
+        batch = scheduler.get_metrics()['priorities']['batch']
+        self.assertEqual(batch['admitted'], 2)
+        self.assertEqual(batch['in_flight'], 1)
+        self.assertGreaterEqual(batch['queue_time_max'], 0.02)
+        self.assertGreater(batch['queue_time_avg'], 0)
+
+    async def test_invalid_use(self):
+        scheduler = RunScheduler()
+        with self.assertRaises(RuntimeError):
+            scheduler.release()
+        with self.assertRaises(ValueError):
+            await scheduler.acquire("urgent")
+        with self.assertRaises(ValueError):
+            RunScheduler(max_in_flight=2, reserved_interactive=2)
+
+if __name__ == '__main__':
+    unittest.main()
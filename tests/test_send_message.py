@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI, make_assistant
+from pyaimanager.utils.exceptions import ChatRunError, ChatRunTimeoutError, ChatMessageError
+
+def get_cancelled_run_ids(api):
+    return [endpoint.split("/")[3] for _, endpoint, _ in api.get_calls("post", "/cancel")]
+
+class TestSendMessage(unittest.IsolatedAsyncioTestCase):
+    async def test_completed_run_returns_reply(self):
+        api = FakeAPI(statuses=["queued", "in_progress", "completed"], reply="Hi there!",
+                      usage={"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8})
+        assistant = make_assistant(api)
+
+        response = await assistant.send_message("Hello")
+        self.assertEqual(response['content'][0]['text']['value'], "Hi there!")
+        self.assertEqual(get_cancelled_run_ids(api), [])
+        self.assertEqual(assistant.usage.get_totals()['total_tokens'], 8)
+
+        # The second message reuses the thread
+        await assistant.send_message("And again")
+        self.assertEqual(len(api.threads), 1)
+        self.assertEqual(len(api.get_calls("post", "threads/runs")), 1)
+
+    async def test_terminal_statuses_raise_run_error(self):
+        for status in ("failed", "expired", "cancelled"):
+            with self.subTest(status=status):
+                api = FakeAPI(statuses=["in_progress", status])
+                assistant = make_assistant(api)
+
+                with self.assertRaises(ChatRunError) as context:
+                    await assistant.send_message("Hello")
+                self.assertNotIsInstance(context.exception, ChatRunTimeoutError)
+                self.assertIn(f"ended with status {status}", str(context.exception))
+                self.assertFalse(str(context.exception).endswith(".."))
+
+                # A finished run isn't cancelled again, and still counts as a failed run
+                self.assertEqual(get_cancelled_run_ids(api), [])
+                self.assertEqual(assistant.usage.get_totals()['failed'], 1)
+
+    async def test_raising_tool_cancels_run(self):
+        def lookup(city):
+            raise ValueError(f"No weather for {city}")
+
+        api = FakeAPI(statuses=["requires_action"], tool_calls=[("lookup", {"city": "Oslo"})])
+        assistant = make_assistant(api, functions={"lookup": lookup})
+
+        with self.assertRaises(ChatRunError) as context:
+            await assistant.send_message("What's the weather?")
+        self.assertIn("No weather for Oslo", str(context.exception))
+        self.assertEqual(get_cancelled_run_ids(api), list(api.runs))
+        self.assertEqual(api.get_calls("post", "submit_tool_outputs"), [])
+
+    async def test_failed_poll_cancels_run(self):
+        api = FakeAPI(statuses=["in_progress"])
+        assistant = make_assistant(api)
+        conversation = await assistant.create_conversation("Test")
+        conversation.set_thread({"id": api.add_thread([])})
+        thread_id = conversation.get_thread_id()
+
+        # The run gets the next ID the fake hands out after the message's
+        api.fail("get", f"threads/{thread_id}/runs/run_3", 500)
+        with self.assertRaises(ChatRunError):
+            await assistant.send_message("Hello", conversation)
+        self.assertEqual(get_cancelled_run_ids(api), ["run_3"])
+
+    async def test_timeout_cancels_run(self):
+        api = FakeAPI(statuses=["in_progress"])
+        assistant = make_assistant(api)
+
+        with self.assertRaises(ChatRunTimeoutError):
+            await assistant.send_message("Hello", timeout=0.05)
+        self.assertEqual(get_cancelled_run_ids(api), list(api.runs))
+        self.assertEqual(assistant.scheduler.get_metrics()['in_flight'], 0)
+        self.assertEqual(await assistant.cancel_active_runs(), [])
+
+    async def test_cancelled_task_cancels_run(self):
+        api = FakeAPI(statuses=["in_progress"])
+        assistant = make_assistant(api)
+
+        task = asyncio.ensure_future(assistant.send_message("Hello"))
+        while not api.runs:
+            await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(get_cancelled_run_ids(api), list(api.runs))
+
+    async def test_cancel_active_runs_reaps_waiting_runs(self):
+        api = FakeAPI(statuses=["in_progress"])
+        assistant = make_assistant(api)
+        first = await assistant.create_conversation("First")
+        second = await assistant.create_conversation("Second")
+
+        tasks = [asyncio.ensure_future(assistant.send_message("Hello", conversation)) for conversation in (first, second)]
+        while len(api.runs) < 2:
+            await asyncio.sleep(0)
+
+        cancelled = await assistant.cancel_active_runs()
+        self.assertCountEqual(cancelled, list(api.runs))
+
+        # The waiting calls then see their runs cancelled, without cancelling them a second time
+        for task in tasks:
+            with self.assertRaises(ChatRunError):
+                await task
+        self.assertCountEqual(get_cancelled_run_ids(api), list(api.runs))
+
+    async def test_message_errors_are_wrapped(self):
+        api = FakeAPI()
+        assistant = make_assistant(api)
+        conversation = await assistant.create_conversation("Test")
+        conversation.set_thread({"id": api.add_thread([])})
+        api.fail("post", f"threads/{conversation.get_thread_id()}/messages", 500)
+
+        with self.assertRaises(ChatMessageError):
+            await assistant.send_message("Hello", conversation)
+        self.assertEqual(api.runs, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import pickle
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pyaimanager.shared_cache import MemoryCache, SQLiteCache
+
+class SharedCacheTests:
+    def make_cache(self):
+        raise NotImplementedError
+
+    def test_set_and_get(self):
+        cache = self.make_cache()
+        self.assertIsNone(cache.get("missing"))
+        cache.set("key", {"assistants": [{"id": "asst_1"}]})
+        self.assertEqual(cache.get("key"), {"assistants": [{"id": "asst_1"}]})
+
+    def test_versions_increase(self):
+        cache = self.make_cache()
+        self.assertEqual(cache.set("key", 1), 1)
+        self.assertEqual(cache.set("key", 2), 2)
+        self.assertEqual(cache.get_entry("key"), (2, 2))
+
+    def test_values_expire(self):
+        cache = self.make_cache()
+        cache.set("key", "value", ttl=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("key"))
+
+    def test_delete(self):
+        cache = self.make_cache()
+        cache.set("key", "value")
+        cache.delete("key")
+        cache.delete("key")
+        self.assertIsNone(cache.get("key"))
+
+
+class TestMemoryCache(SharedCacheTests, unittest.TestCase):
+    def make_cache(self):
+        return MemoryCache()
+
+    def test_lease(self):
+        cache = self.make_cache()
+        self.assertTrue(cache.acquire_lease("sync", 10))
+        self.assertFalse(cache.acquire_lease("sync", 10))
+        cache.release_lease("sync")
+        self.assertTrue(cache.acquire_lease("sync", 10))
+
+
+class TestSQLiteCache(SharedCacheTests, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_cache(self):
+        return SQLiteCache(self.path)
+
+    def test_shared_between_instances(self):
+        writer, reader = self.make_cache(), self.make_cache()
+        writer.set("key", "value")
+        self.assertEqual(reader.get("key"), "value")
+
+        # A pickled cache, as handed to worker processes, opens the same file
+        copy = pickle.loads(pickle.dumps(writer))
+        self.assertEqual(copy.get("key"), "value")
+
+    def test_lease_has_one_holder(self):
+        first, second = self.make_cache(), self.make_cache()
+        self.assertTrue(first.acquire_lease("sync", 10))
+        self.assertFalse(second.acquire_lease("sync", 10))
+
+        # The holder can renew its lease, and others can take it once it is released
+        self.assertTrue(first.acquire_lease("sync", 10))
+        second.release_lease("sync")
+        self.assertFalse(second.acquire_lease("sync", 10))
+        first.release_lease("sync")
+        self.assertTrue(second.acquire_lease("sync", 10))
+
+    def test_expired_lease_can_be_taken(self):
+        first, second = self.make_cache(), self.make_cache()
+        self.assertTrue(first.acquire_lease("sync", 0.05))
+        time.sleep(0.1)
+        self.assertTrue(second.acquire_lease("sync", 10))
+
+    def test_namespaces_are_separate(self):
+        SQLiteCache(self.path, namespace="first").set("key", "value")
+        self.assertIsNone(SQLiteCache(self.path, namespace="second").get("key"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI, make_assistant
+from pyaimanager.events import RunStepEvent, RunInProgress, RunCompleted, RunFailed, MessageCreated
+from pyaimanager.utils.exceptions import ChatRunError
+
+def tool_step(status):
+    return {"id": "step_1", "type": "tool_calls", "status": status, "step_details": {"type": "tool_calls", "tool_calls": []}}
+
+def message_step(status, message_id=None):
+    return {"id": "step_2", "type": "message_creation", "status": status,
+            "step_details": {"type": "message_creation", "message_creation": {"message_id": message_id}}}
+
+def reply_step(run, messages):
+    # The reply exists once the run has completed
+    reply = next(message for message in messages if message['run_id'] == run['id'])
+    return [tool_step("completed"), message_step("completed", reply['id'])]
+
+STEPS = [
+    [tool_step("in_progress")],
+    [tool_step("completed"), message_step("in_progress")],
+    reply_step,
+]
+
+class TestRunSteps(unittest.IsolatedAsyncioTestCase):
+    async def test_cursor_only_moves_past_finished_steps(self):
+        api = FakeAPI(statuses=["in_progress", "in_progress", "completed"], steps=STEPS)
+        assistant = make_assistant(api)
+        steps = []
+        assistant.events.subscribe(steps.append, RunStepEvent)
+
+        await assistant.send_message("Hello")
+        self.assertEqual([(event.step['id'], event.status) for event in steps], [
+            ("step_1", "in_progress"),
+            ("step_1", "completed"),
+            ("step_2", "in_progress"),
+            ("step_2", "completed"),
+        ])
+        endpoints = [endpoint for _, endpoint, _ in api.get_calls("get", "/steps")]
+        self.assertNotIn("after=", endpoints[0])
+        self.assertNotIn("after=", endpoints[1])
+        self.assertTrue(endpoints[2].endswith("&after=step_1"))
+
+    async def test_step_messages_are_not_emitted_again(self):
+        api = FakeAPI(statuses=["in_progress", "in_progress", "completed"], steps=STEPS, reply="Hi!")
+        assistant = make_assistant(api)
+        assistant.fetch_run_steps = True
+        events = []
+        assistant.events.subscribe(events.append)
+
+        response = await assistant.send_message("Hello")
+        replies = [event for event in events if isinstance(event, MessageCreated) and event.role == "assistant"]
+        self.assertEqual([event.text for event in replies], ["Hi!"])
+        self.assertEqual(len(api.get_calls("get", f"/messages/{response['id']}")), 1)
+
+        # The reply is emitted from its completed run step, not again when the run's messages are listed
+        before = events[events.index(replies[0]) - 1]
+        self.assertIsInstance(before, RunStepEvent)
+        self.assertEqual((before.step['id'], before.status), ("step_2", "completed"))
+
+    async def test_event_subscribers_only_get_steps_when_opted_in(self):
+        api = FakeAPI(statuses=["in_progress", "completed"], steps=[[tool_step("completed")]])
+        assistant = make_assistant(api)
+        events = []
+        assistant.events.subscribe(events.append)
+
+        await assistant.send_message("Hello")
+        self.assertEqual(api.get_calls("get", "/steps"), [])
+
+        assistant.fetch_run_steps = True
+        await assistant.send_message("Again")
+        self.assertEqual(len(api.get_calls("get", "/steps")), 2)
+        self.assertTrue(any(isinstance(event, RunStepEvent) for event in events))
+
+    async def test_failed_step_fetch_does_not_fail_the_run(self):
+        api = FakeAPI(statuses=["in_progress", "completed"], steps=STEPS)
+        assistant = make_assistant(api)
+        assistant.events.subscribe(lambda event: None, RunStepEvent)
+        api.fail("get", "threads/thread_1/runs/run_3/steps?order=asc&limit=100", 500)
+
+        response = await assistant.send_message("Hello")
+        self.assertEqual(response['role'], "assistant")
+
+
+class TestStreamMessage(unittest.IsolatedAsyncioTestCase):
+    async def test_yields_events_until_the_run_completes(self):
+        api = FakeAPI(statuses=["in_progress", "completed"], reply="Hi!")
+        assistant = make_assistant(api)
+
+        events = [event async for event in assistant.stream_message("Hello")]
+        self.assertEqual([type(event) for event in events], [MessageCreated, RunInProgress, RunCompleted, MessageCreated])
+        self.assertEqual(events[-1].text, "Hi!")
+        self.assertFalse(assistant.events.has_subscribers())
+
+    async def test_only_yields_events_of_its_conversation(self):
+        api = FakeAPI(statuses=["in_progress", "completed"])
+        assistant = make_assistant(api)
+        first = await assistant.create_conversation("First")
+        second = await assistant.create_conversation("Second")
+
+        async def collect(conversation):
+            return [event async for event in assistant.stream_message("Hello", conversation)]
+
+        for conversation, events in zip((first, second), await asyncio.gather(collect(first), collect(second))):
+            self.assertEqual({event.conversation_id for event in events}, {conversation.id})
+            self.assertEqual(len(events), 4)
+
+    async def test_other_conversations_do_not_fetch_steps(self):
+        api = FakeAPI(statuses=["in_progress", "in_progress", "completed"], steps=[[tool_step("completed")]], poll_delay=0.01)
+        assistant = make_assistant(api)
+        streamed = await assistant.create_conversation("Streamed")
+        other = await assistant.create_conversation("Other")
+
+        async def collect():
+            return [event async for event in assistant.stream_message("Hello", streamed)]
+
+        events, _ = await asyncio.gather(collect(), assistant.send_message("Hello", other))
+        self.assertTrue(any(isinstance(event, RunStepEvent) for event in events))
+        self.assertNotEqual([call for call in api.get_calls("get", "/steps") if streamed.get_thread_id() in call[1]], [])
+        self.assertEqual([call for call in api.get_calls("get", "/steps") if other.get_thread_id() in call[1]], [])
+
+        # Once the stream is closed, its conversation doesn't fetch steps either
+        before = len(api.get_calls("get", "/steps"))
+        await assistant.send_message("Again", streamed)
+        self.assertEqual(len(api.get_calls("get", "/steps")), before)
+
+    async def test_errors_are_raised_after_the_events(self):
+        api = FakeAPI(statuses=["in_progress", "failed"])
+        assistant = make_assistant(api)
+        events = []
+
+        with self.assertRaises(ChatRunError):
+            async for event in assistant.stream_message("Hello"):
+                events.append(event)
+        self.assertIsInstance(events[-1], RunFailed)
+
+    async def test_stopping_early_cancels_the_run(self):
+        api = FakeAPI(statuses=["in_progress"], poll_delay=0.01)
+        assistant = make_assistant(api)
+
+        stream = assistant.stream_message("Hello")
+        async for event in stream:
+            if isinstance(event, RunInProgress):
+                break
+        await stream.aclose()
+
+        for _ in range(100):
+            if api.get_calls("post", "/cancel"):
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(len(api.get_calls("post", "/cancel")), 1)
+        self.assertFalse(assistant.events.has_subscribers())
+        self.assertEqual(await assistant.cancel_active_runs(), [])
+
+if __name__ == '__main__':
+    unittest.main()
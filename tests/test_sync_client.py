@@ -0,0 +1,162 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI
+from pyaimanager.sync_client import BackgroundLoop, SyncAssistantManager
+
+class ThreadRecordingAPI(FakeAPI):
+    """
+    A FakeAPI that records the name of the thread every request is sent from.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.threads_used = set()
+
+    async def request(self, method, endpoint, data=None, response_type=None):
+        self.threads_used.add(threading.current_thread().name)
+        return await super().request(method, endpoint, data, response_type)
+
+def run_in_child(queue):
+    loop = BackgroundLoop.get()
+
+    async def describe():
+        return os.getpid(), threading.current_thread().name
+
+    queue.put((loop.pid, loop.thread.is_alive(), loop.run(describe(), timeout=5)))
+
+class TestBackgroundLoop(unittest.TestCase):
+    def test_one_loop_per_process(self):
+        barrier = threading.Barrier(8)
+        loops = []
+
+        def get_loop():
+            barrier.wait()
+            loops.append(BackgroundLoop.get())
+
+        threads = [threading.Thread(target=get_loop) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(loop) for loop in loops}), 1)
+        self.assertIs(loops[0], BackgroundLoop.get())
+
+    def test_runs_coroutines_on_the_loop_thread(self):
+        loop = BackgroundLoop.get()
+
+        async def get_thread_name():
+            await asyncio.sleep(0)
+            return threading.current_thread().name
+
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            names = list(executor.map(lambda _: loop.run(get_thread_name()), range(8)))
+        self.assertEqual(set(names), {"pyaimanager-loop"})
+        self.assertEqual(loop.submit(get_thread_name()).result(5), "pyaimanager-loop")
+
+    def test_timeout_cancels_the_coroutine(self):
+        loop = BackgroundLoop.get()
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            loop.run(slow(), timeout=0.05)
+        self.assertTrue(cancelled.wait(5))
+
+    def test_blocking_call_from_loop_thread_raises(self):
+        loop = BackgroundLoop.get()
+
+        async def nested():
+            async def inner():
+                return 1
+            return loop.run(inner())
+
+        with self.assertRaises(RuntimeError):
+            loop.run(nested(), timeout=5)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork is not available")
+    def test_forked_child_starts_its_own_loop(self):
+        parent = BackgroundLoop.get()
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        child = context.Process(target=run_in_child, args=(queue,))
+        child.start()
+        pid, alive, (ran_in, thread_name) = queue.get(timeout=10)
+        child.join(10)
+
+        self.assertEqual(child.exitcode, 0)
+        self.assertNotEqual(pid, parent.pid)
+        self.assertEqual(ran_in, pid)
+        self.assertTrue(alive)
+        self.assertEqual(thread_name, "pyaimanager-loop")
+        self.assertIs(BackgroundLoop.get(), parent)
+
+
+class TestSyncAssistantManager(unittest.TestCase):
+    def make_manager(self, api):
+        with mock.patch("pyaimanager.assistant_manager.HTTPRequest", return_value=api):
+            manager = SyncAssistantManager("test-key")
+        for assistant in manager.manager.assistants:
+            assistant._Assistant__update_interval = 0
+        return manager
+
+    def test_messages_from_many_threads(self):
+        api = ThreadRecordingAPI(reply="Hi!")
+        api.add_assistant(name="Chatbot")
+        manager = self.make_manager(api)
+        assistant = manager.get_assistant_by_name("Chatbot")
+
+        def chat(index):
+            conversation = manager.create_conversation(assistant, f"Chat {index}")
+            return manager.send_message(assistant, f"Hello {index}", conversation)
+
+        with concurrent.futures.ThreadPoolExecutor(6) as executor:
+            responses = list(executor.map(chat, range(6)))
+
+        self.assertEqual([response['content'][0]['text']['value'] for response in responses], ["Hi!"] * 6)
+        self.assertEqual(len(api.threads), 6)
+        self.assertEqual(api.threads_used, {"pyaimanager-loop"})
+        self.assertEqual(manager.get_queue_metrics()[assistant.id]['in_flight'], 0)
+
+    def test_send_messages_and_futures(self):
+        api = FakeAPI(reply="Hi!")
+        api.add_assistant(name="Chatbot")
+        manager = self.make_manager(api)
+        assistant = manager.get_assistant_by_name("Chatbot")
+        conversations = [manager.create_conversation(assistant, f"Chat {index}") for index in range(3)]
+
+        responses = manager.send_messages([(assistant, "Hello", conversation) for conversation in conversations], priority="batch")
+        self.assertEqual(len(responses), 3)
+        future = manager.send_message_future(assistant, "Hello again", conversations[0])
+        self.assertEqual(future.result(5)['content'][0]['text']['value'], "Hi!")
+
+    def test_close_cancels_runs_in_progress(self):
+        api = FakeAPI(statuses=["in_progress"], poll_delay=0.01)
+        api.add_assistant(name="Chatbot")
+        manager = self.make_manager(api)
+        assistant = manager.get_assistant_by_name("Chatbot")
+        conversation = manager.create_conversation(assistant, "Chat")
+
+        future = manager.send_message_future(assistant, "Hello", conversation)
+        while not api.runs:
+            threading.Event().wait(0.01)
+        self.assertEqual(manager.close(), list(api.runs))
+        with self.assertRaises(Exception):
+            future.result(5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pyaimanager.utils.usage_tracker import UsageTracker
+
+def make_run(status="completed", prompt_tokens=100, completion_tokens=20, model="gpt-4"):
+    return {
+        "id": "run_abc123",
+        "status": status,
+        "model": model,
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+class TestUsageTracker(unittest.TestCase):
+    def test_counts_per_group(self):
+        tracker = UsageTracker()
+        tracker.record(make_run(), "asst_1", "conv_1", 2.0)
+        tracker.record(make_run(prompt_tokens=300), "asst_1", "conv_2", 4.0)
+        tracker.record(make_run(status="failed", model="gpt-3.5-turbo"), "asst_2", "conv_3", 1.0)
+
+        assistants = tracker.get_usage("assistant")
+        self.assertEqual([entry['assistant_id'] for entry in assistants], ["asst_1", "asst_2"])
+        self.assertEqual(assistants[0]['runs'], 2)
+        self.assertEqual(assistants[0]['prompt_tokens'], 400)
+        self.assertEqual(assistants[0]['latency_avg'], 3.0)
+        self.assertEqual(assistants[0]['latency_max'], 4.0)
+        self.assertEqual(assistants[1]['failed'], 1)
+
+        self.assertEqual(tracker.get_usage("conversation", top=1)[0]['conversation_id'], "conv_2")
+        self.assertEqual({entry['model'] for entry in tracker.get_usage("model")}, {"gpt-4", "gpt-3.5-turbo"})
+        self.assertEqual(tracker.get_totals()['total_tokens'], 560)
+
+    def test_runs_without_usage(self):
+        tracker = UsageTracker()
+        tracker.record({"id": "run_abc123", "status": "completed"}, "asst_1", "conv_1", 1.0, model="gpt-4")
+        self.assertEqual(tracker.get_usage("model")[0]['model'], "gpt-4")
+        self.assertEqual(tracker.get_totals()['total_tokens'], 0)
+
+    def test_conversations_are_capped(self):
+        tracker = UsageTracker(max_conversations=2)
+        for conversation_id in ("conv_1", "conv_2", "conv_1", "conv_3"):
+            tracker.record(make_run(), "asst_1", conversation_id, 1.0)
+
+        # conv_2 had a run longest ago, so it is dropped first
+        self.assertEqual({entry['conversation_id'] for entry in tracker.get_usage("conversation")}, {"conv_1", "conv_3"})
+        self.assertEqual(tracker.get_totals()['runs'], 4)
+
+    def test_unknown_group(self):
+        with self.assertRaises(ValueError):
+            UsageTracker().get_usage("thread")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_api import FakeAPI
+from pyaimanager.assistant_manager import AssistantManager
+from pyaimanager.shared_cache import MemoryCache
+from pyaimanager.worker_pool import WorkerPool, _Worker
+from pyaimanager.utils.exceptions import ChatAssistantError
+
+def echo_last_user_message(messages):
+    last = [message for message in messages if message['role'] == "user"][-1]
+    return "echo: " + last['content'][0]['text']['value']
+
+def get_text(response):
+    return response['content'][0]['text']['value']
+
+class TestWorker(unittest.IsolatedAsyncioTestCase):
+    async def make_worker(self, api, cache=None, max_conversations=10000):
+        config = {"api_key": "test-key", "functions": None, "scheduler_config": None, "json_codec": "json",
+                  "cache": cache, "http_config": None, "max_conversations": max_conversations}
+        worker = _Worker(0, config, queue.Queue(), queue.Queue())
+        with mock.patch("pyaimanager.assistant_manager.HTTPRequest", return_value=api):
+            worker.manager = AssistantManager("test-key", cache=cache)
+        return worker
+
+    async def test_conversations_are_keyed_by_assistant_and_key(self):
+        api = FakeAPI(reply=echo_last_user_message)
+        first, second = api.add_assistant(name="First"), api.add_assistant(name="Second")
+        worker = await self.make_worker(api)
+
+        await worker.send_message(first['id'], "Hello", "session", {})
+        await worker.send_message(second['id'], "Hello", "session", {})
+        await worker.send_message(first['id'], "Again", "session", {})
+
+        self.assertEqual(set(worker.conversations), {(first['id'], "session"), (second['id'], "session")})
+        self.assertEqual(len(api.threads), 2)
+
+    async def test_least_recently_used_conversations_are_evicted(self):
+        api = FakeAPI(reply=echo_last_user_message)
+        assistant_id = api.add_assistant(name="Chatbot")['id']
+        worker = await self.make_worker(api, cache=MemoryCache(), max_conversations=2)
+
+        for key in ("a", "b", "a", "c"):
+            await worker.send_message(assistant_id, f"Hello {key}", key, {})
+        self.assertEqual(list(worker.conversations), [(assistant_id, "a"), (assistant_id, "c")])
+        assistant = await worker.manager.get_assistant_by_id(assistant_id)
+        self.assertEqual(len(assistant.conversations), 2)
+
+        # An evicted conversation continues on its thread through the cache
+        response = await worker.send_message(assistant_id, "Back again", "b", {})
+        self.assertEqual(get_text(response), "echo: Back again")
+        self.assertEqual(len(api.threads), 3)
+        self.assertEqual(len(api.threads[response['thread_id']]), 4)
+
+    async def test_busy_conversations_are_not_evicted(self):
+        api = FakeAPI(statuses=["in_progress", "completed"], poll_delay=0.05)
+        assistant_id = api.add_assistant(name="Chatbot")['id']
+        worker = await self.make_worker(api, max_conversations=1)
+        (await worker.manager.get_assistant_by_id(assistant_id))._Assistant__update_interval = 0
+
+        slow = asyncio.ensure_future(worker.send_message(assistant_id, "Hello", "slow", {}))
+        queued = asyncio.ensure_future(worker.send_message(assistant_id, "Queued", "slow", {}))
+        await asyncio.sleep(0.01)
+        await worker.send_message(assistant_id, "Hello", "other", {})
+        self.assertIn((assistant_id, "slow"), worker.conversations)
+
+        await asyncio.gather(slow, queued)
+        self.assertEqual(len(worker.conversations), 1)
+        self.assertEqual(len([thread for thread in api.threads.values() if len(thread) == 4]), 1)
+
+    async def test_failed_first_message_is_not_kept(self):
+        worker = await self.make_worker(FakeAPI())
+        await worker.handle(0, "send_message", {"assistant_id": "asst_missing", "message": "Hello", "conversation_key": "a", "kwargs": {}})
+
+        request_id, succeeded, error = worker.result_queue.get_nowait()
+        self.assertFalse(succeeded)
+        self.assertIsInstance(error, ChatAssistantError)
+        self.assertEqual(worker.conversations, {})
+        self.assertEqual(worker.failed, 1)
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork is not available")
+class TestWorkerPool(unittest.TestCase):
+    def start_pool(self, api, workers=2):
+        # Forked workers inherit the patched HTTPRequest, so they talk to their copy of the fake API
+        pool = WorkerPool("test-key", workers=workers, start_method="fork", json_codec="json")
+        with mock.patch("pyaimanager.assistant_manager.HTTPRequest", return_value=api):
+            pool.start()
+        self.addCleanup(pool.close, 5)
+        return pool
+
+    def test_dispatches_by_conversation_key(self):
+        api = FakeAPI(reply=echo_last_user_message)
+        assistant_id = api.add_assistant(name="Chatbot")['id']
+        pool = self.start_pool(api)
+
+        keys = [f"session-{index}" for index in range(8)]
+        futures = [pool.send_message_future(assistant_id, f"Hello {key}", key) for key in keys]
+        self.assertEqual([get_text(future.result(10)) for future in futures], [f"echo: Hello {key}" for key in keys])
+
+        metrics = pool.get_metrics()
+        self.assertEqual(metrics['handled'], 8)
+        self.assertEqual(metrics['conversations'], 8)
+        for worker in metrics['workers']:
+            owned = [key for key in keys if pool.get_worker_index(key) == worker['worker']]
+            self.assertEqual(worker['handled'], len(owned))
+        self.assertEqual(len({worker['pid'] for worker in metrics['workers']}), 2)
+
+    def test_messages_of_a_conversation_run_in_order(self):
+        api = FakeAPI(reply=echo_last_user_message, poll_delay=0.1)
+        assistant_id = api.add_assistant(name="Chatbot")['id']
+        pool = self.start_pool(api)
+
+        # If the messages overlapped, a run would answer a later message than its own
+        futures = [pool.send_message_future(assistant_id, f"Message {index}", "session") for index in range(3)]
+        self.assertEqual([get_text(future.result(30)) for future in futures], [f"echo: Message {index}" for index in range(3)])
+
+    def test_dead_worker_fails_its_pending_requests(self):
+        api = FakeAPI(statuses=["in_progress"])
+        assistant_id = api.add_assistant(name="Chatbot")['id']
+        pool = self.start_pool(api, workers=1)
+
+        future = pool.send_message_future(assistant_id, "Hello", "session")
+        time.sleep(0.2)
+        os.kill(pool._WorkerPool__processes[0].pid, signal.SIGKILL)
+        with self.assertRaises(ChatAssistantError):
+            future.result(10)
+
+    def test_pool_must_be_started(self):
+        pool = WorkerPool("test-key", workers=1)
+        with self.assertRaises(ChatAssistantError):
+            pool.send_message_future("asst_abc", "Hello", "session")
+
+if __name__ == '__main__':
+    unittest.main()